@@ -0,0 +1,241 @@
+"""
+Kabul kontrolü modülü
+Bu modül websocket uç noktasındaki yükü sınırlar: aynı anda üretilen yanıt sayısı
+global bir sınırla tutulur, sınır doluyken gelen sorular sınırlı bir FIFO kuyruğunda
+bekler (sıra değiştikçe bildirilir). Kuyruk doluysa, bekleme süresi aşılırsa veya
+IP / bağlantı sınırları aşılırsa istek beklemeden "meşgul, N sn sonra tekrar deneyin"
+yanıtıyla reddedilir (Overloaded).
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from rate_limiter import TokenBucket
+
+# Henüz yanıt süresi gözlenmemişken bir üretimin slotu tuttuğu varsayılan süre (saniye)
+DEFAULT_SERVICE_SECONDS = 10.0
+
+# Gözlenen slot süresinin üstel ortalama ağırlığı
+SERVICE_EWMA_WEIGHT = 0.2
+
+
+class Overloaded(Exception):
+    """Yük nedeniyle reddedilen bağlantı veya soru"""
+    
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"{reason} ({retry_after} sn sonra tekrar deneyin)")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionClient:
+    """Bağlantı başına durum: istemci IP'si ve soru hızı kovası"""
+    
+    def __init__(self, ip: str, questions_per_minute: float, burst: float):
+        self.ip = ip
+        self.bucket = TokenBucket(questions_per_minute, burst) if questions_per_minute > 0 else None
+
+
+class _Waiter:
+    """Kuyrukta bekleyen soru: slot verildiğinde granted, sıra değiştiğinde moved tetiklenir"""
+    
+    def __init__(self):
+        self.granted = asyncio.get_running_loop().create_future()
+        self.moved = asyncio.Event()
+
+
+class AdmissionController:
+    """Global eşzamanlılık sınırı, sınırlı bekleme kuyruğu, IP ve bağlantı sınırları"""
+    
+    def __init__(self, max_inflight: int, max_queue: int, queue_timeout: float,
+                 max_connections_per_ip: int = 0, max_requests_per_ip: int = 0,
+                 questions_per_minute: float = 0, question_burst: float = 1):
+        """
+        Args:
+            max_inflight: Aynı anda üretilen en fazla yanıt (0 ise sınırsız)
+            max_queue: Slot bekleyen en fazla soru
+            queue_timeout: Kuyrukta en fazla bekleme süresi (saniye)
+            max_connections_per_ip: IP başına açık websocket bağlantısı (0 ise sınırsız)
+            max_requests_per_ip: IP başına üretilen + bekleyen soru (0 ise sınırsız)
+            questions_per_minute: Bağlantı başına dakikada soru (0 ise sınırsız)
+            question_burst: Bağlantı başına arka arkaya sorulabilecek soru
+        """
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_connections_per_ip = max_connections_per_ip
+        self.max_requests_per_ip = max_requests_per_ip
+        self.questions_per_minute = questions_per_minute
+        self.question_burst = question_burst
+        
+        self.inflight = 0
+        self.queue: Deque[_Waiter] = deque()
+        self.connections_by_ip: Dict[str, int] = {}
+        self.requests_by_ip: Dict[str, int] = {}
+        self.service_seconds = DEFAULT_SERVICE_SECONDS
+        self.counters = {'admitted': 0, 'queued': 0, 'max_queue_depth': 0}
+        self.rejected: Dict[str, int] = {}
+        self.waited = 0
+        self.wait_seconds = 0.0
+    
+    def connect(self, ip: str) -> AdmissionClient:
+        """
+        Yeni bağlantıyı kaydet
+        
+        Raises:
+            Overloaded: IP başına bağlantı sınırı aşıldıysa
+        """
+        if self.max_connections_per_ip and self.connections_by_ip.get(ip, 0) >= self.max_connections_per_ip:
+            raise self._reject('too_many_connections', self.retry_after(1))
+        self.connections_by_ip[ip] = self.connections_by_ip.get(ip, 0) + 1
+        return AdmissionClient(ip, self.questions_per_minute, self.question_burst)
+    
+    def disconnect(self, client: AdmissionClient):
+        """Kapanan bağlantıyı kayıttan düş"""
+        remaining = self.connections_by_ip.get(client.ip, 0) - 1
+        if remaining > 0:
+            self.connections_by_ip[client.ip] = remaining
+        else:
+            self.connections_by_ip.pop(client.ip, None)
+    
+    def check_rate(self, client: AdmissionClient):
+        """
+        Bağlantının soru hızını kontrol et (önbellekten yanıtlananlar dahil her soru)
+        
+        Raises:
+            Overloaded: Bağlantı dakikadaki soru sınırını aştıysa
+        """
+        if client.bucket is None:
+            return
+        wait = client.bucket.try_acquire()
+        if wait > 0:
+            raise self._reject('rate_limited', math.ceil(wait))
+    
+    def retry_after(self, position: int) -> int:
+        """Kuyruktaki konum için tahmini bekleme (saniye, en az 1)"""
+        slots = self.max_inflight or 1
+        return max(1, math.ceil(position * self.service_seconds / slots))
+    
+    @asynccontextmanager
+    async def slot(self, client: AdmissionClient,
+                   on_position: Optional[Callable[[int, int], Awaitable[None]]] = None):
+        """
+        Yanıt üretimi için slot al; gerekirse kuyrukta bekle
+        
+        Args:
+            client: Soruyu soran bağlantı
+            on_position: Kuyrukta beklerken konum değiştikçe (konum, tahmini saniye) ile çağrılır
+        
+        Raises:
+            Overloaded: IP sınırı aşıldıysa, kuyruk doluysa veya bekleme süresi dolduysa
+        """
+        if self.max_requests_per_ip and self.requests_by_ip.get(client.ip, 0) >= self.max_requests_per_ip:
+            raise self._reject('too_many_requests_per_ip', self.retry_after(1))
+        
+        self.requests_by_ip[client.ip] = self.requests_by_ip.get(client.ip, 0) + 1
+        try:
+            await self._acquire(client, on_position)
+            started = time.monotonic()
+            try:
+                yield
+            finally:
+                self.service_seconds += SERVICE_EWMA_WEIGHT * (time.monotonic() - started - self.service_seconds)
+                self._release()
+        finally:
+            remaining = self.requests_by_ip[client.ip] - 1
+            if remaining > 0:
+                self.requests_by_ip[client.ip] = remaining
+            else:
+                del self.requests_by_ip[client.ip]
+    
+    async def _acquire(self, client: AdmissionClient,
+                       on_position: Optional[Callable[[int, int], Awaitable[None]]]):
+        """Boş slot varsa hemen al, yoksa kuyruğa gir ve sıra gelene kadar bekle"""
+        if not self.max_inflight or (self.inflight < self.max_inflight and not self.queue):
+            self.inflight += 1
+            self.counters['admitted'] += 1
+            return
+        if len(self.queue) >= self.max_queue:
+            raise self._reject('queue_full', self.retry_after(len(self.queue) + 1))
+        
+        waiter = _Waiter()
+        self.queue.append(waiter)
+        self.counters['queued'] += 1
+        self.counters['max_queue_depth'] = max(self.counters['max_queue_depth'], len(self.queue))
+        loop = asyncio.get_running_loop()
+        enqueued = loop.time()
+        deadline = enqueued + self.queue_timeout
+        try:
+            last_position = None
+            while not waiter.granted.done():
+                position = self.queue.index(waiter) + 1
+                if on_position is not None and position != last_position:
+                    last_position = position
+                    await on_position(position, self.retry_after(position))
+                    continue
+                
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise self._reject('queue_timeout', self.retry_after(position))
+                waiter.moved.clear()
+                moved = asyncio.ensure_future(waiter.moved.wait())
+                try:
+                    await asyncio.wait({waiter.granted, moved}, timeout=remaining,
+                                       return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    moved.cancel()
+        except BaseException:
+            if waiter.granted.done():
+                # Slot tam çıkarken verildi: sıradakine devret
+                self._release()
+            else:
+                waiter.granted.cancel()
+                self.queue.remove(waiter)
+                self._notify()
+            raise
+        self.counters['admitted'] += 1
+        self.waited += 1
+        self.wait_seconds += loop.time() - enqueued
+    
+    def _release(self):
+        """Slotu bırak; kuyrukta bekleyen varsa slot doğrudan ona devredilir"""
+        if self.queue:
+            self.queue.popleft().granted.set_result(True)
+            self._notify()
+        else:
+            self.inflight -= 1
+    
+    def _notify(self):
+        """Kuyruktakilere konumlarının değiştiğini bildir"""
+        for waiter in self.queue:
+            waiter.moved.set()
+    
+    def _reject(self, reason: str, retry_after: int) -> Overloaded:
+        """Reddi say ve Overloaded hatası oluştur"""
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        return Overloaded(reason, retry_after)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Anlık doluluk, kuyruk derinliği ve kabul / ret sayaçları"""
+        return {
+            "limits": {
+                "max_inflight": self.max_inflight,
+                "max_queue": self.max_queue,
+                "queue_timeout_s": self.queue_timeout,
+                "max_connections_per_ip": self.max_connections_per_ip,
+                "max_requests_per_ip": self.max_requests_per_ip,
+                "questions_per_minute": self.questions_per_minute,
+            },
+            "inflight": self.inflight,
+            "queue_depth": len(self.queue),
+            "connections": sum(self.connections_by_ip.values()),
+            "client_ips": len(self.connections_by_ip),
+            **self.counters,
+            "rejected": dict(self.rejected),
+            "avg_queue_wait_ms": self.wait_seconds / self.waited * 1000 if self.waited else 0.0,
+            "service_estimate_s": round(self.service_seconds, 2),
+        }
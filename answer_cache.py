@@ -0,0 +1,184 @@
+"""
+Yanıt önbellek modülü
+Bu modül final yanıtları soru embedding'i ile saklar. Yeni sorunun embedding'i
+kayıtlı bir sorunun embedding'ine kosinüs benzerliği eşiğin üzerinde yakınsa
+saklanan yanıt (ve kaynak kararı) model çağrısı yapılmadan döndürülür.
+Kayıtlar TTL ile eskir, kapasite dolunca en az kullanılan kayıt atılır ve
+korpus manifesti değiştiğinde önbellek tamamen temizlenir.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """Soru embedding'i anahtarlı, TTL ve LRU sınırlı yanıt önbelleği"""
+    
+    def __init__(self, threshold: float = 0.95, ttl_seconds: float = 86400, max_entries: int = 1000):
+        """
+        Args:
+            threshold: Hit için gereken minimum kosinüs benzerliği
+            ttl_seconds: Kaydın geçerlilik süresi (0 veya negatifse süresiz)
+            max_entries: Maksimum kayıt sayısı (LRU ile atılır)
+        """
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.corpus_version: Optional[str] = None
+        self.next_key = 0
+        # Arama matrisi: kayıtların normalize embedding'leri (kayıt sırası keys ile aynı)
+        self.matrix: Optional[np.ndarray] = None
+        self.keys: List[int] = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        """Embedding'i birim uzunluklu float32 vektöre çevir"""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector)) if vector.size else 0.0
+        if norm == 0.0:
+            return None
+        return vector / norm
+    
+    def _rebuild(self):
+        """Arama matrisini kayıtlardan yeniden oluştur (kilit altında çağrılır)"""
+        self.keys = list(self.entries.keys())
+        if self.keys:
+            self.matrix = np.stack([self.entries[key]['embedding'] for key in self.keys])
+        else:
+            self.matrix = None
+    
+    def _sync_version(self, corpus_version: Optional[str]):
+        """Korpus sürümü değiştiyse tüm kayıtları at (kilit altında çağrılır)"""
+        if corpus_version == self.corpus_version:
+            return
+        if self.entries:
+            print(f"🧹 Korpus değişti, yanıt önbelleği temizlendi ({len(self.entries)} kayıt)")
+            self.invalidations += 1
+        self.entries.clear()
+        self.corpus_version = corpus_version
+        self._rebuild()
+    
+    def _is_expired(self, entry: Dict[str, Any], now: float) -> bool:
+        """Kaydın TTL'i doldu mu?"""
+        return self.ttl_seconds > 0 and now - entry['created_at'] > self.ttl_seconds
+    
+    def _drop_expired(self, now: float) -> bool:
+        """Süresi dolan kayıtları at (kilit altında çağrılır)"""
+        expired = [key for key, entry in self.entries.items() if self._is_expired(entry, now)]
+        for key in expired:
+            del self.entries[key]
+        self.expirations += len(expired)
+        return bool(expired)
+    
+    def lookup(self, embedding: List[float], corpus_version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Soruya yeterince benzeyen kayıtlı bir soru varsa yanıtını döndür
+        
+        Args:
+            embedding: Soru embedding'i
+            corpus_version: Güncel korpus sürümü (değiştiyse önbellek temizlenir)
+        
+        Returns:
+            Kayıt (question, response, decision, source_info, similarity) veya None
+        """
+        vector = self._normalize(embedding)
+        with self.lock:
+            self._sync_version(corpus_version)
+            if vector is None or self.matrix is None or self.matrix.shape[1] != vector.shape[0]:
+                self.misses += 1
+                return None
+            
+            similarities = self.matrix @ vector
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            key = self.keys[best]
+            entry = self.entries[key]
+            now = time.time()
+            if similarity < self.threshold or self._is_expired(entry, now):
+                if self._drop_expired(now):
+                    self._rebuild()
+                self.misses += 1
+                return None
+            
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return {
+                'question': entry['question'],
+                'response': entry['response'],
+                'decision': entry['decision'],
+                'source_info': entry['source_info'],
+                'similarity': similarity,
+            }
+    
+    def store(self, question: str, embedding: List[float], response: str, decision: str,
+              source_info: str = "", corpus_version: Optional[str] = None):
+        """
+        Final yanıtı soru embedding'i ile sakla
+        
+        Args:
+            question: Kullanıcı sorusu
+            embedding: Soru embedding'i
+            response: Final yanıt
+            decision: Modelin kaynak kararı
+            source_info: Kullanılan kaynak açıklaması
+            corpus_version: Yanıtın üretildiği korpus sürümü
+        """
+        vector = self._normalize(embedding)
+        if vector is None or not response:
+            return
+        with self.lock:
+            self._sync_version(corpus_version)
+            now = time.time()
+            self._drop_expired(now)
+            
+            # Aynı soru (neredeyse) tekrar kaydediliyorsa eski kaydı değiştir
+            if self.matrix is not None and self.matrix.shape[1] == vector.shape[0]:
+                for key in [
+                    self.keys[i] for i in np.flatnonzero(self.matrix @ vector >= self.threshold)
+                ]:
+                    self.entries.pop(key, None)
+            
+            self.entries[self.next_key] = {
+                'question': question,
+                'embedding': vector,
+                'response': response,
+                'decision': decision,
+                'source_info': source_info,
+                'created_at': now,
+            }
+            self.next_key += 1
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            self._rebuild()
+    
+    def clear(self):
+        """Tüm kayıtları at"""
+        with self.lock:
+            self.entries.clear()
+            self._rebuild()
+    
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss sayaçlarını ve boyut bilgisini döndür"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "entries": len(self.entries),
+            }
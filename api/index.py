@@ -1,9 +1,11 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
+import asyncio
 import json
 import os
 import sys
+from typing import Optional
 
 # Ana dizini Python path'ine ekle
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -14,23 +16,63 @@ except ImportError:
     # Vercel'de import sorunu varsa basit bir fallback
     AgenticDemoChatbot = None
 
+from admission import AdmissionClient, AdmissionController, Overloaded
+from stream_protocol import negotiate_protocol, stream_frames
+from config import Config
+
 app = FastAPI()
 
 # Global chatbot instance
 chatbot = None
 
+def client_ip(websocket: WebSocket) -> str:
+    """İstemci IP'si (proxy arkasında X-Forwarded-For'daki ilk adres)"""
+    if Config.ADMISSION_TRUST_FORWARDED:
+        forwarded = websocket.headers.get("x-forwarded-for", "")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return websocket.client.host if websocket.client else "unknown"
+
+def busy_message(error: Overloaded) -> str:
+    """Aşırı yük yanıtı: istemci retry_after saniye sonra tekrar deneyebilir"""
+    return json.dumps({
+        "type": "busy",
+        "reason": error.reason,
+        "retry_after": error.retry_after,
+        "content": f"⏳ Sistem şu an çok yoğun. Lütfen {error.retry_after} sn sonra tekrar deneyin."
+    })
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections = []
-
-    async def connect(self, websocket: WebSocket):
+        self.admission = AdmissionController(
+            max_inflight=Config.ADMISSION_MAX_INFLIGHT,
+            max_queue=Config.ADMISSION_MAX_QUEUE,
+            queue_timeout=Config.ADMISSION_QUEUE_TIMEOUT,
+            max_connections_per_ip=Config.ADMISSION_MAX_CONNECTIONS_PER_IP,
+            max_requests_per_ip=Config.ADMISSION_MAX_REQUESTS_PER_IP,
+            questions_per_minute=Config.ADMISSION_QUESTIONS_PER_MINUTE,
+            question_burst=Config.ADMISSION_QUESTION_BURST
+        )
+    
+    async def connect(self, websocket: WebSocket) -> Optional[AdmissionClient]:
         await websocket.accept()
+        try:
+            client = self.admission.connect(client_ip(websocket))
+        except Overloaded as e:
+            # IP başına bağlantı sınırı: nedeni bildirip kapat (1013: tekrar deneyin)
+            await self.send_message(busy_message(e), websocket)
+            await websocket.close(code=1013)
+            return None
         self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
+        return client
+    
+    def disconnect(self, websocket: WebSocket, client: Optional[AdmissionClient] = None):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
-
+        if client is not None:
+            self.admission.disconnect(client)
+    
     async def send_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
@@ -51,19 +93,69 @@ async def health_check():
         "chatbot_ready": chatbot is not None
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Performans sayaçları"""
+    global chatbot
+    if chatbot is None:
+        return {"chatbot_ready": False}
+    return {
+        "chatbot_ready": True,
+        "embedding_cache": chatbot.embedding_generator.cache_stats(),
+        "answer_cache": chatbot.answer_cache.stats() if chatbot.answer_cache else None,
+        "query_router": chatbot.router.stats() if chatbot.router else None,
+        "speculative_retrieval": chatbot.agent.speculation_stats(),
+        "agent_calls": chatbot.agent.call_stats(),
+        "model_tiers": chatbot.agent.tier_stats(),
+        "singleflight": chatbot.singleflight.stats() if chatbot.singleflight else None,
+        "admission": manager.admission.stats(),
+        "llm_backend": chatbot.llm_backend.stats()
+    }
+
 @app.websocket("/ws/chat")
 async def websocket_chat(websocket: WebSocket):
-    await manager.connect(websocket)
+    client = await manager.connect(websocket)
+    if client is None:
+        return
+    # Akış protokolü bağlantı adresinde seçilir (/ws/chat?protocol=2); verilmezse v1
+    protocol = negotiate_protocol(websocket.query_params.get("protocol"))
+    
+    async def send_queue_position(position: int, retry_after: int):
+        # Sıra bilgisi paylaşılan akışın tüm abonelerine gider: bu bağlantı kapandıysa diğerleri beklemeye devam eder
+        try:
+            await manager.send_message(json.dumps({
+                "type": "queue_position",
+                "position": position,
+                "retry_after": retry_after,
+                "content": f"⏳ Yoğunluk var, sıranız: {position} (yaklaşık {retry_after} sn)"
+            }), websocket)
+        except Exception:
+            pass
+    
+    def admit(on_position):
+        return manager.admission.slot(client, on_position)
     
     try:
         while True:
             data = await websocket.receive_text()
             message_data = json.loads(data)
             user_message = message_data.get("message", "")
+            # İstemci isteğe özel gecikme bütçesi (saniye) verebilir; model katmanı buna göre seçilir
+            latency_budget = message_data.get("latency_budget")
+            if isinstance(latency_budget, bool) or not isinstance(latency_budget, (int, float)) \
+                    or latency_budget <= 0:
+                latency_budget = None
             
             if not user_message.strip():
                 continue
             
+            # Bağlantı başına soru hızı sınırı (önbellekten yanıtlanacak sorular dahil)
+            try:
+                manager.admission.check_rate(client)
+            except Overloaded as e:
+                await manager.send_message(busy_message(e), websocket)
+                continue
+            
             # Bot yanıtını başlat
             await manager.send_message(json.dumps({
                 "type": "bot_thinking",
@@ -76,34 +168,32 @@ async def websocket_chat(websocket: WebSocket):
                     "content": "❌ Chatbot henüz hazır değil. Lütfen bekleyin."
                 }), websocket)
                 continue
-
-            # Thinking indicator'ın görünmesi için minimum gecikme
-            import asyncio
-            await asyncio.sleep(1.0)  # 1 saniye minimum thinking time
             
-            # Streaming yanıt başlat (sadece frontend'e stream başlıyor sinyali)
-            await manager.send_message(json.dumps({
-                "type": "bot_start",
-                "content": ""
-            }), websocket)
+            # Benzer soru daha önce yanıtlandıysa kayıtlı yanıt beklemeden akıtılır
+            cached = await chatbot.find_cached_answer_async(user_message)
+            if cached:
+                stream = chatbot.stream_cached_answer_async(cached)
+            else:
+                # Thinking indicator'ın görünmesi için minimum gecikme
+                await asyncio.sleep(1.0)  # 1 saniye minimum thinking time
+                # Aynı soru şu an başka bir bağlantı için akıyorsa o akış paylaşılır; slotu
+                # yalnızca yeni üretimi başlatan istek alır ve paylaşılan akış bitene kadar tutar.
+                # Akış kuyrukta beklerken sıra bilgisi akışa katılan her bağlantıya gönderilir
+                stream = chatbot.ask_question_shared_stream_async(
+                    user_message, latency_budget, admit=admit, on_position=send_queue_position
+                )
             
+            # bot_start, parça çerçeveleri (v1: bot_chunk, v2: bot_delta) ve bot_complete
             try:
-                full_response = ""
-                for chunk in chatbot.ask_question_agentic_stream(user_message):
-                    if chunk:
-                        full_response += chunk
-                        await manager.send_message(json.dumps({
-                            "type": "bot_chunk",
-                            "content": chunk,
-                            "full_content": full_response
-                        }), websocket)
-                
-                # Yanıt tamamlandı
-                await manager.send_message(json.dumps({
-                    "type": "bot_complete",
-                    "content": full_response
-                }), websocket)
-                
+                frames = stream_frames(stream, protocol, window=Config.STREAM_COALESCE_MS / 1000,
+                                       max_chars=Config.STREAM_COALESCE_CHARS)
+                async for frame in frames:
+                    await manager.send_message(frame, websocket)
+            
+            except Overloaded as e:
+                # Kuyruk dolu / bekleme süresi doldu: zaman aşımı yerine hızlı ret
+                await manager.send_message(busy_message(e), websocket)
+            
             except Exception as e:
                 await manager.send_message(json.dumps({
                     "type": "error",
@@ -111,7 +201,9 @@ async def websocket_chat(websocket: WebSocket):
                 }), websocket)
     
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
+    finally:
+        manager.disconnect(websocket, client)
 
 @app.on_event("startup")
 async def startup_event():
@@ -141,4 +233,5 @@ if __name__ == "__main__":
     host = "0.0.0.0"
     
     print(f"🌟 Server başlatılıyor... Host: {host}, Port: {port}")
-    uvicorn.run(app, host=host, port=port)
+    # permessage-deflate: istemci destekliyorsa çerçeveler sıkıştırılır
+    uvicorn.run(app, host=host, port=port, ws_per_message_deflate=Config.WS_PER_MESSAGE_DEFLATE)
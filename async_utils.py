@@ -0,0 +1,90 @@
+"""
+Asenkron yardımcı modülü
+Bu modül bloklayan çağrıları (embedding, vektör arama, senkron SDK çağrıları)
+event loop'u dondurmadan ortak bir thread havuzunda çalıştırır ve senkron
+generator'ları async iterator'a çeviren köprüyü içerir.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+
+from config import Config
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class _Finished:
+    """Köprüde generator'ın bittiğini (veya hata verdiğini) bildiren işaret"""
+    
+    def __init__(self, error: Optional[BaseException] = None):
+        self.error = error
+
+
+def blocking_executor() -> ThreadPoolExecutor:
+    """Bloklayan işler için ortak thread havuzu (ilk kullanımda oluşturulur)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=Config.BLOCKING_WORKERS, thread_name_prefix="blocking"
+            )
+        return _executor
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Bloklayan fonksiyonu thread havuzunda çalıştır ve sonucunu bekle
+    
+    Args:
+        func: Çağrılacak fonksiyon
+        *args, **kwargs: Fonksiyon argümanları
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(blocking_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def iterate_in_thread(iterable: Iterable[Any]) -> AsyncIterator[Any]:
+    """
+    Senkron generator'ı thread havuzunda tüket, öğelerini async olarak ver.
+    Tüketici erken çıkarsa (ör. bağlantı kapandı) generator bir sonraki öğede durdurulur.
+    
+    Args:
+        iterable: Senkron generator / iterable
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stopped = threading.Event()
+    
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if stopped.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            finished = _Finished()
+        except BaseException as error:
+            finished = _Finished(error)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+        loop.call_soon_threadsafe(queue.put_nowait, finished)
+    
+    producer = loop.run_in_executor(blocking_executor(), produce)
+    try:
+        while True:
+            item = await queue.get()
+            if isinstance(item, _Finished):
+                if item.error is not None:
+                    raise item.error
+                break
+            yield item
+    finally:
+        stopped.set()
+        if producer.done():
+            producer.result()
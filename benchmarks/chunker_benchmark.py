@@ -0,0 +1,99 @@
+"""
+Chunker benchmark
+Eski karakter karakter geri yürüyen chunker ile str.rfind tabanlı yeni chunker'ı
+kitap.txt'nin ~100 MB'a ölçeklenmiş hali üzerinde karşılaştırır ve compat
+modunun çıktısının birebir aynı olduğunu doğrular.
+
+Kullanım:
+    python benchmarks/chunker_benchmark.py [hedef_MB]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from text_processor import TextProcessor
+
+
+def legacy_create_chunks(text, chunk_size, chunk_overlap):
+    """Eski TextProcessor.create_chunks döngüsünün birebir kopyası"""
+    if not text.strip():
+        return []
+    
+    chunks = []
+    start = 0
+    
+    while start < len(text):
+        end = start + chunk_size
+        
+        if end < len(text):
+            while end > start and text[end] not in [' ', '\n', '\t', '.', '!', '?']:
+                end -= 1
+            
+            if end == start:
+                end = start + chunk_size
+        
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        
+        start = end - chunk_overlap
+        if start < 0:
+            start = end
+    
+    return chunks
+
+
+def timed(func, *args, repeat=3):
+    """Fonksiyonu birkaç kez çalıştır, (sonuç, en iyi süre) döndür"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    target_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 100
+    with open(Config.BOOK_FILE, 'r', encoding='utf-8') as f:
+        base = f.read()
+    repeats = max(1, int(target_mb * 1024 * 1024 / len(base.encode('utf-8'))))
+    text = "\n".join([base] * repeats)
+    size_mb = len(text.encode('utf-8')) / (1024 * 1024)
+    
+    legacy, legacy_time = timed(legacy_create_chunks, text, Config.CHUNK_SIZE, Config.CHUNK_OVERLAP)
+    
+    compat = TextProcessor(Config.CHUNK_SIZE, Config.CHUNK_OVERLAP, "compat")
+    fast, fast_time = timed(compat.create_chunks, text)
+    
+    sentence = TextProcessor(Config.CHUNK_SIZE, Config.CHUNK_OVERLAP, "sentence")
+    sentence_chunks, sentence_time = timed(sentence.create_chunks, text)
+    
+    # En kötü durum: uzun sınırsız diziler (URL, tablo, tek kelimelik satırlar).
+    # Eski döngü burada her parça için chunk_size kadar karakter geri yürür.
+    worst_text = "x" * int(target_mb * 1024 * 1024 / 10)
+    worst_legacy, worst_legacy_time = timed(
+        legacy_create_chunks, worst_text, Config.CHUNK_SIZE, Config.CHUNK_OVERLAP, repeat=1
+    )
+    worst_fast, worst_fast_time = timed(compat.create_chunks, worst_text, repeat=1)
+    
+    identical = legacy == fast and worst_legacy == worst_fast
+    print("\n📊 Chunker benchmark")
+    print(f"   Metin boyutu : {size_mb:.1f} MB ({repeats} x {Config.BOOK_FILE})")
+    print(f"   Eski döngü   : {legacy_time:7.2f} s  ({len(legacy)} parça)")
+    print(f"   Yeni compat  : {fast_time:7.2f} s  ({len(fast)} parça, birebir aynı: {identical})")
+    print(f"   Yeni sentence: {sentence_time:7.2f} s  ({len(sentence_chunks)} parça)")
+    print(f"   Hızlanma     : {legacy_time / fast_time:7.2f}x")
+    print(f"   En kötü durum ({len(worst_text) / (1024 * 1024):.0f} MB sınırsız metin): "
+          f"eski {worst_legacy_time:.2f} s, yeni {worst_fast_time:.2f} s, "
+          f"hızlanma {worst_legacy_time / worst_fast_time:.1f}x")
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Çevrimdışı yük benchmark'ı
+Sunucunun websocket handler'ını (api/index.py) sahte LLM backend'iyle uçtan uca
+çalıştırır: her eşzamanlılık seviyesinde o kadar istemci aynı anda soru sorar ve
+yanıt başlangıcı, ilk parça (TTFT), toplam süre, gönderilen çerçeve/bayt sayısı,
+saniyedeki yanıt sayısı ve event loop gecikmesi ölçülür. Ağ veya API anahtarı
+gerektirmez; gecikme ve akış hızı FAKE_LLM_* değişkenleriyle ayarlanır.
+
+İndeks geçici bir dizinde oluşturulur; yanıt önbelleği varsayılan olarak kapalıdır
+(ANSWER_CACHE_ENABLED=true verilirse tekrarlanan sorular önbellekten döner).
+
+Kullanım:
+    python benchmarks/load_benchmark.py [eşzamanlılık,...] [istemci_başına_soru]
+    örn. FAKE_LLM_LATENCY=lognormal:500:0.4 python benchmarks/load_benchmark.py 1,8,32 2
+    BENCHMARK_PROTOCOL=2 ile websocket akış protokolü v2 (delta çerçeveler) ölçülür.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCHMARK_DIR))
+
+# Config içe aktarılmadan önce: sahte backend ve geçici indeks
+WORK_DIR = tempfile.mkdtemp(prefix="load_benchmark_")
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("VECTOR_DB_PATH", WORK_DIR)
+os.environ.setdefault("SNAPSHOT_PATH", os.path.join(WORK_DIR, "snapshot"))
+os.environ.setdefault("ANSWER_CACHE_ENABLED", "false")
+
+import numpy as np
+from fastapi import WebSocketDisconnect
+
+DEFAULT_LEVELS = (1, 8, 32)
+PROTOCOL = os.getenv("BENCHMARK_PROTOCOL", "1")  # websocket akış protokolü (1 | 2)
+QUESTIONS_PATH = os.path.join(BENCHMARK_DIR, "routing_questions.json")
+
+
+class BenchmarkSocket:
+    """Mesajları sırayla veren ve gönderilen çerçeveleri zamanlarıyla kaydeden websocket"""
+    
+    def __init__(self, questions):
+        self.pending = [json.dumps({"message": question}) for question in questions]
+        self.headers = {}
+        self.query_params = {"protocol": PROTOCOL}
+        self.client = None
+        self.sent_at = None
+        self.current = None
+        self.requests = []
+    
+    async def accept(self):
+        pass
+    
+    async def close(self, code=1000):
+        self.pending = []
+    
+    async def receive_text(self):
+        if not self.pending:
+            raise WebSocketDisconnect()
+        self.sent_at = time.perf_counter()
+        self.current = {"start": None, "first_chunk": None, "total": None, "frames": 0, "bytes": 0}
+        return self.pending.pop(0)
+    
+    async def send_text(self, text):
+        elapsed = time.perf_counter() - self.sent_at
+        frame_type = json.loads(text)["type"]
+        self.current["frames"] += 1
+        self.current["bytes"] += len(text.encode("utf-8"))
+        if frame_type == "bot_start":
+            self.current["start"] = elapsed
+        elif frame_type in ("bot_chunk", "bot_delta") and self.current["first_chunk"] is None:
+            self.current["first_chunk"] = elapsed
+        elif frame_type in ("bot_complete", "error", "busy"):
+            self.current["total"] = elapsed
+            self.current["ok"] = frame_type == "bot_complete"
+            self.current["busy"] = frame_type == "busy"
+            self.requests.append(self.current)
+
+
+def percentile(values, q):
+    """Yüzdelik (ms)"""
+    values = [value for value in values if value is not None]
+    return np.percentile(values, q) * 1000 if values else float("nan")
+
+
+async def run_level(api, questions, concurrency, per_client):
+    """Bir eşzamanlılık seviyesini çalıştır"""
+    lag = [0.0]
+    running = [True]
+    
+    async def ticker():
+        while running[0]:
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag[0] = max(lag[0], time.perf_counter() - started - 0.01)
+    
+    sockets = [
+        BenchmarkSocket([questions[(client * per_client + i) % len(questions)] for i in range(per_client)])
+        for client in range(concurrency)
+    ]
+    monitor = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(api.websocket_chat(socket) for socket in sockets))
+    elapsed = time.perf_counter() - started
+    running[0] = False
+    await monitor
+    
+    requests = [request for socket in sockets for request in socket.requests]
+    return {
+        "concurrency": concurrency,
+        "requests": len(requests),
+        "errors": sum(not request.get("ok") and not request.get("busy") for request in requests),
+        "busy": sum(bool(request.get("busy")) for request in requests),
+        "start_p50": percentile([r["start"] for r in requests], 50),
+        "ttft_p50": percentile([r["first_chunk"] for r in requests], 50),
+        "ttft_p95": percentile([r["first_chunk"] for r in requests], 95),
+        "total_p95": percentile([r["total"] for r in requests], 95),
+        "frames": np.mean([r["frames"] for r in requests]),
+        "kbytes": np.mean([r["bytes"] for r in requests]) / 1024,
+        "rps": len(requests) / elapsed,
+        "loop_lag": lag[0] * 1000,
+    }
+
+
+def main():
+    levels = [int(level) for level in sys.argv[1].split(",")] if len(sys.argv) > 1 else list(DEFAULT_LEVELS)
+    per_client = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    with open(QUESTIONS_PATH, "r", encoding="utf-8") as f:
+        questions = [item["question"] for item in json.load(f)]
+    
+    os.chdir(os.path.dirname(BENCHMARK_DIR))
+    import api.index as api
+    from main import AgenticDemoChatbot
+    from config import Config
+    
+    try:
+        api.chatbot = AgenticDemoChatbot(use_snapshot=False)
+        api.chatbot.setup_database()
+        
+        print(f"\n📊 Backend: {Config.LLM_BACKEND}, ilk token {Config.FAKE_LLM_LATENCY} ms, "
+              f"{Config.FAKE_LLM_TOKENS_PER_SECOND:g} token/s, agent modu {Config.AGENT_MODE}, "
+              f"protokol v{PROTOCOL}")
+        print(f"{'eşz.':>5} {'istek':>6} {'hata':>5} {'meşgul':>7} {'başlangıç p50':>14} {'TTFT p50':>9} {'TTFT p95':>9} "
+              f"{'toplam p95':>11} {'çerçeve':>8} {'KB/yanıt':>9} {'yanıt/s':>8} {'loop gecikmesi':>15}")
+        for concurrency in levels:
+            row = asyncio.run(run_level(api, questions, concurrency, per_client))
+            print(f"{row['concurrency']:>5} {row['requests']:>6} {row['errors']:>5} {row['busy']:>7} {row['start_p50']:>11.0f} ms "
+                  f"{row['ttft_p50']:>6.0f} ms {row['ttft_p95']:>6.0f} ms {row['total_p95']:>8.0f} ms "
+                  f"{row['frames']:>8.0f} {row['kbytes']:>9.1f} {row['rps']:>8.2f} {row['loop_lag']:>12.0f} ms")
+        print("\n📈 Agent çağrıları:", api.chatbot.agent.call_stats())
+        admission = api.manager.admission.stats()
+        print("🚦 Kabul kontrolü:", {key: admission[key] for key in ("admitted", "queued", "max_queue_depth",
+                                                                    "rejected", "avg_queue_wait_ms")})
+        tiers = api.chatbot.agent.tier_stats()
+        print("🎚️ Model katmanları:", tiers["choices"], tiers["reasons"],
+              {tier: latency["total_p95_ms"] for tier, latency in tiers["latency"].items()})
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
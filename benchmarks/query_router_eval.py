@@ -0,0 +1,119 @@
+"""
+Sorgu yönlendirici değerlendirmesi
+Etiketli soru setinde yerel yönlendiriciyi (koleksiyon merkezi + skor farkı) LLM
+karar çağrısıyla karşılaştırır: yerel karar oranı, LLM ile uyum, etiketle uyum ve
+yerel kararlarda atlanan LLM çağrısı sayesinde ilk token'a kadar kazanılan süre.
+ROUTER_MARGIN seçimi için farklı eşiklerin sonuçları tablo halinde yazdırılır.
+Karar çağrısı başarısız olup yedek karara (BOTH_SOURCES) düşen sorular LLM kararı
+sayılmaz, değerlendirme dışı bırakılır.
+
+Gemini API anahtarı ve indekslenmiş korpus gerekir (main.py ile aynı ayarlar). Sahte
+backend'le (LLM_BACKEND=fake) çalışır ama kararlar ve embedding'ler sorudan türetilen
+yapay değerler olduğundan uyum ve kazanç sayıları anlamlı değildir.
+
+Kullanım:
+    python benchmarks/query_router_eval.py [soru_seti.json]
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from config import Config
+
+DECISIONS = ("TRANSCRIPT_ONLY", "BOOK_ONLY", "BOTH_SOURCES", "NO_SEARCH")
+MARGINS = (0.0, 0.01, 0.02, 0.03, 0.05, 0.08, 0.12)
+DEFAULT_QUESTIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "routing_questions.json")
+
+
+def normalize_decision(text: str) -> str:
+    """Model yanıtını _execute_decision ile aynı kurallarla karara çevir"""
+    text = (text or "").upper()
+    for decision in DECISIONS[:3]:
+        if decision in text:
+            return decision
+    return "NO_SEARCH"
+
+
+def rate(values) -> str:
+    """Boolean listesinin oranı"""
+    values = list(values)
+    return f"{sum(values) / len(values):.0%}" if values else "-"
+
+
+def main():
+    questions_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_QUESTIONS
+    with open(questions_path, 'r', encoding='utf-8') as f:
+        questions = json.load(f)
+    
+    Config.QUERY_ROUTING = "local"
+    from main import AgenticDemoChatbot
+    chatbot = AgenticDemoChatbot()
+    chatbot.setup_database()
+    router = chatbot.router
+    if not router.ready:
+        print("❌ Yönlendirme için en az iki koleksiyon merkezi gerekli")
+        return
+    # Karar her soru için LLM'e de sorulur
+    chatbot.agent.set_router(None)
+    
+    rows = []
+    fallbacks = 0
+    for item in questions:
+        question = item["question"]
+        embedding = chatbot.embedding_generator.generate_single_embedding(question)
+        started = time.perf_counter()
+        router.route(embedding)
+        router_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        llm_decision, decided_by, _ = chatbot.agent._decide(question)
+        llm_seconds = time.perf_counter() - started
+        if decided_by == 'yedek karar':
+            fallbacks += 1
+            continue
+        rows.append({
+            "question": question,
+            "label": item["label"],
+            "llm": normalize_decision(llm_decision),
+            "embedding": embedding,
+            "router_s": router_seconds,
+            "llm_s": llm_seconds,
+        })
+    
+    count = len(rows)
+    print(f"\n📊 {count} soru ({questions_path})")
+    if fallbacks:
+        print(f"⚠️ Karar çağrısı başarısız olan {fallbacks} soru (yedek karar) değerlendirme dışı")
+    if not count:
+        print("❌ Değerlendirilecek LLM kararı yok")
+        return
+    print(f"LLM kararı: etiketle uyum {rate(r['llm'] == r['label'] for r in rows)}, "
+          f"p50 {np.percentile([r['llm_s'] for r in rows], 50) * 1000:.0f} ms\n")
+    
+    print(f"{'fark':>6} {'yerel':>7} {'LLM uyumu':>10} {'etiket uyumu':>13} {'TTFT kazancı/soru':>18}")
+    configured = None
+    for margin in sorted(set(MARGINS) | {Config.ROUTER_MARGIN}):
+        router.margin = margin
+        decisions = [router.route(r["embedding"])["decision"] for r in rows]
+        local = [(r, d) for r, d in zip(rows, decisions) if d]
+        saved = sum(r["llm_s"] - r["router_s"] for r, _ in local) / count
+        marker = " ←" if margin == Config.ROUTER_MARGIN else ""
+        print(f"{margin:>6.3f} {len(local) / count:>7.0%} {rate(d == r['llm'] for r, d in local):>10} "
+              f"{rate(d == r['label'] for r, d in local):>13} {saved * 1000:>15.0f} ms{marker}")
+        if marker:
+            configured = local
+    
+    mismatches = [(r, d) for r, d in configured if d != r["llm"]]
+    if mismatches:
+        print(f"\nROUTER_MARGIN={Config.ROUTER_MARGIN} için LLM'den farklı yerel kararlar:")
+        for r, d in mismatches:
+            print(f"  - {r['question'][:70]} → yerel {d}, LLM {r['llm']}, etiket {r['label']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Websocket akış protokolü benchmark'ı (v1 ve v2)
+3000 karakterlik bir yanıtı sunucunun çerçeve üreticisinden (stream_protocol.stream_frames)
+geçirir ve protokol başına şunları ölçer:
+
+- Çerçeve sayısı, JSON yük baytı ve websocket başlıklarıyla kablodaki bayt
+- permessage-deflate ile kablodaki bayt (bağlam paylaşımlı raw deflate, RFC 7692)
+- İstemci işi: çözülen JSON baytı ve çözme CPU süresi, markdown olarak yeniden
+  parse edilen karakter sayısı ve DOM yenileme sayısı. v1 istemcisi her çerçevede
+  yanıtın tamamını yeniden render eder; v2 istemcisi (public/script.js) tamamlanan
+  blokları bir kez, yalnızca son bloğu her çerçevede render eder (burada aynı algoritma
+  her çerçeve için uygulanır; tarayıcıdaki animasyon karesi birleştirmesi hariçtir).
+
+İki senaryo ölçülür: canlı akış (küçük parçalar, parça arası bekleme) ve önbellekten
+dönen yanıt (beklemesiz parçalar).
+
+Kullanım:
+    python benchmarks/stream_protocol_benchmark.py [karakter] [parça_karakteri] [parça_arası_ms]
+"""
+
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+import zlib
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCHMARK_DIR))
+
+from config import Config
+from main import CACHED_ANSWER_CHUNK_CHARS
+from stream_protocol import stream_frames
+
+SOURCE_PATH = os.path.join(os.path.dirname(BENCHMARK_DIR), "kitap.txt")
+DECODE_REPEATS = 20
+
+
+def build_answer(length):
+    """Kitap metninden paragraflı, markdown biçimli örnek yanıt"""
+    with open(SOURCE_PATH, "r", encoding="utf-8") as f:
+        words = f.read(length * 4).split()
+    paragraphs, current = [], []
+    for word in words:
+        current.append(word)
+        if len(" ".join(current)) > 380:
+            paragraphs.append(" ".join(current))
+            current = []
+    answer = "**Özet:**\n\n" + "\n\n".join(f"- {p}" if i % 3 == 2 else p for i, p in enumerate(paragraphs))
+    return answer[:length]
+
+
+async def chunk_stream(answer, chunk_chars, interval):
+    """Yanıtı sabit boyutlu parçalar halinde, parça arası bekleyerek akıt"""
+    for start in range(0, len(answer), chunk_chars):
+        if interval > 0:
+            await asyncio.sleep(interval)
+        yield answer[start:start + chunk_chars]
+
+
+async def collect_frames(answer, chunk_chars, interval, protocol):
+    window = Config.STREAM_COALESCE_MS / 1000
+    return [frame async for frame in stream_frames(
+        chunk_stream(answer, chunk_chars, interval), protocol, window, Config.STREAM_COALESCE_CHARS
+    )]
+
+
+def ws_header_bytes(payload):
+    """Sunucudan istemciye (maskesiz) websocket çerçeve başlığı"""
+    return 2 if payload < 126 else 4 if payload < 65536 else 10
+
+
+def deflated_wire_bytes(frames):
+    """permessage-deflate (bağlam paylaşımlı) ile kablodaki bayt"""
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    total = 0
+    for frame in frames:
+        data = compressor.compress(frame.encode("utf-8")) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        payload = len(data) - 4  # sondaki 00 00 ff ff gönderilmez
+        total += payload + ws_header_bytes(payload)
+    return total
+
+
+def client_render_work(frames):
+    """
+    İstemcinin markdown olarak parse ettiği karakter sayısı ve DOM yenilemeleri
+    (v1: her çerçevede tüm yanıt; v2: public/script.js renderStreamingDelta algoritması)
+    """
+    parsed, refreshes = 0, 0
+    text, committed_length, fences = "", 0, 0
+    for frame in map(json.loads, frames):
+        if frame["type"] == "bot_chunk":
+            parsed += len(frame["full_content"])
+            refreshes += 1
+        elif frame["type"] == "bot_delta":
+            text += frame["content"]
+            boundary = text.rfind("\n\n")
+            if boundary >= committed_length:
+                block = text[committed_length:boundary]
+                block_fences = fences + len(re.findall("```", block))
+                if block_fences % 2 == 0:
+                    parsed += len(block)
+                    committed_length, fences = boundary + 2, block_fences
+            parsed += len(text) - committed_length
+            refreshes += 1
+        elif frame["type"] == "bot_complete":
+            # Son hal tek seferde render edilir
+            parsed += len(frame.get("content", text))
+            refreshes += 1
+    return parsed, refreshes
+
+
+def decode_cpu_ms(frames):
+    """Tüm çerçevelerin JSON çözme CPU süresi (ms, tekrarların ortalaması)"""
+    started = time.process_time()
+    for _ in range(DECODE_REPEATS):
+        for frame in frames:
+            json.loads(frame)
+    return (time.process_time() - started) / DECODE_REPEATS * 1000
+
+
+def measure(answer, chunk_chars, interval, protocol):
+    frames = asyncio.run(collect_frames(answer, chunk_chars, interval, protocol))
+    payloads = [len(frame.encode("utf-8")) for frame in frames]
+    parsed, refreshes = client_render_work(frames)
+    return {
+        "frames": len(frames),
+        "payload": sum(payloads),
+        "wire": sum(payload + ws_header_bytes(payload) for payload in payloads),
+        "deflate": deflated_wire_bytes(frames),
+        "decode_ms": decode_cpu_ms(frames),
+        "parsed": parsed,
+        "refreshes": refreshes,
+    }
+
+
+def main():
+    length = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    chunk_chars = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    interval = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.02
+    answer = build_answer(length)
+    
+    scenarios = [
+        (f"canlı ({chunk_chars} kr / {interval * 1000:.0f} ms)", chunk_chars, interval),
+        (f"önbellek ({CACHED_ANSWER_CHUNK_CHARS} kr)", CACHED_ANSWER_CHUNK_CHARS, 0.0),
+    ]
+    print(f"\n📊 {len(answer)} karakterlik yanıt, v2 birleştirme {Config.STREAM_COALESCE_MS:g} ms / "
+          f"{Config.STREAM_COALESCE_CHARS} kr")
+    print(f"{'senaryo':<24} {'prot.':>5} {'çerçeve':>8} {'JSON bayt':>10} {'kablo':>9} {'deflate':>9} "
+          f"{'JSON çözme':>11} {'md parse kr':>12} {'DOM yenileme':>13}")
+    for name, size, wait in scenarios:
+        for protocol in (1, 2):
+            row = measure(answer, size, wait, protocol)
+            print(f"{name:<24} {'v' + str(protocol):>5} {row['frames']:>8} {row['payload']:>10} {row['wire']:>9} "
+                  f"{row['deflate']:>9} {row['decode_ms']:>8.2f} ms {row['parsed']:>12} {row['refreshes']:>13}")
+
+
+if __name__ == "__main__":
+    main()
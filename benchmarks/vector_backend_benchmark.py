@@ -0,0 +1,150 @@
+"""
+Vektör veritabanı backend benchmark'ı
+Chroma ve NumPy backend'lerini aynı rastgele (768 boyutlu, embedding-001 ile aynı)
+korpus üzerinde karşılaştırır: sorgu gecikmesi (p50/p95), aynı sorguların tek
+search_many çağrısıyla toplu aranmasında sorgu başına süre (sonuçların tekil
+aramayla uyumu dahil) ve açılış sonrası RSS. Her backend ölçümü temiz bir süreçte yapılır.
+
+Kullanım:
+    python benchmarks/vector_backend_benchmark.py [chunk_sayısı] [sorgu_sayısı]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+DIMENSION = 768
+COLLECTION = "benchmark_collection"
+
+
+def rss_mb() -> float:
+    """Sürecin güncel RSS değeri (MB)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def open_database(backend: str, db_path: str):
+    """Backend'i verilen dizinde aç"""
+    from config import Config
+    Config.VECTOR_DB_PATH = db_path
+    from vector_database import create_vector_database
+    return create_vector_database(backend)
+
+
+def build(backend: str, db_path: str, chunks: int):
+    """Rastgele korpusu backend'e yaz"""
+    vector_db = open_database(backend, db_path)
+    collection = vector_db.create_collection(COLLECTION)
+    rng = np.random.RandomState(0)
+    for start in range(0, chunks, 500):
+        end = min(chunks, start + 500)
+        vector_db.upsert_documents(
+            collection,
+            [f"chunk_{i}" for i in range(start, end)],
+            [f"chunk metni {i} " * 60 for i in range(start, end)],
+            rng.randn(end - start, DIMENSION).astype(np.float32).tolist(),
+            [{"source": "benchmark.txt", "chunk_index": i} for i in range(start, end)]
+        )
+
+
+def serve(backend: str, db_path: str, queries: int) -> dict:
+    """Mevcut indeksi aç ve sorgu gecikmesini ölç"""
+    baseline = rss_mb()
+    started = time.perf_counter()
+    vector_db = open_database(backend, db_path)
+    collection = vector_db.get_collection(COLLECTION)
+    vector_db.search_similar(collection, np.zeros(DIMENSION).tolist(), n_results=4)
+    open_seconds = time.perf_counter() - started
+    
+    rng = np.random.RandomState(1)
+    query_vectors = rng.randn(queries, DIMENSION).astype(np.float32).tolist()
+    latencies = []
+    single_ids = []
+    for query in query_vectors:
+        started = time.perf_counter()
+        results = vector_db.search_similar(collection, query, n_results=4)
+        latencies.append(time.perf_counter() - started)
+        single_ids.append(results["ids"][0])
+    
+    # Aynı sorgular tek toplu çağrıda
+    started = time.perf_counter()
+    batch = vector_db.search_many([collection], query_vectors, n_results=4)
+    batch_seconds = time.perf_counter() - started
+    offsets = batch["offsets"]
+    batch_match = np.mean([
+        list(batch["ids"][offsets[q]:offsets[q + 1]]) == list(ids) for q, ids in enumerate(single_ids)
+    ])
+    
+    latencies = np.array(latencies) * 1000
+    return {
+        "open_s": open_seconds,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "batch_ms_per_query": batch_seconds * 1000 / queries,
+        "batch_match": float(batch_match),
+        "rss_mb": rss_mb(),
+        "rss_delta_mb": rss_mb() - baseline,
+    }
+
+
+def run_child(*args) -> str:
+    """Ölçümü ayrı bir süreçte çalıştır, son satırı (JSON) döndür"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), *map(str, args)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return output.strip().splitlines()[-1]
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ("--build", "--serve"):
+        mode, backend, db_path, count = sys.argv[1:5]
+        if mode == "--build":
+            build(backend, db_path, int(count))
+            print("{}")
+        else:
+            print(json.dumps(serve(backend, db_path, int(count))))
+        return
+    
+    chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    print(f"📊 {chunks} chunk x {DIMENSION} boyut, {queries} sorgu (n_results=4)\n")
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        results = {}
+        for backend in ("chroma", "numpy"):
+            db_path = os.path.join(workdir, backend)
+            started = time.perf_counter()
+            run_child("--build", backend, db_path, chunks)
+            build_seconds = time.perf_counter() - started
+            results[backend] = json.loads(run_child("--serve", backend, db_path, queries))
+            results[backend]["build_s"] = build_seconds
+    
+    print(f"{'backend':<8} {'build':>8} {'açılış':>8} {'p50':>9} {'p95':>9} {'toplu/sorgu':>12} "
+          f"{'toplu uyum':>11} {'RSS':>9} {'RSS artışı':>11}")
+    for backend, r in results.items():
+        print(f"{backend:<8} {r['build_s']:>7.2f}s {r['open_s']:>7.2f}s {r['p50_ms']:>7.3f}ms "
+              f"{r['p95_ms']:>7.3f}ms {r['batch_ms_per_query']:>10.3f}ms {r['batch_match']:>11.0%} "
+              f"{r['rss_mb']:>7.1f}MB {r['rss_delta_mb']:>9.1f}MB")
+    speedup = results["chroma"]["p50_ms"] / results["numpy"]["p50_ms"]
+    print(f"\n⚡ NumPy p50 gecikmesi Chroma'ya göre {speedup:.1f}x")
+    batch_speedup = results["numpy"]["p50_ms"] / results["numpy"]["batch_ms_per_query"]
+    print(f"⚡ NumPy search_many sorgu başına tekil aramaya göre {batch_speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
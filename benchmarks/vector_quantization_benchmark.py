@@ -0,0 +1,122 @@
+"""
+Vektör saklama benchmark'ı
+NumPy backend'inin float16 / int8 (vektör başına ölçekli) ve kısaltılmış boyutlu
+saklama seçeneklerini tam float32 aramaya göre karşılaştırır: recall@k, sorgu
+gecikmesi, aramada taranan bellek ve disk boyutu.
+
+Korpus olarak mevcut bir NumPy indeksinin float32 embedding'leri verilebilir
+(ör. chroma_db/numpy_index/book_collection/embeddings.npy). Verilmezse gerçek
+embedding'lere benzer, düşük ranklı yapıya sahip sentetik vektörler kullanılır.
+Sorgular korpus vektörlerinin gürültülü kopyalarıdır.
+
+Kullanım:
+    python benchmarks/vector_quantization_benchmark.py [embeddings.npy] [sorgu_sayısı]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from numpy_vector_database import NumpyCollection, StorageOptions
+
+# (dtype, boyut, yeniden puanlama adayı)
+CONFIGURATIONS = [
+    ("float32", 0, 0),
+    ("float16", 0, 0),
+    ("float16", 0, 40),
+    ("int8", 0, 0),
+    ("int8", 0, 40),
+    ("float32", 256, 40),
+    ("int8", 256, 0),
+    ("int8", 256, 40),
+    ("int8", 128, 40),
+]
+RECALL_KS = (4, 10)
+
+
+def synthetic_corpus(chunks: int = 3000, dimension: int = 768, rank: int = 48) -> np.ndarray:
+    """Azalan spektrumlu düşük ranklı yapı + gürültü (embedding benzeri)"""
+    rng = np.random.RandomState(0)
+    latent = rng.randn(chunks, rank) * (1.0 / np.sqrt(np.arange(1, rank + 1)))
+    basis = rng.randn(rank, dimension)
+    vectors = latent @ basis + 0.3 * rng.randn(chunks, dimension)
+    return vectors.astype(np.float32)
+
+
+def make_queries(corpus: np.ndarray, count: int) -> np.ndarray:
+    """Korpus vektörlerinin gürültülü kopyaları"""
+    rng = np.random.RandomState(1)
+    picks = corpus[rng.randint(0, len(corpus), count)]
+    picks = picks / np.linalg.norm(picks, axis=1, keepdims=True)
+    noise = rng.randn(*picks.shape).astype(np.float32)
+    noise /= np.linalg.norm(noise, axis=1, keepdims=True)
+    return (picks + 0.6 * noise).astype(np.float32)
+
+
+def build(corpus: np.ndarray, path: str, options: StorageOptions) -> NumpyCollection:
+    """Korpusu verilen seçeneklerle diske yaz ve yeniden aç"""
+    collection = NumpyCollection("benchmark", path, options)
+    ids = [f"chunk_{i}" for i in range(len(corpus))]
+    collection.upsert(ids, ids, corpus.tolist(), [{"chunk_index": i} for i in range(len(corpus))])
+    return NumpyCollection("benchmark", path, options)
+
+
+def evaluate(collection: NumpyCollection, queries: np.ndarray, truth: dict) -> dict:
+    """recall@k ve gecikme ölç"""
+    latencies = []
+    hits = {k: 0 for k in RECALL_KS}
+    for i, query in enumerate(queries):
+        query = query.tolist()
+        started = time.perf_counter()
+        result = collection.query(query, max(RECALL_KS))
+        latencies.append(time.perf_counter() - started)
+        returned = result["ids"][0]
+        for k in RECALL_KS:
+            hits[k] += len(set(returned[:k]) & truth[k][i])
+    report = {f"recall@{k}": hits[k] / (k * len(queries)) for k in RECALL_KS}
+    report["p50_ms"] = float(np.percentile(np.array(latencies) * 1000, 50))
+    return report
+
+
+def main():
+    corpus_path = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1].endswith(".npy") else None
+    count = int(sys.argv[-1]) if len(sys.argv) > 1 and sys.argv[-1].isdigit() else 500
+    corpus = np.load(corpus_path).astype(np.float32) if corpus_path else synthetic_corpus()
+    queries = make_queries(corpus, count)
+    print(f"📊 Korpus: {corpus_path or 'sentetik'} ({corpus.shape[0]} x {corpus.shape[1]}), {count} sorgu\n")
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        # Doğruluk referansı: tam float32 arama
+        reference = build(corpus, os.path.join(workdir, "reference"), StorageOptions("float32", 0, 0, True))
+        truth = {k: [] for k in RECALL_KS}
+        for query in queries:
+            returned = reference.query(query.tolist(), max(RECALL_KS))["ids"][0]
+            for k in RECALL_KS:
+                truth[k].append(set(returned[:k]))
+        baseline = reference.storage_bytes()
+        
+        print(f"{'saklama':<16} {'rescore':>7} {'recall@4':>9} {'recall@10':>10} {'p50':>9} "
+              f"{'arama RAM':>10} {'disk':>9} {'disk (f32 yok)':>15}")
+        for dtype, dims, rescore in CONFIGURATIONS:
+            label = f"{dtype}/{dims or 'tam'}"
+            path = os.path.join(workdir, f"{dtype}_{dims}_{rescore}")
+            collection = build(corpus, path, StorageOptions(dtype, dims, rescore, True))
+            report = evaluate(collection, queries, truth)
+            storage = collection.storage_bytes()
+            # float32 kopyası tutulmadığında disk boyutu (yeniden puanlama yapılamaz)
+            compact_only = build(corpus, path + "_compact", StorageOptions(dtype, dims, 0, False))
+            print(f"{label:<16} {rescore or '-':>7} {report['recall@4']:>9.3f} {report['recall@10']:>10.3f} "
+                  f"{report['p50_ms']:>7.3f}ms {storage['search_bytes'] / 2**20:>8.2f}MB "
+                  f"{storage['disk_bytes'] / 2**20:>7.2f}MB {compact_only.storage_bytes()['disk_bytes'] / 2**20:>13.2f}MB")
+    
+    print(f"\nReferans (float32/tam): arama RAM {baseline['search_bytes'] / 2**20:.2f}MB, "
+          f"disk {baseline['disk_bytes'] / 2**20:.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
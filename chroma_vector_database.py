@@ -0,0 +1,399 @@
+"""
+Chroma vektör veritabanı modülü
+Bu modül Chroma vektör veritabanı işlemlerini yönetir.
+"""
+
+import chromadb
+from chromadb.config import Settings
+from typing import List, Dict, Any, Optional
+import os
+import numpy as np
+from config import Config
+from vector_database import SearchBlock, VectorDatabase, empty_search_block, fill_search_row
+
+# Toplu aramada tek collection.query çağrısına verilen sorgu sayısı
+QUERY_BATCH_SIZE = 256
+# Koleksiyon merkezi hesaplanırken tek collection.get çağrısıyla okunan embedding sayısı
+CENTROID_PAGE_SIZE = 2000
+
+class ChromaVectorDatabase(VectorDatabase):
+    """Chroma vektör veritabanı sınıfı"""
+    
+    def __init__(self):
+        """Chroma istemcisini başlat"""
+        try:
+            # Render platformu tespiti
+            is_render = os.getenv("RENDER") == "true"
+            
+            # Veritabanı dizininin var olduğundan emin ol
+            if not os.path.exists(Config.VECTOR_DB_PATH):
+                os.makedirs(Config.VECTOR_DB_PATH, exist_ok=True)
+                print(f"📁 Veritabanı dizini oluşturuldu: {Config.VECTOR_DB_PATH}")
+            
+            # Render'da persistent disk kontrolü
+            if is_render:
+                # Render persistent disk mount kontrolü
+                mount_path = "/var/data"
+                if not os.path.exists(mount_path):
+                    print(f"⚠️ Persistent disk mount edilmemiş: {mount_path}")
+                    print("🔄 Memory-only veritabanına geçiliyor...")
+                    self._init_memory_client()
+                    return
+                
+                # Disk yazma izni kontrolü
+                test_file = os.path.join(mount_path, "write_test.tmp")
+                try:
+                    with open(test_file, 'w') as f:
+                        f.write("test")
+                    os.remove(test_file)
+                    print(f"✅ Persistent disk yazma izni OK: {mount_path}")
+                except Exception as write_error:
+                    print(f"⚠️ Persistent disk yazma hatası: {write_error}")
+                    print("🔄 Memory-only veritabanına geçiliyor...")
+                    self._init_memory_client()
+                    return
+            
+            # Normal persistent client başlatma
+            self._init_persistent_client()
+        
+        except Exception as e:
+            print(f"❌ Vektör veritabanı başlatma hatası: {e}")
+            print("🔄 Memory-only veritabanına geçiliyor...")
+            self._init_memory_client()
+    
+    def _init_persistent_client(self):
+        """Persistent Chroma client başlat"""
+        try:
+            # Eski database dosyalarını temizle eğer permission sorunu varsa
+            db_file = os.path.join(Config.VECTOR_DB_PATH, "chroma.sqlite3")
+            if os.path.exists(db_file):
+                try:
+                    # Dosya izinlerini kontrol et ve düzelt
+                    import stat
+                    current_permissions = os.stat(db_file).st_mode
+                    os.chmod(db_file, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IWGRP)
+                except Exception as perm_error:
+                    print(f"⚠️ Dosya izinleri düzeltilemedi: {perm_error}")
+                    # Sorunlu dosyayı sil ve yeniden oluştur
+                    try:
+                        os.remove(db_file)
+                        print("🔄 Sorunlu veritabanı dosyası silindi, yenisi oluşturulacak")
+                    except:
+                        print("❌ Sorunlu veritabanı dosyası silinemedi")
+            
+            self.client = chromadb.PersistentClient(
+                path=Config.VECTOR_DB_PATH,
+                settings=Settings(
+                    anonymized_telemetry=False,
+                    allow_reset=True,
+                    is_persistent=True
+                )
+            )
+            print(f"✅ Persistent vektör veritabanı başlatıldı: {Config.VECTOR_DB_PATH}")
+        
+        except Exception as e:
+            print(f"❌ Persistent client hatası: {e}")
+            raise e
+    
+    def _init_memory_client(self):
+        """Memory-only Chroma client başlat"""
+        try:
+            print("🔄 Memory-only veritabanına geçiliyor...")
+            self.client = chromadb.Client(
+                settings=Settings(
+                    anonymized_telemetry=False,
+                    allow_reset=True,
+                    is_persistent=False
+                )
+            )
+            print("✅ Memory-only vektör veritabanı başlatıldı")
+        
+        except Exception as e:
+            print(f"❌ Memory client hatası: {e}")
+            # Son çare: basit in-memory client
+            try:
+                import chromadb
+                self.client = chromadb.Client()
+                print("✅ Basit memory client başlatıldı")
+            except Exception as final_error:
+                print(f"❌ Tüm client seçenekleri başarısız: {final_error}")
+                raise final_error
+    
+    def create_collection(self, collection_name: str) -> chromadb.Collection:
+        """
+        Koleksiyon oluştur veya mevcut olanı al
+        
+        Args:
+            collection_name: Koleksiyon adı
+        
+        Returns:
+            Chroma koleksiyonu
+        """
+        try:
+            # Önce koleksiyonu silmeye çalış (yeniden oluşturmak için)
+            try:
+                self.client.delete_collection(collection_name)
+                print(f"🗑️  Eski koleksiyon silindi: {collection_name}")
+            except:
+                pass
+            
+            collection = self.client.create_collection(
+                name=collection_name,
+                metadata={"hnsw:space": "cosine"}
+            )
+            print(f"✅ Koleksiyon oluşturuldu: {collection_name}")
+            return collection
+        
+        except Exception as e:
+            print(f"❌ Koleksiyon oluşturma hatası: {e}")
+            raise
+    
+    def get_or_create_collection(self, collection_name: str) -> chromadb.Collection:
+        """
+        Koleksiyonu silmeden al, yoksa oluştur
+        
+        Args:
+            collection_name: Koleksiyon adı
+        
+        Returns:
+            Chroma koleksiyonu
+        """
+        try:
+            collection = self.client.get_or_create_collection(
+                name=collection_name,
+                metadata={"hnsw:space": "cosine"}
+            )
+            print(f"✅ Koleksiyon hazır: {collection_name}")
+            return collection
+        
+        except Exception as e:
+            print(f"❌ Koleksiyon açma hatası: {e}")
+            raise
+    
+    def count(self, collection: chromadb.Collection) -> int:
+        """
+        Koleksiyondaki döküman sayısını döndür
+        
+        Args:
+            collection: Koleksiyon
+        """
+        try:
+            return collection.count()
+        except Exception:
+            return 0
+    
+    def get_ids(self, collection: chromadb.Collection) -> List[str]:
+        """
+        Koleksiyondaki tüm döküman ID'lerini döndür
+        
+        Args:
+            collection: Koleksiyon
+        """
+        try:
+            return collection.get(include=[])["ids"]
+        except Exception as e:
+            print(f"⚠️ ID listesi alınamadı: {e}")
+            return []
+    
+    def upsert_documents(self, collection: chromadb.Collection, ids: List[str], texts: List[str],
+                         embeddings: List[List[float]], metadatas: List[Dict[str, Any]]):
+        """
+        Dökümanları verilen ID'lerle ekle veya güncelle
+        
+        Args:
+            collection: Hedef koleksiyon
+            ids: Döküman ID'leri
+            texts: Metinler
+            embeddings: Embedding vektörleri
+            metadatas: Metadata bilgileri
+        """
+        if not ids:
+            return
+        try:
+            collection.upsert(
+                ids=ids,
+                documents=texts,
+                embeddings=embeddings,
+                metadatas=metadatas
+            )
+            print(f"✅ {len(ids)} döküman koleksiyona yazıldı")
+        
+        except Exception as e:
+            print(f"❌ Döküman yazma hatası: {e}")
+            raise
+    
+    def update_metadatas(self, collection: chromadb.Collection, ids: List[str],
+                         metadatas: List[Dict[str, Any]]):
+        """
+        Embedding'e dokunmadan metadata bilgilerini güncelle
+        
+        Args:
+            collection: Hedef koleksiyon
+            ids: Döküman ID'leri
+            metadatas: Yeni metadata bilgileri
+        """
+        if not ids:
+            return
+        try:
+            collection.update(ids=ids, metadatas=metadatas)
+        except Exception as e:
+            print(f"❌ Metadata güncelleme hatası: {e}")
+            raise
+    
+    def get_metadatas(self, collection: chromadb.Collection, ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        ID'lerin kayıtlı metadata bilgilerini döndür
+        
+        Args:
+            collection: Koleksiyon
+            ids: Döküman ID'leri
+        
+        Returns:
+            ID sırasıyla metadata listesi (bulunamayanlar için None)
+        """
+        if not ids:
+            return []
+        try:
+            result = collection.get(ids=ids, include=["metadatas"])
+        except Exception as e:
+            print(f"⚠️ Metadata okunamadı: {e}")
+            return [None] * len(ids)
+        found = dict(zip(result["ids"], result["metadatas"]))
+        return [found.get(doc_id) for doc_id in ids]
+    
+    def delete_documents(self, collection: chromadb.Collection, ids: List[str]):
+        """
+        Verilen ID'lere sahip dökümanları sil
+        
+        Args:
+            collection: Hedef koleksiyon
+            ids: Silinecek döküman ID'leri
+        """
+        if not ids:
+            return
+        try:
+            collection.delete(ids=ids)
+            print(f"🗑️  {len(ids)} eski döküman silindi")
+        
+        except Exception as e:
+            print(f"❌ Döküman silme hatası: {e}")
+            raise
+    
+    def add_documents(self, collection: chromadb.Collection, texts: List[str], 
+                     embeddings: List[List[float]], metadatas: List[Dict[str, Any]] = None):
+        """
+        Koleksiyona dökümanlar ekle
+        
+        Args:
+            collection: Hedef koleksiyon
+            texts: Metinler
+            embeddings: Embedding vektörleri
+            metadatas: Metadata bilgileri
+        """
+        try:
+            if not metadatas:
+                metadatas = [{"index": i} for i in range(len(texts))]
+            
+            ids = [f"doc_{i}" for i in range(len(texts))]
+            
+            collection.add(
+                documents=texts,
+                embeddings=embeddings,
+                metadatas=metadatas,
+                ids=ids
+            )
+            
+            print(f"✅ {len(texts)} döküman koleksiyona eklendi")
+        
+        except Exception as e:
+            print(f"❌ Döküman ekleme hatası: {e}")
+            raise
+    
+    def search_similar(self, collection: chromadb.Collection, query_embedding: List[float], 
+                      n_results: int = 3) -> Dict[str, Any]:
+        """
+        Benzer dökümanları ara
+        
+        Args:
+            collection: Arama yapılacak koleksiyon
+            query_embedding: Sorgu embedding'i
+            n_results: Döndürülecek sonuç sayısı
+        
+        Returns:
+            Arama sonuçları
+        """
+        try:
+            results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=n_results
+            )
+            
+            return results
+        
+        except Exception as e:
+            print(f"❌ Arama hatası: {e}")
+            return {"documents": [[]], "distances": [[]], "metadatas": [[]]}
+    
+    def _search_block(self, collection: chromadb.Collection, queries: np.ndarray, k: int) -> SearchBlock:
+        """Sorguları collection.query'ye toplu olarak ver (sorgu başına bir çağrı yerine)"""
+        block = empty_search_block(len(queries), k)
+        if k <= 0:
+            return block
+        try:
+            for start in range(0, len(queries), QUERY_BATCH_SIZE):
+                batch = queries[start:start + QUERY_BATCH_SIZE]
+                results = collection.query(
+                    query_embeddings=batch.tolist(),
+                    n_results=k,
+                    include=["documents", "metadatas", "distances"]
+                )
+                for position in range(len(batch)):
+                    fill_search_row(block, start + position, results, position)
+        except Exception as e:
+            print(f"❌ Toplu arama hatası: {e}")
+        return block
+    
+    def collection_centroid(self, collection: chromadb.Collection) -> Optional[np.ndarray]:
+        """Embedding'leri sayfa sayfa okuyarak koleksiyon merkezini hesapla"""
+        try:
+            total, count = None, 0
+            for offset in range(0, collection.count(), CENTROID_PAGE_SIZE):
+                page = collection.get(include=["embeddings"], limit=CENTROID_PAGE_SIZE, offset=offset)
+                vectors = np.asarray(page["embeddings"], dtype=np.float32)
+                if not len(vectors):
+                    break
+                vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+                total = vectors.sum(axis=0) if total is None else total + vectors.sum(axis=0)
+                count += len(vectors)
+            return total / count if count else None
+        except Exception as e:
+            print(f"⚠️ Koleksiyon merkezi hesaplanamadı: {e}")
+            return None
+    
+    def get_collection(self, collection_name: str) -> Optional[chromadb.Collection]:
+        """
+        Mevcut koleksiyonu al
+        
+        Args:
+            collection_name: Koleksiyon adı
+        
+        Returns:
+            Chroma koleksiyonu veya None
+        """
+        try:
+            return self.client.get_collection(collection_name)
+        except:
+            return None
+    
+    def list_collections(self) -> List[str]:
+        """
+        Mevcut koleksiyonları listele
+        
+        Returns:
+            Koleksiyon adlarının listesi
+        """
+        try:
+            collections = self.client.list_collections()
+            return [col.name for col in collections]
+        except:
+            return []
@@ -14,16 +14,155 @@ class Config:
     # API Keys
     GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
     
+    # LLM / embedding backend'i: gemini | fake (ağ ve API anahtarı gerektirmeyen,
+    # gecikmesi ayarlanabilir deterministik yerel backend; yük testi ve profilleme için)
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+    
+    # Sahte backend: gecikme dağılımları "tür:parametreler" (ms) biçimindedir, örn.
+    # const:300 | uniform:200:600 | normal:400:80 | lognormal:350:0.4 (medyan, sigma)
+    FAKE_LLM_LATENCY = os.getenv("FAKE_LLM_LATENCY", "lognormal:400:0.3")  # ilk token'a kadar
+    FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", 80))
+    FAKE_LLM_RESPONSE_TOKENS = int(os.getenv("FAKE_LLM_RESPONSE_TOKENS", 200))
+    FAKE_LLM_CHUNK_TOKENS = int(os.getenv("FAKE_LLM_CHUNK_TOKENS", 8))  # streaming parça başına
+    FAKE_EMBED_LATENCY = os.getenv("FAKE_EMBED_LATENCY", "normal:60:15")  # istek başına
+    # Gecikme sıçraması ve hata enjeksiyonu (dayanıklılık katmanını denemek için)
+    FAKE_LLM_SPIKE_RATE = float(os.getenv("FAKE_LLM_SPIKE_RATE", 0))
+    FAKE_LLM_SPIKE_LATENCY = os.getenv("FAKE_LLM_SPIKE_LATENCY", "uniform:3000:8000")
+    FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", 0))
+    FAKE_EMBEDDING_DIMENSIONS = int(os.getenv("FAKE_EMBEDDING_DIMENSIONS", 768))
+    FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", 0))
+    
     # Embedding Settings - Google'ın embedding modeli
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "models/embedding-001")
     
+    # Embedding Batch / Rate Limit Settings
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 100))  # istek başına metin
+    EMBEDDING_REQUESTS_PER_MINUTE = int(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", 600))
+    EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", 4))
+    EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", 5))
+    
     # Chunk Settings
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 1000))
     CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 200))
+    CHUNK_MODE = os.getenv("CHUNK_MODE", "compat")  # compat | sentence
+    # Akış halinde ingestion'da tek seferde embed edilip yazılan chunk sayısı
+    INGEST_GROUP_SIZE = int(os.getenv("INGEST_GROUP_SIZE", 400))
+    
+    # Near-duplicate chunk eleme (kelime shingle Jaccard eşiği, 0 ise kapalı; ör. 0.9)
+    DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0))
+    DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", 64))
+    DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", 5))
+    
+    # Final prompt'taki bağlam metni için token bütçesi (0 ise sınırsız)
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 1500))
     
     # Vector DB Settings - Render uyumlu path
     VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", "/var/data/chroma_db" if os.getenv("RENDER") else "./chroma_db")
     
+    # Vektör veritabanı backend'i: chroma | numpy (bellek eşlemeli float32 matris)
+    VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+    
+    # NumPy backend'i için vektör saklama: float32 | float16 | int8 (vektör başına ölçekli)
+    VECTOR_STORAGE_DTYPE = os.getenv("VECTOR_STORAGE_DTYPE", "float32")
+    # Saklanan/aranan boyut sayısı (0 ise tam boyut)
+    VECTOR_STORAGE_DIMENSIONS = int(os.getenv("VECTOR_STORAGE_DIMENSIONS", 0))
+    # Sıkıştırılmış aramadan sonra float32 ile yeniden puanlanacak aday sayısı (0 ise kapalı)
+    VECTOR_RESCORE_CANDIDATES = int(os.getenv("VECTOR_RESCORE_CANDIDATES", 40))
+    # Yeniden puanlama için tam float32 kopyayı diskte tut (kapalıysa disk tasarrufu artar)
+    VECTOR_KEEP_FLOAT32 = os.getenv("VECTOR_KEEP_FLOAT32", "true").lower() == "true"
+    
+    # Yarıda kalan embedding işlerinin checkpoint dizini
+    EMBEDDING_CHECKPOINT_DIR = os.getenv("EMBEDDING_CHECKPOINT_DIR", os.path.join(VECTOR_DB_PATH, "checkpoints"))
+    
+    # Embedding önbelleği (boş bırakılırsa kapalı)
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(VECTOR_DB_PATH, "embedding_cache.sqlite3"))
+    EMBEDDING_CACHE_MEMORY_ITEMS = int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", 2048))
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 100000))
+    
+    # Kaynak kararı: llm (her soruda karar çağrısı) | local (koleksiyon merkezlerine göre,
+    # en iyi iki skor arasındaki fark ROUTER_MARGIN'in altındaysa LLM'e düşer)
+    QUERY_ROUTING = os.getenv("QUERY_ROUTING", "llm")
+    ROUTER_MARGIN = float(os.getenv("ROUTER_MARGIN", 0.03))
+    ROUTER_MIN_SIMILARITY = float(os.getenv("ROUTER_MIN_SIMILARITY", 0.0))
+    
+    # Agent modu: decision (karar çağrısı + yanıt çağrısı) | function_calling (arama araçları
+    # native function declaration olarak verilir, arama gerekmeyen sorular tek çağrıda yanıtlanır)
+    AGENT_MODE = os.getenv("AGENT_MODE", "decision")
+    
+    # Model katmanları: MODEL_TIERING large (varsayılan) | fast ile her yanıt aynı katmanda
+    # üretilir. budget (isteğe bağlı) ile karar çağrısı ve kısa/net sorular hızlı modele gider;
+    # diğer sorularda büyük modelin gözlenen p95 ilk parça süresi isteğin gecikme bütçesine
+    # sığmıyorsa yine hızlı model
+    FAST_MODEL = os.getenv("FAST_MODEL", "gemini-2.5-flash-lite")
+    LARGE_MODEL = os.getenv("LARGE_MODEL", "gemini-2.5-flash")
+    MODEL_TIERING = os.getenv("MODEL_TIERING", "large")
+    DECISION_MODEL = os.getenv("DECISION_MODEL", LARGE_MODEL if MODEL_TIERING == "large" else FAST_MODEL)
+    LATENCY_BUDGET_SECONDS = float(os.getenv("LATENCY_BUDGET_SECONDS", 4))  # ilk parçaya kadar, istek başına varsayılan
+    TIER_SHORT_QUESTION_WORDS = int(os.getenv("TIER_SHORT_QUESTION_WORDS", 6))
+    TIER_MIN_SAMPLES = int(os.getenv("TIER_MIN_SAMPLES", 5))  # gözlenen p95 için gereken yanıt
+    TIER_PROBE_SECONDS = float(os.getenv("TIER_PROBE_SECONDS", 30))  # büyük modeli ara sıra yokla
+    
+    # Karar LLM'e sorulurken tüm kaynaklarda aramayı eşzamanlı başlat (kullanılmayan sonuçlar atılır)
+    SPECULATIVE_RETRIEVAL = os.getenv("SPECULATIVE_RETRIEVAL", "true").lower() == "true"
+    
+    # Async istek hattı: LLM çağrılarında SDK'nın async metotları (false ise senkron
+    # akış thread'de çalıştırılıp köprülenir) ve bloklayan işler için thread sayısı
+    ASYNC_LLM = os.getenv("ASYNC_LLM", "true").lower() == "true"
+    BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", 16))
+    
+    # Semantik yanıt önbelleği (isteğe bağlı, varsayılan kapalı): soru embedding'i benzerliği
+    # eşiği aşarsa kayıtlı yanıt döner. Kısa kalıp sorular ("X nedir?") farklı konularda da
+    # eşiği aşabilir; açmadan önce eşik gerçek soru çiftleriyle ayarlanmalıdır
+    ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "false").lower() == "true"
+    ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", 0.95))
+    ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", 86400))
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", 1000))
+    
+    # Dayanıklılık katmanı: aşama süre sınırları (saniye), hedged istekler, devre kesici
+    LLM_RESILIENCE = os.getenv("LLM_RESILIENCE", "true").lower() == "true"
+    LLM_DECISION_TIMEOUT = float(os.getenv("LLM_DECISION_TIMEOUT", 6))
+    LLM_FIRST_TOKEN_TIMEOUT = float(os.getenv("LLM_FIRST_TOKEN_TIMEOUT", 12))
+    LLM_STREAM_IDLE_TIMEOUT = float(os.getenv("LLM_STREAM_IDLE_TIMEOUT", 10))  # parçalar arası
+    LLM_ANSWER_TIMEOUT = float(os.getenv("LLM_ANSWER_TIMEOUT", 60))  # yanıt üretiminin tamamı
+    EMBED_QUERY_TIMEOUT = float(os.getenv("EMBED_QUERY_TIMEOUT", 4))
+    EMBED_BATCH_TIMEOUT = float(os.getenv("EMBED_BATCH_TIMEOUT", 60))
+    RETRIEVAL_TIMEOUT = float(os.getenv("RETRIEVAL_TIMEOUT", 10))  # spekülatif arama beklemesi
+    # Karar ve sorgu embedding'i son çağrıların HEDGE_PERCENTILE'ını aşarsa kopyası gönderilir
+    HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "true").lower() == "true"
+    HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", 95))
+    HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", 20))
+    HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", 0.05))
+    HEDGE_MAX_RATE = float(os.getenv("HEDGE_MAX_RATE", 0.1))  # kopya isteklerin çağrılara oranı üst sınırı
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", 5))
+    BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", 30))
+    
+    # Aynı anda sorulan aynı (normalize) soruları tek upstream akışta birleştir
+    SINGLEFLIGHT_ENABLED = os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() == "true"
+    
+    # Websocket kabul kontrolü: eşzamanlı yanıt üretimi sınırı ve bekleme kuyruğu, aşılırsa
+    # "meşgul, N sn sonra tekrar deneyin" (0 olan sınırlar kapalıdır). Okul / NAT arkasındaki
+    # sınıflar tek IP'den bağlandığından IP sınırları bir sınıfı kaldıracak kadar geniş tutulur.
+    ADMISSION_MAX_INFLIGHT = int(os.getenv("ADMISSION_MAX_INFLIGHT", 16))
+    ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", 64))
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 30))
+    ADMISSION_MAX_CONNECTIONS_PER_IP = int(os.getenv("ADMISSION_MAX_CONNECTIONS_PER_IP", 64))
+    ADMISSION_MAX_REQUESTS_PER_IP = int(os.getenv("ADMISSION_MAX_REQUESTS_PER_IP", 40))  # üretilen + bekleyen
+    ADMISSION_QUESTIONS_PER_MINUTE = float(os.getenv("ADMISSION_QUESTIONS_PER_MINUTE", 12))  # bağlantı başına
+    ADMISSION_QUESTION_BURST = float(os.getenv("ADMISSION_QUESTION_BURST", 4))
+    # İstemci IP'si X-Forwarded-For başlığından alınır (yalnızca proxy arkasında, örn. Render)
+    ADMISSION_TRUST_FORWARDED = os.getenv(
+        "ADMISSION_TRUST_FORWARDED", "true" if os.getenv("RENDER") else "false"
+    ).lower() == "true"
+    
+    # Websocket akış protokolü v2: parçalar bu pencerede / uzunlukta birleştirilip delta olarak
+    # gönderilir; permessage-deflate sıkıştırması (istemci destekliyorsa)
+    STREAM_COALESCE_MS = float(os.getenv("STREAM_COALESCE_MS", 40))
+    STREAM_COALESCE_CHARS = int(os.getenv("STREAM_COALESCE_CHARS", 512))
+    WS_PER_MESSAGE_DEFLATE = os.getenv("WS_PER_MESSAGE_DEFLATE", "true").lower() == "true"
+    
+    # Önceden oluşturulmuş indeks snapshot'ı (python main.py build-index)
+    SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "./index_snapshot")
+    
     # Collection Names
     TRANSCRIPT_COLLECTION = "transcript_collection"
     BOOK_COLLECTION = "book_collection"
@@ -32,14 +171,59 @@ class Config:
     TRANSCRIPT_FILE = "transcript.txt"
     BOOK_FILE = "kitap.txt"
     
+    # Korpus kaynakları: "koleksiyon=glob;koleksiyon=glob" (ör. "book_collection=kitaplar/**/*.txt")
+    # Boş bırakılırsa transcript ve kitap dosyaları kullanılır. Agent araçları ve yönlendirici
+    # yalnızca transcript ve kitap koleksiyonlarını tanır; başka koleksiyon adları reddedilir
+    CORPUS_SOURCES = os.getenv("CORPUS_SOURCES", "")
+    
+    # Dosya okuma/parçalama için process sayısı
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", min(4, os.cpu_count() or 1)))
+    
+    @classmethod
+    def corpus_sources(cls):
+        """(koleksiyon adı, glob deseni) çiftlerini döndür"""
+        if not cls.CORPUS_SOURCES.strip():
+            return [
+                (cls.TRANSCRIPT_COLLECTION, cls.TRANSCRIPT_FILE),
+                (cls.BOOK_COLLECTION, cls.BOOK_FILE)
+            ]
+        
+        sources = []
+        for item in cls.CORPUS_SOURCES.split(";"):
+            if not item.strip():
+                continue
+            name, _, pattern = item.partition("=")
+            name = name.strip()
+            if not pattern.strip():
+                raise ValueError(f"Geçersiz CORPUS_SOURCES girdisi: {item}")
+            if name not in (cls.TRANSCRIPT_COLLECTION, cls.BOOK_COLLECTION):
+                raise ValueError(
+                    f"Bilinmeyen koleksiyon '{name}': CORPUS_SOURCES yalnızca "
+                    f"{cls.TRANSCRIPT_COLLECTION} ve {cls.BOOK_COLLECTION} kabul eder"
+                )
+            if name in (source[0] for source in sources):
+                raise ValueError(f"Koleksiyon CORPUS_SOURCES içinde birden fazla kez geçiyor: {name}")
+            sources.append((name, pattern.strip()))
+        return sources
+    
+    @classmethod
+    def embedding_signature(cls) -> str:
+        """
+        Embedding uzayının kimliği (chunk ID'leri, embedding önbelleği ve snapshot
+        uyumluluğu için). Sahte backend'in vektörleri gerçek modelinkilerle karışmaz.
+        """
+        if cls.LLM_BACKEND == "fake":
+            return f"fake-{cls.FAKE_EMBEDDING_DIMENSIONS}d-{cls.FAKE_LLM_SEED}/{cls.EMBEDDING_MODEL}"
+        return cls.EMBEDDING_MODEL
+    
     @classmethod
     def validate_config(cls):
         """Konfigürasyonu doğrula"""
         missing_keys = []
         
-        if not cls.GOOGLE_API_KEY:
+        if not cls.GOOGLE_API_KEY and cls.LLM_BACKEND != "fake":
             missing_keys.append("GOOGLE_API_KEY")
-            
+        
         if missing_keys:
             print("⚠️  Eksik API anahtarları:")
             for key in missing_keys:
@@ -47,4 +231,10 @@ class Config:
             print("Lütfen .env dosyasını kontrol edin.")
             return False
         
+        try:
+            cls.corpus_sources()
+        except ValueError as e:
+            print(f"⚠️  {e}")
+            return False
+        
         return True
@@ -0,0 +1,213 @@
+"""
+Bağlam oluşturma modülü
+Bu modül arama sonuçlarından final prompt'un bağlam metnini oluşturur:
+komşu chunk'ları birleştirip örtüşen bölgeleri atar, mesafeye göre sıralar
+ve bağlamı token bütçesine sığdırır. Ingestion sırasında near-duplicate olarak
+elenen chunk'ların yeri boş kalır; aradaki tüm chunk'lar elenmişse iki chunk
+yine komşu sayılır.
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Kelime ve noktalama işaretleri; uzun kelimeler birden fazla token sayılır
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+CHARS_PER_WORD_TOKEN = 4
+# Byte konumu olmayan chunk'larda metinden aranan örtüşmenin en kısa uzunluğu
+MIN_TEXT_OVERLAP = 8
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Hızlı, yerel token tahmini (API çağrısı yapmaz)
+    
+    Args:
+        text: Metin
+    
+    Returns:
+        Yaklaşık token sayısı
+    """
+    return sum(
+        (len(piece) + CHARS_PER_WORD_TOKEN - 1) // CHARS_PER_WORD_TOKEN
+        for piece in TOKEN_PATTERN.findall(text)
+    )
+
+
+def _strip_overlap(previous: str, following: str) -> str:
+    """
+    Önceki metnin sonuyla örtüşen en uzun baş kısmı at (byte konumu yoksa metinden
+    bulunur). Tesadüfi eşleşmeleri önlemek için örtüşme en az MIN_TEXT_OVERLAP
+    karakter (veya chunk'ın tamamı) olmalıdır.
+    """
+    probe = following[:MIN_TEXT_OVERLAP]
+    if not probe:
+        return following
+    position = previous.find(probe, max(0, len(previous) - len(following)))
+    while position >= 0:
+        tail = previous[position:]
+        if following.startswith(tail):
+            return following[len(tail):]
+        position = previous.find(probe, position + 1)
+    return following
+
+
+class ContextBuilder:
+    """Token bütçeli bağlam oluşturucu"""
+    
+    def __init__(self, token_budget: int,
+                 duplicate_of: Optional[Callable[[str, int], Optional[str]]] = None):
+        """
+        Args:
+            token_budget: Bağlam metni için maksimum token (0 veya negatifse sınırsız)
+            duplicate_of: (kaynak, chunk_index) -> elenen chunk'ın yerine tutulan chunk ID'si
+                (ör. IndexManifest.duplicate_of; None ise elenen chunk yok sayılır)
+        """
+        self.token_budget = token_budget
+        self.duplicate_of = duplicate_of
+    
+    @staticmethod
+    def _collect_hits(results: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Araç sonuçlarını tek tip kayıtlara dönüştür"""
+        hits = []
+        for label, result in results:
+            documents = result.get('documents') or []
+            metadatas = result.get('metadatas') or []
+            distances = result.get('distances') or []
+            for i, document in enumerate(documents):
+                if not document:
+                    continue
+                metadata = (metadatas[i] if i < len(metadatas) else None) or {}
+                hits.append({
+                    'label': label,
+                    'text': document,
+                    'source': metadata.get('source'),
+                    'chunk_index': metadata.get('chunk_index'),
+                    'start_byte': metadata.get('start_byte'),
+                    'end_byte': metadata.get('end_byte'),
+                    'distance': distances[i] if i < len(distances) else float(i),
+                })
+        return hits
+    
+    def _is_adjacent(self, previous: Dict[str, Any], following: Dict[str, Any]) -> bool:
+        """
+        İki chunk aynı dosyada art arda mı (aradakilerin hepsi near-duplicate olarak
+        elenmiş olabilir) veya byte aralıkları örtüşüyor mu?
+        """
+        if following['chunk_index'] == previous['chunk_index'] + 1:
+            return True
+        if previous['end_byte'] is not None and following['start_byte'] is not None:
+            if following['start_byte'] <= previous['end_byte']:
+                return True
+        if self.duplicate_of is None or following['chunk_index'] <= previous['chunk_index']:
+            return False
+        return all(
+            self.duplicate_of(following['source'], chunk_index) is not None
+            for chunk_index in range(previous['chunk_index'] + 1, following['chunk_index'])
+        )
+    
+    @staticmethod
+    def _append(segment: Dict[str, Any], hit: Dict[str, Any]):
+        """Chunk'ı segmentin sonuna örtüşmesiz olarak ekle"""
+        if segment['end_byte'] is not None and hit['start_byte'] is not None:
+            overlap = segment['end_byte'] - hit['start_byte']
+            encoded = hit['text'].encode('utf-8')
+            if overlap >= len(encoded):
+                return  # chunk tamamen segmentin içinde
+            if overlap > 0:
+                addition = encoded[overlap:].decode('utf-8')
+                separator = ""
+            else:
+                addition = hit['text']
+                separator = " "
+        else:
+            addition = _strip_overlap(segment['text'], hit['text'])
+            separator = "" if len(addition) < len(hit['text']) else " "
+        
+        segment['text'] += separator + addition
+        segment['end_byte'] = hit['end_byte']
+        segment['chunk_index'] = hit['chunk_index']
+        segment['distance'] = min(segment['distance'], hit['distance'])
+        segment['merged'] += 1
+    
+    def _merge(self, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Aynı dosyadaki komşu chunk'ları tek segmentte birleştir"""
+        segments = []
+        groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        seen = set()
+        for hit in hits:
+            # Aynı chunk iki kez gelirse (ör. tekrarlanan arama) bir kez kullan
+            key = (hit['label'], hit['source'], hit['chunk_index'], hit['text'])
+            if key in seen:
+                continue
+            seen.add(key)
+            if hit['source'] is None or hit['chunk_index'] is None:
+                segments.append(dict(hit, merged=1))
+            else:
+                groups.setdefault((hit['label'], hit['source']), []).append(hit)
+        
+        for group in groups.values():
+            group.sort(key=lambda hit: hit['chunk_index'])
+            segment = None
+            for hit in group:
+                if segment is not None and self._is_adjacent(segment, hit):
+                    self._append(segment, hit)
+                else:
+                    segment = dict(hit, merged=1)
+                    segments.append(segment)
+        return segments
+    
+    def _truncate(self, text: str, budget: int) -> str:
+        """Metni kelime sınırında bütçeye sığacak şekilde kısalt"""
+        words = text.split(" ")
+        low, high = 0, len(words)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if estimate_tokens(" ".join(words[:middle])) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        return " ".join(words[:low])
+    
+    def build(self, results: List[Tuple[str, Dict[str, Any]]]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Arama sonuçlarından bağlam metnini oluştur
+        
+        Args:
+            results: (kaynak etiketi, arama sonucu) çiftleri; sonuçta 'documents' ve
+                varsa 'metadatas' / 'distances' listeleri bulunur
+        
+        Returns:
+            (bağlam metni, rapor) - rapor token tahminlerini ve tasarrufu içerir
+        """
+        hits = self._collect_hits(results)
+        naive_tokens = estimate_tokens("\n\n".join(hit['text'] for hit in hits))
+        
+        segments = sorted(self._merge(hits), key=lambda segment: segment['distance'])
+        
+        selected: List[str] = []
+        used_tokens = 0
+        dropped = 0
+        for segment in segments:
+            tokens = estimate_tokens(segment['text'])
+            if self.token_budget <= 0 or used_tokens + tokens <= self.token_budget:
+                selected.append(segment['text'])
+                used_tokens += tokens
+            elif not selected:
+                # En alakalı segment bile sığmıyorsa kısaltarak al
+                text = self._truncate(segment['text'], self.token_budget)
+                if text:
+                    selected.append(text)
+                    used_tokens += estimate_tokens(text)
+            else:
+                dropped += 1
+        
+        context_text = "\n\n".join(selected)
+        report = {
+            'chunks': len(hits),
+            'segments': len(segments),
+            'dropped_segments': dropped,
+            'naive_tokens': naive_tokens,
+            'context_tokens': used_tokens,
+            'saved_tokens': max(0, naive_tokens - used_tokens),
+        }
+        return context_text, report
@@ -0,0 +1,251 @@
+"""
+Korpus ingestion modülü
+Bu modül yapılandırılmış kaynak glob'larına uyan dosyaları koleksiyonlara indeksler.
+Okuma ve parçalama bir process pool'da yürür; embedding ve yazma işlemleri
+biten dosyaların arkasından boru hattı şeklinde devam eder.
+"""
+
+import glob
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Tuple
+
+from config import Config
+from index_manifest import ChunkIdAssigner, IndexManifest
+from near_dedup import NearDuplicateFilter
+from text_processor import TextProcessor
+
+# (chunk_index, chunk_id, chunk, başlangıç_byte, bitiş_byte)
+ChunkItem = Tuple[int, str, str, int, int]
+
+
+def resolve_source_files(pattern: str) -> List[str]:
+    """Glob desenine uyan dosyaları sıralı olarak döndür (** desteklenir)"""
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+
+def iter_chunk_items(file_path: str, processor: TextProcessor, embedding_model: str,
+                     duplicates: Dict[str, str]) -> Iterator[ChunkItem]:
+    """
+    Dosyayı parçalar, içerik adresli ID'leri hesaplar ve near-duplicate chunk'ları eler
+    
+    Elenen chunk'lar numaralandırmada yer tutmaya devam eder (chunk_index atlanır),
+    böylece komşuları yeniden kurulabilir.
+    
+    Args:
+        file_path: Dosya yolu
+        processor: Metin işleyici
+        embedding_model: Embedding modeli (ID'nin parçası)
+        duplicates: Elenen chunk_index -> tutulan chunk ID eşlemesinin yazılacağı sözlük
+    """
+    assigner = ChunkIdAssigner(file_path, processor.chunk_size, processor.chunk_overlap, embedding_model)
+    dedup = None
+    if Config.DEDUP_THRESHOLD > 0:
+        dedup = NearDuplicateFilter(
+            Config.DEDUP_THRESHOLD, Config.DEDUP_NUM_PERM, Config.DEDUP_SHINGLE_SIZE
+        )
+    for chunk_index, (chunk, start_byte, end_byte) in enumerate(processor.iter_file_chunks(file_path)):
+        chunk_id = assigner.assign(chunk)
+        if dedup is not None:
+            original_id = dedup.find_duplicate(chunk_id, chunk)
+            if original_id is not None:
+                duplicates[str(chunk_index)] = original_id
+                continue
+        yield chunk_index, chunk_id, chunk, start_byte, end_byte
+
+
+def chunk_file(file_path: str, chunk_size: int, chunk_overlap: int, chunk_mode: str,
+               embedding_model: str) -> Tuple[List[ChunkItem], Dict[str, str]]:
+    """
+    Process pool worker'ı: dosyayı parçalar, ID'leri hesaplar ve kopyaları eler
+    
+    Args:
+        file_path: Dosya yolu
+        chunk_size: Chunk boyutu
+        chunk_overlap: Chunk örtüşmesi
+        chunk_mode: Chunk modu
+        embedding_model: Embedding modeli (ID'nin parçası)
+    
+    Returns:
+        (chunk listesi, elenen chunk_index -> tutulan chunk ID eşlemesi)
+    """
+    processor = TextProcessor(chunk_size, chunk_overlap, chunk_mode)
+    duplicates: Dict[str, str] = {}
+    items = list(iter_chunk_items(file_path, processor, embedding_model, duplicates))
+    return items, duplicates
+
+
+class CorpusIngestor:
+    """Dosya gruplarını koleksiyonlara artımlı olarak indeksleyen sınıf"""
+    
+    def __init__(self, text_processor: TextProcessor, embedding_generator, vector_db,
+                 manifest: IndexManifest, workers: int = 1):
+        """
+        Args:
+            text_processor: Metin işleyici
+            embedding_generator: Embedding oluşturucu
+            vector_db: Vektör veritabanı
+            manifest: Ingestion manifesti
+            workers: Parçalama için process sayısı
+        """
+        self.text_processor = text_processor
+        self.embedding_generator = embedding_generator
+        self.vector_db = vector_db
+        self.manifest = manifest
+        self.workers = max(1, workers)
+    
+    def _params(self) -> Dict[str, Any]:
+        """Chunk ID'lerini etkileyen ingestion parametreleri"""
+        return {
+            "chunk_size": self.text_processor.chunk_size,
+            "chunk_overlap": self.text_processor.chunk_overlap,
+            "chunk_mode": self.text_processor.chunk_mode,
+            "embedding_model": Config.embedding_signature(),
+            "dedup": [Config.DEDUP_THRESHOLD, Config.DEDUP_NUM_PERM, Config.DEDUP_SHINGLE_SIZE],
+        }
+    
+    def _iter_file_chunks(self, file_paths: List[str]) -> Iterator[Tuple[str, Iterator[ChunkItem], Dict[str, str]]]:
+        """
+        Dosyaları parçala. Birden fazla dosya varsa process pool kullanılır ve
+        biten dosyalar tamamlanma sırasıyla döndürülür; bekleyen iş sayısı sınırlıdır.
+        Kopya eşlemesi, chunk iterator'ı tükendiğinde tamamlanmış olur.
+        """
+        if len(file_paths) <= 1 or self.workers <= 1:
+            for file_path in file_paths:
+                duplicates: Dict[str, str] = {}
+                items = iter_chunk_items(file_path, self.text_processor, Config.embedding_signature(), duplicates)
+                yield file_path, items, duplicates
+            return
+        
+        args = (
+            self.text_processor.chunk_size, self.text_processor.chunk_overlap,
+            self.text_processor.chunk_mode, Config.embedding_signature()
+        )
+        queue = list(reversed(file_paths))
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(file_paths))) as pool:
+            in_flight = {}
+            while queue or in_flight:
+                # Bellek sınırı: aynı anda en fazla 2 x worker dosya bekletilir
+                while queue and len(in_flight) < self.workers * 2:
+                    file_path = queue.pop()
+                    in_flight[pool.submit(chunk_file, file_path, *args)] = file_path
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path = in_flight.pop(future)
+                    items, duplicates = future.result()
+                    yield file_path, iter(items), duplicates
+    
+    def ingest_collection(self, collection_name: str, file_paths: List[str]):
+        """
+        Dosyaları koleksiyona indeksle. Sadece yeni/değişen dosyalar parçalanır,
+        sadece yeni chunk'lar embed edilir, kaybolanlar silinir.
+        
+        Args:
+            collection_name: Koleksiyon adı
+            file_paths: Koleksiyona ait dosyalar
+        
+        Returns:
+            Koleksiyon
+        """
+        params = self._params()
+        fingerprints = {path: IndexManifest.file_fingerprint(path) for path in file_paths}
+        entry = self.manifest.get_entry(collection_name)
+        known_files = entry.get("files", {}) if IndexManifest.is_unchanged(entry, params) else {}
+        collection = self.vector_db.get_collection(collection_name)
+        
+        # Hiçbir şey değişmediyse mevcut koleksiyonu olduğu gibi kullan
+        unchanged = [
+            path for path in file_paths
+            if path in known_files and known_files[path]["sha256"] == fingerprints[path]
+        ]
+        known_count = sum(len(known_files[path]["ids"]) for path in unchanged)
+        if (collection is not None and len(unchanged) == len(file_paths) == len(known_files)
+                and self.vector_db.count(collection) == known_count):
+            print(f"✅ Değişiklik yok, mevcut koleksiyon kullanılıyor: {collection_name}")
+            return collection
+        
+        if collection is None:
+            collection = self.vector_db.get_or_create_collection(collection_name)
+        existing_ids = set(self.vector_db.get_ids(collection))
+        
+        # Değişmemiş dosyaların chunk'ları veritabanında duruyorsa dokunma
+        files_state = {
+            path: known_files[path] for path in unchanged
+            if existing_ids.issuperset(known_files[path]["ids"])
+        }
+        changed = [path for path in file_paths if path not in files_state]
+        print(f"📚 {collection_name}: {len(file_paths)} dosya, {len(changed)} dosya işlenecek")
+        
+        stats = {"new": 0, "kept": 0}
+        for file_path, items, duplicates in self._iter_file_chunks(changed):
+            ids = []
+            group = []
+            for chunk_index, chunk_id, chunk, start_byte, end_byte in items:
+                group.append((chunk_id, chunk, {
+                    "source": file_path,
+                    "chunk_index": chunk_index,
+                    "start_byte": start_byte,
+                    "end_byte": end_byte
+                }))
+                ids.append(chunk_id)
+                if len(group) >= Config.INGEST_GROUP_SIZE:
+                    self._store_chunk_group(collection, group, existing_ids, stats)
+                    group = []
+            self._store_chunk_group(collection, group, existing_ids, stats)
+            files_state[file_path] = {
+                "sha256": fingerprints[file_path], "ids": ids, "duplicates": duplicates
+            }
+        
+        live_ids = set()
+        for state in files_state.values():
+            live_ids.update(state["ids"])
+        vanished_ids = list(existing_ids - live_ids)
+        self.vector_db.delete_documents(collection, vanished_ids)
+        removed = sum(len(state.get("duplicates", {})) for state in files_state.values())
+        print(f"🔎 {stats['new']} yeni, {stats['kept']} değişmemiş, "
+              f"{len(vanished_ids)} silinen chunk")
+        if removed:
+            print(f"🧹 {removed} near-duplicate chunk embedding'e gönderilmeden elendi")
+        
+        self.manifest.set_entry(collection_name, dict(params, files=files_state))
+        self.manifest.save()
+        return collection
+    
+    def _store_chunk_group(self, collection, group: List[Tuple[str, str, Dict[str, Any]]],
+                           existing_ids: set, stats: Dict[str, int]):
+        """
+        Bir chunk grubunu yazar: yeni chunk'lar embed edilip eklenir,
+        mevcut olanların yalnızca metadata'sı güncellenir
+        """
+        if not group:
+            return
+        
+        new_items = [item for item in group if item[0] not in existing_ids]
+        kept_items = [item for item in group if item[0] in existing_ids]
+        
+        if new_items:
+            embeddings = self.embedding_generator.generate_embeddings(
+                [chunk for _, chunk, _ in new_items]
+            )
+            self.vector_db.upsert_documents(
+                collection,
+                [chunk_id for chunk_id, _, _ in new_items],
+                [chunk for _, chunk, _ in new_items],
+                embeddings,
+                [metadata for _, _, metadata in new_items]
+            )
+            existing_ids.update(chunk_id for chunk_id, _, _ in new_items)
+        
+        # Yalnızca yeri (sırası / bayt aralığı) değişen chunk'ların metadata'sı yazılır
+        if kept_items:
+            stored = self.vector_db.get_metadatas(collection, [chunk_id for chunk_id, _, _ in kept_items])
+            moved_items = [item for item, old in zip(kept_items, stored) if old != item[2]]
+            if moved_items:
+                self.vector_db.update_metadatas(
+                    collection,
+                    [chunk_id for chunk_id, _, _ in moved_items],
+                    [metadata for _, _, metadata in moved_items]
+                )
+        
+        stats["new"] += len(new_items)
+        stats["kept"] += len(kept_items)
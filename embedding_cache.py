@@ -0,0 +1,165 @@
+"""
+Embedding önbellek modülü
+Bu modül embedding vektörlerini (model, task_type, normalize metin özeti) anahtarıyla
+SQLite üzerinde kalıcı olarak, önünde bellek içi bir LRU katmanıyla saklar.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+def normalize_text(text: str) -> str:
+    """Önbellek anahtarı için metni normalize et (Unicode NFC, boşluk sadeleştirme)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """Boyut sınırlı, kalıcı embedding önbelleği"""
+    
+    def __init__(self, path: str, memory_items: int = 2048, max_entries: int = 100000):
+        """
+        Args:
+            path: SQLite dosya yolu
+            memory_items: Bellek içi LRU katmanının kapasitesi
+            max_entries: Diskte tutulacak maksimum kayıt sayısı
+        """
+        self.path = path
+        self.memory_items = max(0, memory_items)
+        self.max_entries = max(1, max_entries)
+        self.memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings(last_access)")
+        self.conn.commit()
+    
+    @staticmethod
+    def make_key(model: str, task_type: str, text: str) -> str:
+        """(model, task_type, normalize metin) için önbellek anahtarı üret"""
+        payload = "\0".join([model, task_type, normalize_text(text)])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _remember(self, key: str, vector: List[float]):
+        """Bellek içi LRU katmanına ekle (kilit altında çağrılır)"""
+        if not self.memory_items:
+            return
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+    
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """
+        Anahtarlar için önbellekteki vektörleri döndür
+        
+        Args:
+            keys: Önbellek anahtarları
+        
+        Returns:
+            Bulunan anahtar -> vektör eşlemesi
+        """
+        found: Dict[str, List[float]] = {}
+        with self.lock:
+            disk_keys = []
+            for key in keys:
+                vector = self.memory.get(key)
+                if vector is not None:
+                    self.memory.move_to_end(key)
+                    found[key] = vector
+                    self.memory_hits += 1
+                else:
+                    disk_keys.append(key)
+            
+            # SQLite parametre limiti için parça parça sorgula
+            now = time.time()
+            for i in range(0, len(disk_keys), 500):
+                part = disk_keys[i:i + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", part
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array('f', blob).tolist()
+                    found[key] = vector
+                    self._remember(key, vector)
+                if rows:
+                    self.conn.executemany(
+                        "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                        [(now, key) for key, _ in rows]
+                    )
+            if disk_keys:
+                self.conn.commit()
+            
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+    
+    def get(self, key: str) -> Optional[List[float]]:
+        """Tek bir anahtar için vektörü döndür"""
+        return self.get_many([key]).get(key)
+    
+    def put_many(self, items: Dict[str, List[float]]):
+        """
+        Vektörleri önbelleğe yaz ve gerekirse en eski kayıtları çıkar
+        
+        Args:
+            items: Anahtar -> vektör eşlemesi
+        """
+        if not items:
+            return
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)",
+                [(key, array('f', vector).tobytes(), now) for key, vector in items.items()]
+            )
+            for key, vector in items.items():
+                self._remember(key, list(vector))
+            
+            # Boyut sınırı: fazlalığı en uzun süredir kullanılmayanlardan sil
+            size = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if size > self.max_entries:
+                overflow = size - self.max_entries
+                self.conn.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    "SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+            self.conn.commit()
+    
+    def put(self, key: str, vector: List[float]):
+        """Tek bir vektörü önbelleğe yaz"""
+        self.put_many({key: vector})
+    
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss sayaçlarını ve boyut bilgisini döndür"""
+        with self.lock:
+            size = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": size,
+                "memory_entries": len(self.memory),
+            }
@@ -3,53 +3,102 @@ Embedding modülü
 Bu modül Google AI embeddings kullanarak metinleri vektörlere çevirir.
 """
 
-import google.generativeai as genai
-from typing import List
+from typing import Any, Dict, List, Optional
 from config import Config
+from llm_backend import LLMBackend, create_llm_backend
+from rate_limiter import TokenBucket
+from embedding_pipeline import EmbeddingPipeline
+from embedding_cache import EmbeddingCache
 
 class EmbeddingGenerator:
     """Google embedding oluşturucu sınıfı"""
     
-    def __init__(self):
-        """Google AI istemcisini başlat"""
-        genai.configure(api_key=Config.GOOGLE_API_KEY)
+    def __init__(self, backend: Optional[LLMBackend] = None):
+        """
+        Google AI istemcisini (veya yapılandırılan LLM backend'ini) başlat
+        
+        Args:
+            backend: LLM backend'i (None ise Config.LLM_BACKEND'e göre oluşturulur)
+        """
+        self.backend = backend or create_llm_backend()
         self.model = Config.EMBEDDING_MODEL
+        # Önbellek ve checkpoint anahtarları (sahte backend vektörleri ayrı tutulur)
+        self.signature = Config.embedding_signature()
+        self.rate_limiter = TokenBucket(Config.EMBEDDING_REQUESTS_PER_MINUTE)
+        self.pipeline = EmbeddingPipeline(
+            self._embed_batch,
+            self.rate_limiter,
+            batch_size=Config.EMBEDDING_BATCH_SIZE,
+            concurrency=Config.EMBEDDING_CONCURRENCY,
+            max_retries=Config.EMBEDDING_MAX_RETRIES,
+            checkpoint_dir=Config.EMBEDDING_CHECKPOINT_DIR
+        )
+        self.cache = None
+        if Config.EMBEDDING_CACHE_PATH:
+            try:
+                self.cache = EmbeddingCache(
+                    Config.EMBEDDING_CACHE_PATH,
+                    memory_items=Config.EMBEDDING_CACHE_MEMORY_ITEMS,
+                    max_entries=Config.EMBEDDING_CACHE_MAX_ENTRIES
+                )
+            except Exception as e:
+                print(f"⚠️ Embedding önbelleği açılamadı, önbelleksiz devam ediliyor: {e}")
         print("✅ Google Embeddings başlatıldı")
     
+    def _embed_batch(self, texts: List[str], task_type: str) -> List[List[float]]:
+        """
+        Tek bir API isteğiyle birden fazla metni embed et
+        
+        Args:
+            texts: Metinler
+            task_type: Embedding görev tipi
+        
+        Returns:
+            Embedding vektörleri (girdi sırasıyla)
+        """
+        return self.backend.embed(self.model, texts, task_type)
+    
     def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
-        Metinler için embeddings oluştur
+        Metinler için embeddings oluştur. Batch'ler eşzamanlı gönderilir, başarısız
+        batch'ler yeniden denenir ve biten batch'ler checkpoint'e yazılır.
         
         Args:
             texts: Embedding oluşturulacak metinler
-            
+        
         Returns:
             Embedding vektörlerinin listesi
+        
+        Raises:
+            EmbeddingPipelineError: Bir batch tüm denemelere rağmen başarısız olursa
         """
-        try:
-            print(f"🔄 {len(texts)} metin için Google embeddings oluşturuluyor...")
-            
-            embeddings = []
-            # Rate limiting için her 10 istekte bir kısa bekleme
-            for i, text in enumerate(texts):
-                if i > 0 and i % 10 == 0:
-                    print(f"   🔄 {i}/{len(texts)} tamamlandı...")
-                    import time
-                    time.sleep(1)  # 1 saniye bekle
-                
-                result = genai.embed_content(
-                    model=self.model,
-                    content=text,
-                    task_type="retrieval_document"
-                )
-                embeddings.append(result['embedding'])
-            
-            print(f"✅ {len(embeddings)} Google embedding başarıyla oluşturuldu")
-            return embeddings
-            
-        except Exception as e:
-            print(f"❌ Google embedding oluşturma hatası: {e}")
+        if not texts:
             return []
+        
+        task_type = "retrieval_document"
+        keys = [EmbeddingCache.make_key(self.signature, task_type, text) for text in texts]
+        cached = self.cache.get_many(keys) if self.cache else {}
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        if cached:
+            print(f"⚡ {len(texts) - len(missing)} embedding önbellekten alındı")
+        
+        if missing:
+            print(f"🔄 {len(missing)} metin için Google embeddings oluşturuluyor...")
+            try:
+                vectors = self.pipeline.run([texts[i] for i in missing], task_type, job_key=self.signature)
+            except Exception as e:
+                print(f"❌ Google embedding oluşturma hatası: {e}")
+                print("💾 Tamamlanan batch'ler kaydedildi, sonraki çalıştırmada kaldığı yerden devam edilecek")
+                raise
+            
+            fresh = {keys[i]: vector for i, vector in zip(missing, vectors)}
+            if self.cache:
+                self.cache.put_many(fresh)
+            cached.update(fresh)
+        
+        embeddings = [cached[key] for key in keys]
+        print(f"✅ {len(embeddings)} Google embedding başarıyla oluşturuldu")
+        return embeddings
     
     def generate_single_embedding(self, text: str) -> List[float]:
         """
@@ -57,19 +106,30 @@ class EmbeddingGenerator:
         
         Args:
             text: Embedding oluşturulacak metin
-            
+        
         Returns:
             Embedding vektörü
         """
         try:
+            key = EmbeddingCache.make_key(self.signature, "retrieval_query", text)
+            if self.cache:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return cached
+            
             print("🔄 Sorgu için Google embedding oluşturuluyor...")
-            result = genai.embed_content(
-                model=self.model,
-                content=text,
-                task_type="retrieval_query"
-            )
+            self.rate_limiter.acquire()
+            embedding = self.backend.embed(self.model, text, "retrieval_query")
+            if self.cache:
+                self.cache.put(key, embedding)
             print("✅ Sorgu embedding'i oluşturuldu")
-            return result['embedding']
+            return embedding
         except Exception as e:
             print(f"❌ Sorgu embedding hatası: {e}")
             return []
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Embedding önbelleği sayaçlarını döndür"""
+        if not self.cache:
+            return {"enabled": False}
+        return dict(self.cache.stats(), enabled=True)
@@ -0,0 +1,283 @@
+"""
+Embedding pipeline modülü
+Bu modül embedding işlerini eşzamanlı worker'larla, batch başına yeniden deneme
+ve diske checkpoint alarak yürütür. Yarıda kalan bir iş kaldığı yerden devam eder.
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from rate_limiter import TokenBucket
+
+try:
+    from google.api_core.exceptions import ResourceExhausted
+except ImportError:  # google-api-core yoksa mesajdan tespit edilir
+    ResourceExhausted = None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Hata bir kota aşımı (HTTP 429) mı?"""
+    if ResourceExhausted is not None and isinstance(error, ResourceExhausted):
+        return True
+    message = str(error).lower()
+    return "429" in message or "quota" in message or "rate limit" in message
+
+
+class EmbeddingPipelineError(Exception):
+    """Bir batch tüm denemelere rağmen embed edilemediğinde fırlatılır"""
+
+
+class ProgressReporter:
+    """İlerleme ve throughput raporlayıcı"""
+    
+    def __init__(self, total: int, already_done: int = 0, interval: float = 2.0):
+        """
+        Args:
+            total: Toplam metin sayısı
+            already_done: Checkpoint'ten gelen tamamlanmış metin sayısı
+            interval: Raporlar arası minimum süre (saniye)
+        """
+        self.total = total
+        self.done = already_done
+        self.resumed = already_done
+        self.interval = interval
+        self.started_at = time.monotonic()
+        self.last_report = 0.0
+        self.lock = threading.Lock()
+    
+    def advance(self, count: int):
+        """Tamamlanan metin sayısını artır ve gerekiyorsa raporla"""
+        with self.lock:
+            self.done += count
+            now = time.monotonic()
+            if self.done < self.total and now - self.last_report < self.interval:
+                return
+            self.last_report = now
+            elapsed = now - self.started_at
+            rate = (self.done - self.resumed) / elapsed if elapsed > 0 else 0.0
+            remaining = (self.total - self.done) / rate if rate > 0 else 0.0
+            print(f"   🔄 {self.done}/{self.total} tamamlandı "
+                  f"({rate:.1f} metin/s, kalan ~{remaining:.0f} s)")
+    
+    def summary(self) -> Dict[str, float]:
+        """Toplam süre ve throughput özetini döndür"""
+        elapsed = time.monotonic() - self.started_at
+        embedded = self.done - self.resumed
+        return {
+            "embedded": embedded,
+            "resumed": self.resumed,
+            "seconds": elapsed,
+            "texts_per_second": embedded / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+class EmbeddingPipeline:
+    """Eşzamanlı, yeniden denemeli ve checkpoint'li embedding pipeline'ı"""
+    
+    # Kota aşımında bekleme süresi (saniye) ve batch büyütme eşiği
+    RATE_LIMIT_BACKOFF = 2.0
+    GROW_AFTER_SUCCESSES = 5
+    RETRY_BASE_DELAY = 1.0
+    RETRY_MAX_DELAY = 30.0
+    
+    def __init__(self, embed_batch: Callable[[List[str], str], List[List[float]]],
+                 rate_limiter: TokenBucket, batch_size: int, concurrency: int,
+                 max_retries: int, checkpoint_dir: Optional[str] = None):
+        """
+        Args:
+            embed_batch: (metinler, task_type) -> vektörler yapan uzak çağrı
+            rate_limiter: İstekleri sınırlayan token bucket
+            batch_size: İstek başına maksimum metin sayısı
+            concurrency: Eşzamanlı worker sayısı
+            max_retries: Batch başına maksimum yeniden deneme sayısı
+            checkpoint_dir: Checkpoint dizini (None ise checkpoint alınmaz)
+        """
+        self.embed_batch = embed_batch
+        self.rate_limiter = rate_limiter
+        self.max_batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(0, max_retries)
+        self.checkpoint_dir = checkpoint_dir
+    
+    def _checkpoint_path(self, texts: List[str], job_key: str) -> Optional[str]:
+        """İşe özgü checkpoint dosyasının yolu"""
+        if not self.checkpoint_dir:
+            return None
+        digest = hashlib.sha256(job_key.encode('utf-8'))
+        for text in texts:
+            digest.update(hashlib.sha256(text.encode('utf-8')).digest())
+        return os.path.join(self.checkpoint_dir, f"{digest.hexdigest()[:32]}.jsonl")
+    
+    def _load_checkpoint(self, path: Optional[str], results: List) -> int:
+        """Checkpoint'teki tamamlanmış batch'leri sonuç listesine yükle"""
+        if not path or not os.path.exists(path):
+            return 0
+        loaded = 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # kesintide yarım kalmış satır
+                    start = record["start"]
+                    for offset, vector in enumerate(record["embeddings"]):
+                        if results[start + offset] is None:
+                            results[start + offset] = vector
+                            loaded += 1
+        except Exception as e:
+            print(f"⚠️ Checkpoint okunamadı, baştan başlanıyor: {e}")
+            results[:] = [None] * len(results)
+            return 0
+        return loaded
+    
+    def run(self, texts: List[str], task_type: str, job_key: str = "") -> List[List[float]]:
+        """
+        Metinleri embed et
+        
+        Args:
+            texts: Embed edilecek metinler
+            task_type: Embedding görev tipi
+            job_key: Checkpoint anahtarına eklenecek ek bilgi (ör. model adı)
+        
+        Returns:
+            Girdi sırasıyla embedding vektörleri
+        
+        Raises:
+            EmbeddingPipelineError: Bir batch tüm denemelere rağmen başarısız olursa
+        """
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        checkpoint_path = self._checkpoint_path(texts, f"{job_key}|{task_type}")
+        resumed = self._load_checkpoint(checkpoint_path, results)
+        if resumed:
+            print(f"♻️  Checkpoint bulundu, {resumed}/{len(texts)} metin atlanıyor")
+        
+        # Eksik pozisyonları ardışık aralıklar halinde kuyruğa al: (başlangıç, bitiş, deneme)
+        pending = deque()
+        position = 0
+        while position < len(texts):
+            if results[position] is not None:
+                position += 1
+                continue
+            end = position
+            while end < len(texts) and results[end] is None:
+                end += 1
+            pending.append((position, end, 0))
+            position = end
+        
+        progress = ProgressReporter(len(texts), resumed)
+        state = {"batch_size": self.max_batch_size, "successes": 0, "in_flight": 0, "error": None}
+        lock = threading.Condition()
+        checkpoint_file = None
+        if checkpoint_path and pending:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            checkpoint_file = open(checkpoint_path, 'a', encoding='utf-8')
+            if checkpoint_file.tell() > 0:
+                checkpoint_file.write("\n")  # yarım kalmış son satırı kapat
+        
+        def take_span():
+            """Kuyruktan güncel batch boyutunda bir aralık al"""
+            with lock:
+                while True:
+                    if state["error"] is not None:
+                        return None
+                    if pending:
+                        start, end, attempt = pending.popleft()
+                        if end - start > state["batch_size"]:
+                            pending.appendleft((start + state["batch_size"], end, 0))
+                            end = start + state["batch_size"]
+                        state["in_flight"] += 1
+                        return start, end, attempt
+                    if state["in_flight"] == 0:
+                        return None
+                    lock.wait(0.1)
+        
+        def finish_span(requeue=None, error=None):
+            """Aralık işini kapat, gerekirse kuyruğa geri koy"""
+            with lock:
+                state["in_flight"] -= 1
+                if requeue is not None:
+                    pending.appendleft(requeue)
+                if error is not None and state["error"] is None:
+                    state["error"] = error
+                lock.notify_all()
+        
+        def process(start, end, attempt):
+            """Bir aralığı embed et; yeniden denenecekse kuyruğa dönecek aralığı döndür"""
+            self.rate_limiter.acquire()
+            try:
+                vectors = self.embed_batch(texts[start:end], task_type)
+                if len(vectors) != end - start:
+                    raise ValueError(f"Beklenen {end - start} vektör, gelen {len(vectors)}")
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                if is_rate_limit_error(e):
+                    with lock:
+                        state["batch_size"] = max(1, (end - start) // 2)
+                        state["successes"] = 0
+                    self.rate_limiter.penalize(self.RATE_LIMIT_BACKOFF * (attempt + 1))
+                    print(f"   ⏳ Kota aşımı, batch boyutu {state['batch_size']} olarak küçültüldü")
+                else:
+                    delay = min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * (2 ** attempt))
+                    delay *= random.uniform(0.5, 1.0)
+                    print(f"   ⚠️ Batch {start}-{end} başarısız ({e}), "
+                          f"{delay:.1f} s sonra tekrar denenecek")
+                    time.sleep(delay)
+                return start, end, attempt + 1
+            
+            with lock:
+                results[start:end] = vectors
+                if checkpoint_file is not None:
+                    checkpoint_file.write(json.dumps({"start": start, "embeddings": vectors}) + "\n")
+                    checkpoint_file.flush()
+                state["successes"] += 1
+                # Kota rahatladıysa batch boyutunu kademeli olarak geri büyüt
+                if (state["batch_size"] < self.max_batch_size
+                        and state["successes"] >= self.GROW_AFTER_SUCCESSES):
+                    state["batch_size"] = min(self.max_batch_size, state["batch_size"] * 2)
+                    state["successes"] = 0
+            progress.advance(end - start)
+            return None
+        
+        def worker():
+            while True:
+                span = take_span()
+                if span is None:
+                    return
+                try:
+                    finish_span(requeue=process(*span))
+                except Exception as e:
+                    finish_span(error=e)
+        
+        try:
+            if pending:
+                with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                    for _ in range(self.concurrency):
+                        executor.submit(worker)
+        finally:
+            if checkpoint_file is not None:
+                checkpoint_file.close()
+        
+        if state["error"] is not None:
+            raise EmbeddingPipelineError(
+                f"Embedding tamamlanamadı ({progress.done}/{len(texts)} metin checkpoint'te): "
+                f"{state['error']}"
+            )
+        
+        summary = progress.summary()
+        print(f"📈 {summary['embedded']} metin {summary['seconds']:.1f} s içinde embed edildi "
+              f"({summary['texts_per_second']:.1f} metin/s)")
+        
+        # İş tamamlandı, checkpoint'e gerek kalmadı
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        
+        return results
@@ -0,0 +1,308 @@
+"""
+Sahte (yerel) LLM backend modülü
+Bu modül ağ ve API anahtarı olmadan çalışan deterministik bir backend sağlar:
+ilk token gecikmesi ayarlanabilir bir dağılımdan örneklenir, yanıt token/s
+hızıyla parça parça akıtılır, embedding'ler kelime hash'lerinden üretilir.
+Aynı girdi her zaman aynı yanıtı ve vektörü verir; gecikmeler FAKE_LLM_SEED
+ile tekrarlanabilir. Sunucu uçtan uca çevrimdışı profillenip yük testi
+yapılabilir. Gecikme sıçramaları ve hatalar belirli oranlarda enjekte edilebilir;
+request_options / timeout ile verilen süre aşılırsa Gemini gibi DeadlineExceeded
+fırlatılır.
+
+Yanıtlar google.generativeai yanıt nesneleridir:
+- Karar promptlarında ("TRANSCRIPT_ONLY" gibi tırnaklı seçenekler) tek seçenek döner
+- Araç verilen çağrılarda soruya göre 0-2 arama aracı çağrılır; Gemini gibi çağrılardan
+  önce kısa bir metin parçası gelir
+- Diğer promptlarda prompttaki kelimelerden oluşan sahte metin üretilir
+"""
+
+import asyncio
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple, Union
+
+import google.generativeai as genai
+import numpy as np
+from google.api_core import exceptions as api_exceptions
+
+from config import Config
+from llm_backend import LLMBackend
+
+protos = genai.protos
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+OPTION_PATTERN = re.compile(r'"([A-Z][A-Z_]{2,})"')
+QUESTION_MARKER = "KULLANICI SORUSU:"
+FILLER_WORDS = ("ders", "konu", "örnek", "önemli", "bilgi", "kaynak", "yanıt", "açıklama")
+TOOL_PREAMBLE = "Kaynaklarda arıyorum. "
+
+
+class LatencyDistribution:
+    """
+    "tür:parametreler" (milisaniye) biçimindeki gecikme dağılımı:
+    const:MS | uniform:MIN:MAX | normal:ORTALAMA:SAPMA | lognormal:MEDYAN:SIGMA
+    """
+    
+    KINDS = ("const", "uniform", "normal", "lognormal")
+    
+    def __init__(self, spec: str):
+        kind, *params = [part.strip() for part in spec.split(":")]
+        kind = kind.lower()
+        expected = {"const": 1, "uniform": 2, "normal": 2, "lognormal": 2}.get(kind)
+        if expected is None or len(params) != expected:
+            raise ValueError(f"Geçersiz gecikme dağılımı: {spec} (örn. {', '.join(self.KINDS)})")
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(param) for param in params]
+    
+    def sample(self, rng: random.Random) -> float:
+        """Saniye cinsinden gecikme örnekle (negatif değerler sıfıra kırpılır)"""
+        if self.kind == "const":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            ms = rng.gauss(*self.params)
+        else:
+            median, sigma = self.params
+            ms = rng.lognormvariate(math.log(max(median, 1e-9)), sigma)
+        return max(0.0, ms) / 1000.0
+
+
+def stable_hash(text: str, seed: int = 0) -> int:
+    """Süreçten bağımsız (PYTHONHASHSEED'den etkilenmeyen) 64 bit hash"""
+    digest = hashlib.blake2b(f"{seed}:{text}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+@lru_cache(maxsize=50000)
+def _word_vector(word: str, dimensions: int, seed: int) -> np.ndarray:
+    """Kelimenin hash'inden türetilen sabit rastgele vektör"""
+    return np.random.default_rng(stable_hash(word, seed)).standard_normal(dimensions).astype(np.float32)
+
+
+def hash_embedding(text: str, dimensions: int, seed: int = 0) -> List[float]:
+    """
+    Kelime hash vektörlerinin toplamı (normalize). Ortak kelimesi çok olan metinlerin
+    kosinüs benzerliği yüksektir; bu sayede önbellek ve yönlendirme anlamlı çalışır.
+    """
+    words = [word.lower() for word in WORD_PATTERN.findall(text)] or [text]
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for word in words:
+        vector += _word_vector(word, dimensions, seed)
+    norm = float(np.linalg.norm(vector))
+    return (vector / norm if norm else vector).tolist()
+
+
+def contents_text(contents: Any) -> str:
+    """Prompt'u (metin, Content listesi veya dict) düz metne çevir"""
+    if isinstance(contents, str):
+        return contents
+    if isinstance(contents, (list, tuple)):
+        return "\n".join(contents_text(item) for item in contents)
+    if isinstance(contents, dict):
+        return contents_text(contents.get("parts", []))
+    if isinstance(contents, protos.Content):
+        return contents_text(list(contents.parts))
+    if isinstance(contents, protos.Part):
+        if "text" in contents:
+            return contents.text
+        if "function_response" in contents:
+            return str(type(contents.function_response).to_dict(contents.function_response))
+        return ""
+    return str(contents)
+
+
+def _response(parts: List[Any]) -> Any:
+    """Parçalardan google.generativeai yanıt nesnesi oluştur"""
+    return genai.types.GenerateContentResponse.from_response(protos.GenerateContentResponse(
+        candidates=[protos.Candidate(
+            index=0,
+            content=protos.Content(role="model", parts=parts),
+            finish_reason=protos.Candidate.FinishReason.STOP
+        )]
+    ))
+
+
+class FakeLLMBackend(LLMBackend):
+    """Gecikme ve akış hızı ayarlanabilir deterministik yerel backend"""
+    
+    name = "fake"
+    
+    def __init__(self, latency: Optional[str] = None, tokens_per_second: Optional[float] = None,
+                 response_tokens: Optional[int] = None, chunk_tokens: Optional[int] = None,
+                 embed_latency: Optional[str] = None, dimensions: Optional[int] = None,
+                 seed: Optional[int] = None, spike_rate: Optional[float] = None,
+                 spike_latency: Optional[str] = None, error_rate: Optional[float] = None):
+        """
+        Args:
+            latency: İlk token gecikme dağılımı (None ise Config.FAKE_LLM_LATENCY)
+            tokens_per_second: Streaming hızı
+            response_tokens: Serbest metin yanıtlarının token sayısı
+            chunk_tokens: Streaming parçası başına token
+            embed_latency: Embedding isteği gecikme dağılımı
+            dimensions: Embedding boyutu
+            seed: Yanıt ve gecikmeler için tohum
+            spike_rate: Gecikmenin sıçrama dağılımından örneklenme olasılığı
+            spike_latency: Sıçrama gecikme dağılımı
+            error_rate: Üretim çağrısının ServiceUnavailable ile başarısız olma olasılığı
+        """
+        self.latency = LatencyDistribution(latency or Config.FAKE_LLM_LATENCY)
+        self.tokens_per_second = max(1e-3, tokens_per_second or Config.FAKE_LLM_TOKENS_PER_SECOND)
+        self.response_tokens = max(1, response_tokens or Config.FAKE_LLM_RESPONSE_TOKENS)
+        self.chunk_tokens = max(1, chunk_tokens or Config.FAKE_LLM_CHUNK_TOKENS)
+        self.embed_latency = LatencyDistribution(embed_latency or Config.FAKE_EMBED_LATENCY)
+        self.dimensions = dimensions or Config.FAKE_EMBEDDING_DIMENSIONS
+        self.seed = Config.FAKE_LLM_SEED if seed is None else seed
+        self.spike_rate = Config.FAKE_LLM_SPIKE_RATE if spike_rate is None else spike_rate
+        self.spike_latency = LatencyDistribution(spike_latency or Config.FAKE_LLM_SPIKE_LATENCY)
+        self.error_rate = Config.FAKE_LLM_ERROR_RATE if error_rate is None else error_rate
+        self.rng = random.Random(self.seed)
+        self.rng_lock = threading.Lock()
+        print(f"🧪 Sahte LLM backend'i: ilk token {self.latency.spec} ms, "
+              f"{self.tokens_per_second:g} token/s, embedding {self.embed_latency.spec} ms")
+    
+    def _sample(self, distribution: LatencyDistribution) -> Tuple[float, bool]:
+        """
+        Ortak RNG'den gecikme örnekle (thread güvenli)
+        
+        Returns:
+            (saniye, çağrı hata ile bitecek mi)
+        """
+        with self.rng_lock:
+            if self.spike_rate and self.rng.random() < self.spike_rate:
+                distribution = self.spike_latency
+            seconds = distribution.sample(self.rng)
+            failed = bool(self.error_rate) and self.rng.random() < self.error_rate
+        return seconds, failed
+    
+    @staticmethod
+    def _timeout(options: dict) -> Optional[float]:
+        """request_options ile verilen istek süre sınırı"""
+        return (options.get("request_options") or {}).get("timeout")
+    
+    @staticmethod
+    def _outcome(seconds: float, failed: bool, timeout: Optional[float]) -> Tuple[float, Optional[Exception]]:
+        """Beklenecek süre ve sonunda fırlatılacak hata (süre aşımı veya enjekte edilen hata)"""
+        if timeout is not None and seconds > timeout:
+            return timeout, api_exceptions.DeadlineExceeded(f"Sahte backend {timeout:.1f} s içinde yanıt vermedi")
+        if failed:
+            return seconds, api_exceptions.ServiceUnavailable("Sahte backend hatası (enjekte edildi)")
+        return seconds, None
+    
+    def _wait(self, seconds: float, failed: bool, timeout: Optional[float]):
+        delay, error = self._outcome(seconds, failed, timeout)
+        time.sleep(delay)
+        if error is not None:
+            raise error
+    
+    async def _wait_async(self, seconds: float, failed: bool, timeout: Optional[float]):
+        delay, error = self._outcome(seconds, failed, timeout)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+    
+    def _plan(self, contents: Any, options: dict) -> Tuple[float, bool, List[List[Any]], float]:
+        """
+        Yanıtı planla
+        
+        Returns:
+            (ilk parça gecikmesi, hata ile bitecek mi, parça listesi, sonraki parçalar arası gecikme)
+        """
+        prompt = contents_text(contents)
+        first_token, failed = self._sample(self.latency)
+        interval = self.chunk_tokens / self.tokens_per_second
+        
+        calls = self._function_calls(prompt, options)
+        if calls:
+            chunks = [[protos.Part(text=TOOL_PREAMBLE)], [protos.Part(function_call=call) for call in calls]]
+            return first_token, failed, chunks, interval
+        
+        options_found = list(dict.fromkeys(OPTION_PATTERN.findall(prompt)))
+        if len(options_found) >= 2 and not options.get("tools"):
+            choice = options_found[stable_hash(self._question(prompt), self.seed) % len(options_found)]
+            return first_token, failed, [[protos.Part(text=choice)]], interval
+        
+        tokens = self._text_tokens(prompt)
+        chunks = [
+            [protos.Part(text="".join(tokens[start:start + self.chunk_tokens]))]
+            for start in range(0, len(tokens), self.chunk_tokens)
+        ]
+        return first_token, failed, chunks, interval
+    
+    @staticmethod
+    def _question(prompt: str) -> str:
+        """Prompttaki kullanıcı sorusu (bulunamazsa prompt'un tamamı)"""
+        _, marker, rest = prompt.rpartition(QUESTION_MARKER)
+        return rest.strip().split("\n", 1)[0] if marker else prompt
+    
+    def _function_calls(self, prompt: str, options: dict) -> List[Any]:
+        """Araç verildiyse ve kapatılmadıysa soruya göre 0-2 deterministik araç çağrısı"""
+        tool_config = options.get("tool_config") or {}
+        mode = str(tool_config.get("function_calling_config", {}).get("mode", "AUTO")).upper()
+        if not options.get("tools") or mode == "NONE":
+            return []
+        names = [
+            declaration.name
+            for tool in options["tools"]
+            for declaration in getattr(tool, "function_declarations", [])
+        ]
+        question = self._question(prompt)
+        count = stable_hash(question, self.seed) % 3
+        if not names or count == 0:
+            return []
+        start = stable_hash(question, self.seed + 1) % len(names)
+        chosen = [names[(start + offset) % len(names)] for offset in range(min(count, len(names)))]
+        return [protos.FunctionCall(name=name, args={"query": question}) for name in chosen]
+    
+    def _text_tokens(self, prompt: str) -> List[str]:
+        """Prompttaki kelimelerden deterministik sahte yanıt (token başına bir kelime)"""
+        vocabulary = [word for word in WORD_PATTERN.findall(prompt) if len(word) > 2] or list(FILLER_WORDS)
+        rng = random.Random(stable_hash(prompt, self.seed))
+        tokens = []
+        for index in range(self.response_tokens):
+            word = rng.choice(vocabulary).lower()
+            end = ". " if index % 12 == 11 or index == self.response_tokens - 1 else " "
+            tokens.append(word + end)
+        return tokens
+    
+    def generate(self, model_name: str, contents: Any, stage: str = 'answer', **options) -> Any:
+        first_token, failed, chunks, interval = self._plan(contents, options)
+        self._wait(first_token + interval * (len(chunks) - 1), failed, self._timeout(options))
+        return _response([part for chunk in chunks for part in chunk])
+    
+    def generate_stream(self, model_name: str, contents: Any, stage: str = 'answer', **options) -> Iterator[Any]:
+        first_token, failed, chunks, interval = self._plan(contents, options)
+        self._wait(first_token, failed, self._timeout(options))
+        for index, parts in enumerate(chunks):
+            if index:
+                time.sleep(interval)
+            yield _response(parts)
+    
+    async def generate_async(self, model_name: str, contents: Any, stage: str = 'answer', **options) -> Any:
+        first_token, failed, chunks, interval = self._plan(contents, options)
+        await self._wait_async(first_token + interval * (len(chunks) - 1), failed, self._timeout(options))
+        return _response([part for chunk in chunks for part in chunk])
+    
+    async def generate_stream_async(self, model_name: str, contents: Any, stage: str = 'answer',
+                                    **options) -> AsyncIterator[Any]:
+        first_token, failed, chunks, interval = self._plan(contents, options)
+        await self._wait_async(first_token, failed, self._timeout(options))
+        for index, parts in enumerate(chunks):
+            if index:
+                await asyncio.sleep(interval)
+            yield _response(parts)
+    
+    def embed(self, model_name: str, content: Union[str, List[str]], task_type: str,
+              timeout: Optional[float] = None) -> List[Any]:
+        # Hata enjeksiyonu yalnızca üretim çağrılarına uygulanır (yedek mod araması çalışabilsin)
+        seconds, _ = self._sample(self.embed_latency)
+        self._wait(seconds, False, timeout)
+        if isinstance(content, str):
+            return hash_embedding(content, self.dimensions, self.seed)
+        return [hash_embedding(text, self.dimensions, self.seed) for text in content]
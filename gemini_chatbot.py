@@ -3,20 +3,95 @@ Google Gemini AI modülü - Agentic Approach
 Bu modül Google Gemini'yi agent olarak kullanır, kendi kararlarını verir.
 """
 
+import asyncio
+import threading
+import time
 import google.generativeai as genai
-from typing import List, Dict, Any, Callable
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from config import Config
+from context_builder import ContextBuilder
+from async_utils import iterate_in_thread, run_blocking
+from llm_backend import LLMBackend, create_llm_backend
+from resilience import UpstreamUnavailable
+from model_tiering import ModelTierPolicy, TierCall
+
+# Spekülatif aramada karar beklenmeden aranan kaynaklar
+SPECULATIVE_SOURCES = ['transcript', 'book']
+
+# Native function calling: araç adı -> kaynak etiketi
+TOOL_SOURCES = {'search_transcript': 'transcript', 'search_book': 'book'}
+
+# Araç sonuçları verildikten sonra modelin yeni araç çağırmadan yanıtlaması için
+NO_FUNCTION_CALLS = {'function_calling_config': {'mode': 'NONE'}}
+
+# Yedek mod: model kullanılamadığında kaynak başına gösterilen alıntı sayısı ve uzunluğu
+DEGRADED_SNIPPETS_PER_SOURCE = 2
+DEGRADED_SNIPPET_CHARS = 400
+SOURCE_LABELS = {'transcript': 'Ders İçeriği', 'book': 'Kitap'}
 
 class AgenticGeminiChatbot:
     """Agentic Google Gemini chatbot sınıfı"""
     
-    def __init__(self):
-        """Gemini API'yi yapılandır"""
-        genai.configure(api_key=Config.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.5-flash') #flash
+    def __init__(self, backend: Optional[LLMBackend] = None):
+        """
+        Gemini API'yi (veya yapılandırılan LLM backend'ini) yapılandır
+        
+        Args:
+            backend: LLM backend'i (None ise Config.LLM_BACKEND'e göre oluşturulur)
+        """
+        self.backend = backend or create_llm_backend()
+        
+        # Final yanıt modeli istek başına seçilir (hızlı / büyük katman)
+        self.tier_policy = ModelTierPolicy(
+            {'fast': Config.FAST_MODEL, 'large': Config.LARGE_MODEL},
+            budget_seconds=Config.LATENCY_BUDGET_SECONDS,
+            short_question_words=Config.TIER_SHORT_QUESTION_WORDS,
+            mode=Config.MODEL_TIERING,
+            min_samples=Config.TIER_MIN_SAMPLES,
+            probe_seconds=Config.TIER_PROBE_SECONDS
+        )
+        self.tier_models = {tier: self.backend.model(name) for tier, name in self.tier_policy.models.items()}
+        self.model = self.tier_models['large']
+        # Kısa karar çağrısı ayrı aşamadır (kendi süre sınırı ve hedged istekleri)
+        self.decision_model = self.backend.model(Config.DECISION_MODEL, stage='decision')
         
         # Araçları sakla
         self.available_tools = {}
+        
+        # Birden fazla kaynağı tek embedding ile paralel arayan retriever (opsiyonel)
+        self.retriever: Optional[Callable[[str, List[str]], Dict[str, Any]]] = None
+        
+        # LLM karar çağrısı yerine kaynak kararı veren yerel yönlendirici (opsiyonel)
+        self.router: Optional[Callable[[str], Optional[str]]] = None
+        
+        # Karar çağrısıyla eşzamanlı (spekülatif) arama ve boşa giden iş sayaçları. Arama
+        # retriever'ın kendi havuzunu beklediği için ortak havuz yerine ayrı (aynı boyutta) havuz
+        self.speculative_retrieval = Config.SPECULATIVE_RETRIEVAL
+        self.speculation_executor = ThreadPoolExecutor(
+            max_workers=Config.BLOCKING_WORKERS, thread_name_prefix="speculative"
+        )
+        self.speculation_lock = threading.Lock()
+        self.speculation_counters = {
+            'runs': 0,
+            'kept_searches': 0,
+            'discarded_searches': 0,
+            'discarded_runs': 0,
+        }
+        
+        # Async akışta SDK'nın async metotlarını kullan (kapalıysa senkron akış köprülenir)
+        self.async_llm = Config.ASYNC_LLM
+        
+        # Agent modu: decision (karar + yanıt çağrısı) | function_calling (araçlar model turunda).
+        # Araçlar retriever'ın havuzunu beklediği için ortak havuz yerine ayrı (aynı boyutta) havuz
+        self.agent_mode = Config.AGENT_MODE
+        self.tool_executor = ThreadPoolExecutor(max_workers=Config.BLOCKING_WORKERS, thread_name_prefix="tools")
+        self.call_lock = threading.Lock()
+        self.call_counters = {'requests': 0, 'model_calls': 0, 'tool_calls': 0, 'degraded': 0,
+                              'retrieval_failed': 0}
+        
+        # Final prompt bağlamını token bütçesine sığdıran oluşturucu
+        self.context_builder = ContextBuilder(Config.CONTEXT_TOKEN_BUDGET)
         print("✅ Agentic Google Gemini modeli başlatıldı")
     
     def register_tool(self, name: str, func: Callable, description: str):
@@ -34,74 +109,647 @@ class AgenticGeminiChatbot:
         }
         print(f"🔧 Araç kaydedildi: {name}")
     
-    def decide_and_respond(self, query: str) -> str:
+    def set_retriever(self, retriever: Optional[Callable[[str, List[str]], Dict[str, Any]]]):
         """
-        Kullanıcı sorusuna göre hangi araçları kullanacağına karar verir ve yanıt oluşturur
+        Kaynak araması için retriever ayarla
+        
+        Args:
+            retriever: (soru, kaynak etiketleri) -> {'results': [(etiket, sonuç)], 'timings': {...}}
+                None ise kayıtlı araçlar tek tek çağrılır
+        """
+        self.retriever = retriever
+    
+    def set_duplicate_lookup(self, duplicate_of: Optional[Callable[[str, int], Optional[str]]]):
+        """
+        Bağlam oluştururken near-duplicate olarak elenen chunk'ları bulmak için eşleme ayarla
+        
+        Args:
+            duplicate_of: (kaynak, chunk_index) -> tutulan chunk ID'si (ör. IndexManifest.duplicate_of).
+                None ise elenen chunk'ların iki yanındaki chunk'lar komşu sayılmaz
+        """
+        self.context_builder.duplicate_of = duplicate_of
+    
+    def set_router(self, router: Optional[Callable[[str], Optional[str]]]):
+        """
+        Kaynak kararı için yerel yönlendirici ayarla
+        
+        Args:
+            router: soru -> karar (TRANSCRIPT_ONLY, BOOK_ONLY, ...) veya emin değilse None.
+                None ise (veya karar vermezse) karar LLM'e sorulur
+        """
+        self.router = router
+    
+    def _decide(self, query: str, speculate: bool = False) -> Tuple[Optional[str], str, Optional[Future]]:
+        """
+        Kaynak kararını ver: önce yerel yönlendirici, emin değilse LLM
         
         Args:
             query: Kullanıcı sorusu
-            
+            speculate: Karar LLM'e soruluyorsa tüm kaynaklarda aramayı aynı anda başlat
+        
         Returns:
-            Final yanıt
+            (karar veya None, kararı veren, spekülatif arama veya None)
         """
+        if self.router is not None:
+            decision = self.router(query)
+            if decision:
+                return decision, 'yerel yönlendirme', None
+        
+        prefetch = self._start_prefetch(query, speculate)
         try:
-            # İlk karar verme promptu
             decision_prompt = self._create_decision_prompt(query)
             
             # Model karar veriyor - debug print kaldırıldı
-            decision_response = self.model.generate_content(decision_prompt)
+            decision_response = self.decision_model.generate_content(decision_prompt)
+        except UpstreamUnavailable as e:
+            # Karar alınamadı: iki kaynakta da ara (spekülatif arama zaten ikisini arıyor)
+            print(f"⚠️ Karar çağrısı başarısız, iki kaynak kullanılıyor: {e}")
+            return 'BOTH_SOURCES', 'yedek karar', prefetch
+        except Exception:
+            self._discard_prefetch(prefetch)
+            raise
+        
+        if not decision_response.text:
+            self._discard_prefetch(prefetch)
+            return None, 'model kararı', None
+        return decision_response.text.strip(), 'model kararı', prefetch
+    
+    async def _decide_async(self, query: str, speculate: bool = False) -> Tuple[Optional[str], str, Optional[Future]]:
+        """_decide'ın async versiyonu: karar çağrısı SDK'nın async metoduyla yapılır"""
+        if self.router is not None:
+            # Yönlendirici embedding oluşturur (bloklayan çağrı)
+            decision = await run_blocking(self.router, query)
+            if decision:
+                return decision, 'yerel yönlendirme', None
+        
+        prefetch = self._start_prefetch(query, speculate)
+        try:
+            decision_response = await self.decision_model.generate_content_async(self._create_decision_prompt(query))
+        except UpstreamUnavailable as e:
+            print(f"⚠️ Karar çağrısı başarısız, iki kaynak kullanılıyor: {e}")
+            return 'BOTH_SOURCES', 'yedek karar', prefetch
+        except BaseException:
+            self._discard_prefetch(prefetch)
+            raise
+        
+        if not decision_response.text:
+            self._discard_prefetch(prefetch)
+            return None, 'model kararı', None
+        return decision_response.text.strip(), 'model kararı', prefetch
+    
+    def _start_prefetch(self, query: str, speculate: bool) -> Optional[Future]:
+        """Spekülatif mod açıksa tüm kaynaklarda aramayı arka planda başlat"""
+        if not (speculate and self.speculative_retrieval and self.retriever is not None):
+            return None
+        self._count_speculation(runs=1)
+        return self.speculation_executor.submit(self.retriever, query, SPECULATIVE_SOURCES)
+    
+    def _count_speculation(self, **increments: int):
+        """Spekülatif arama sayaçlarını artır"""
+        with self.speculation_lock:
+            for name, value in increments.items():
+                self.speculation_counters[name] += value
+    
+    def _discard_prefetch(self, prefetch: Optional[Future]):
+        """Kullanılmayacak spekülatif aramayı boşa gitmiş say"""
+        if prefetch is not None:
+            self._count_speculation(discarded_searches=len(SPECULATIVE_SOURCES), discarded_runs=1)
+    
+    def speculation_stats(self) -> Dict[str, Any]:
+        """Spekülatif arama sayaçları"""
+        with self.speculation_lock:
+            counters = dict(self.speculation_counters)
+        searches = counters['kept_searches'] + counters['discarded_searches']
+        counters['enabled'] = self.speculative_retrieval
+        counters['discarded_rate'] = counters['discarded_searches'] / searches if searches else 0.0
+        return counters
+    
+    def decide_and_respond(self, query: str, trace: Optional[Dict[str, Any]] = None,
+                           latency_budget: Optional[float] = None) -> str:
+        """
+        Kullanıcı sorusuna göre hangi araçları kullanacağına karar verir ve yanıt oluşturur
+        
+        Args:
+            query: Kullanıcı sorusu
+            trace: Verilirse karar, kaynak bilgisi ve yanıtın tamamlanıp tamamlanmadığı yazılır
+            latency_budget: İsteğin gecikme bütçesi, saniye (None ise LATENCY_BUDGET_SECONDS)
+        
+        Returns:
+            Final yanıt
+        """
+        if self.agent_mode == "function_calling":
+            return "".join(self._respond_with_tools_stream(query, trace, latency_budget))
+        
+        started = time.perf_counter()
+        counts = {'model_calls': 0, 'tool_calls': 0}
+        context_data, tier_call = None, None
+        try:
+            # İlk karar verme (yerel yönlendirici veya model; model beklenirken arama başlar)
+            decision, decided_by, prefetch = self._decide(query, speculate=True)
+            # Başarısız karar çağrısı (yedek karar) da model çağrısı sayılır
+            counts['model_calls'] += int(decided_by != 'yerel yönlendirme')
             
-            if not decision_response.text:
+            if not decision:
                 return "Üzgünüm, karar veremiyorum."
             
-            decision = decision_response.text.strip()
-            # Model kararı debug print kaldırıldı
-            
             # Karara göre araçları kullan ve bilgi topla
-            context_data = self._execute_decision(decision, query)
+            context_data = self._execute_decision(decision, query, decided_by, prefetch)
+            counts['tool_calls'] += len(context_data['results'])
             
-            # Final yanıt oluştur
-            final_response = self._generate_final_response(query, context_data, decision)
+            # Final yanıt oluştur (model katmanı bütçeye göre seçilir)
+            tier_call = self._start_tier_call(query, decision, started, latency_budget, trace)
+            counts['model_calls'] += 1
+            final_response = self._generate_final_response(query, context_data, decision, tier_call.tier)
+            tier_call.finish()
+            self._fill_trace(trace, decision, context_data)
             
             return final_response
-            
+        
+        except UpstreamUnavailable as e:
+            if tier_call:
+                tier_call.finish()
+            return self._degraded_answer(query, context_data, False, trace, e)
         except Exception as e:
             print(f"❌ Agentic yanıt hatası: {e}")
             return f"Hata oluştu: {str(e)}"
+        finally:
+            self._record_calls(trace, counts)
     
-    def decide_and_respond_stream(self, query: str):
+    def decide_and_respond_stream(self, query: str, trace: Optional[Dict[str, Any]] = None,
+                                  latency_budget: Optional[float] = None):
         """
         Streaming versiyonu
+        
+        Args:
+            query: Kullanıcı sorusu
+            trace: Verilirse karar, kaynak bilgisi ve yanıtın tamamlanıp tamamlanmadığı yazılır
+            latency_budget: İsteğin gecikme bütçesi, saniye (None ise LATENCY_BUDGET_SECONDS)
         """
+        if self.agent_mode == "function_calling":
+            yield from self._respond_with_tools_stream(query, trace, latency_budget)
+            return
+        
+        started = time.perf_counter()
+        counts = {'model_calls': 0, 'tool_calls': 0}
+        context_data, streamed, tier_call = None, False, None
         try:
-            # İlk karar verme
-            decision_prompt = self._create_decision_prompt(query)
-            
-            # Model karar veriyor - debug print kaldırıldı
-            decision_response = self.model.generate_content(decision_prompt)
+            # İlk karar verme (yerel yönlendirici veya model; model beklenirken arama başlar)
+            decision, decided_by, prefetch = self._decide(query, speculate=True)
+            # Başarısız karar çağrısı (yedek karar) da model çağrısı sayılır
+            counts['model_calls'] += int(decided_by != 'yerel yönlendirme')
             
-            if not decision_response.text:
+            if not decision:
                 yield "Üzgünüm, karar veremiyorum."
                 return
             
-            decision = decision_response.text.strip()
-            # Model kararı debug print kaldırıldı
-            
             # Karara göre araçları kullan
-            context_data = self._execute_decision(decision, query)
+            context_data = self._execute_decision(decision, query, decided_by, prefetch)
+            counts['tool_calls'] += len(context_data['results'])
             
             # Streaming final yanıt
             final_prompt = self._create_final_prompt(query, context_data, decision)
             
-            response = self.model.generate_content(final_prompt, stream=True)
+            tier_call = self._start_tier_call(query, decision, started, latency_budget, trace)
+            counts['model_calls'] += 1
+            response = self.tier_models[tier_call.tier].generate_content(final_prompt, stream=True)
             
             for chunk in response:
                 if chunk.text:
+                    streamed = True
+                    tier_call.chunk()
                     yield chunk.text
-                    
+            tier_call.finish()
+            self._fill_trace(trace, decision, context_data)
+        
+        except UpstreamUnavailable as e:
+            if tier_call:
+                tier_call.finish()
+            yield self._degraded_answer(query, context_data, streamed, trace, e)
         except Exception as e:
             print(f"❌ Agentic streaming hatası: {e}")
             yield f"Hata oluştu: {str(e)}"
+        finally:
+            self._record_calls(trace, counts)
+    
+    async def decide_and_respond_stream_async(self, query: str, trace: Optional[Dict[str, Any]] = None,
+                                              latency_budget: Optional[float] = None):
+        """
+        decide_and_respond_stream'in async versiyonu: LLM çağrıları SDK'nın async
+        metotlarıyla, embedding ve arama thread havuzunda yapılır; event loop bloklanmaz.
+        ASYNC_LLM kapalıysa senkron akış thread havuzunda çalıştırılıp köprülenir.
+        
+        Args:
+            query: Kullanıcı sorusu
+            trace: Verilirse karar, kaynak bilgisi ve yanıtın tamamlanıp tamamlanmadığı yazılır
+            latency_budget: İsteğin gecikme bütçesi, saniye (None ise LATENCY_BUDGET_SECONDS)
+        """
+        if not self.async_llm:
+            async for chunk in iterate_in_thread(self.decide_and_respond_stream(query, trace, latency_budget)):
+                yield chunk
+            return
+        if self.agent_mode == "function_calling":
+            async for chunk in self._respond_with_tools_stream_async(query, trace, latency_budget):
+                yield chunk
+            return
+        
+        started = time.perf_counter()
+        counts = {'model_calls': 0, 'tool_calls': 0}
+        context_data, streamed, tier_call = None, False, None
+        try:
+            # İlk karar verme (yerel yönlendirici veya model; model beklenirken arama başlar)
+            decision, decided_by, prefetch = await self._decide_async(query, speculate=True)
+            # Başarısız karar çağrısı (yedek karar) da model çağrısı sayılır
+            counts['model_calls'] += int(decided_by != 'yerel yönlendirme')
+            
+            if not decision:
+                yield "Üzgünüm, karar veremiyorum."
+                return
+            
+            # Arama sonuçlarını bekleme ve bağlam hazırlama thread havuzunda
+            context_data = await run_blocking(self._execute_decision, decision, query, decided_by, prefetch)
+            counts['tool_calls'] += len(context_data['results'])
+            
+            # Streaming final yanıt
+            final_prompt = self._create_final_prompt(query, context_data, decision)
+            
+            tier_call = self._start_tier_call(query, decision, started, latency_budget, trace)
+            counts['model_calls'] += 1
+            response = await self.tier_models[tier_call.tier].generate_content_async(final_prompt, stream=True)
+            
+            async for chunk in response:
+                if chunk.text:
+                    streamed = True
+                    tier_call.chunk()
+                    yield chunk.text
+            tier_call.finish()
+            self._fill_trace(trace, decision, context_data)
+        
+        except asyncio.CancelledError:
+            raise
+        except UpstreamUnavailable as e:
+            if tier_call:
+                tier_call.finish()
+            yield await run_blocking(self._degraded_answer, query, context_data, streamed, trace, e)
+        except Exception as e:
+            print(f"❌ Agentic async streaming hatası: {e}")
+            yield f"Hata oluştu: {str(e)}"
+        finally:
+            self._record_calls(trace, counts)
+    
+    def _respond_with_tools_stream(self, query: str, trace: Optional[Dict[str, Any]] = None,
+                                   latency_budget: Optional[float] = None):
+        """
+        Native function calling ile streaming yanıt: model araçları (gerekirse paralel)
+        kendi turunda çağırır; arama gerekmeyen sorular tek model çağrısıyla yanıtlanır.
+        İlk turun metni tur bitene kadar tutulur: fonksiyon çağrısı gelirse atılır (yanıtı
+        araç sonuçlarıyla ikinci tur üretir), gelmezse yanıtın kendisi olarak gönderilir.
+        
+        Args:
+            query: Kullanıcı sorusu
+            trace: Verilirse karar, kaynak bilgisi, çağrı sayıları ve tamamlanma yazılır
+            latency_budget: İsteğin gecikme bütçesi, saniye (None ise LATENCY_BUDGET_SECONDS)
+        """
+        started = time.perf_counter()
+        counts = {'model_calls': 0, 'tool_calls': 0}
+        context_data, streamed, tier_call = None, False, None
+        try:
+            tools = self._function_tools()
+            prompt = self._create_function_calling_prompt(query)
+            # Kaynak kararı henüz yok: katman soru uzunluğu ve bütçeye göre seçilir
+            tier_call = self._start_tier_call(query, None, started, latency_budget, trace)
+            model = self.tier_models[tier_call.tier]
+            
+            counts['model_calls'] += 1
+            calls, first_turn = [], []
+            for chunk in model.generate_content(prompt, tools=tools, stream=True):
+                texts, chunk_calls = self._split_parts(chunk)
+                calls.extend(chunk_calls)
+                if texts:
+                    tier_call.chunk()
+                first_turn.extend(texts)
+            
+            decision, context_data = 'NO_SEARCH', {'results': [], 'source_info': 'Genel bilgi (arama yok)'}
+            if not calls:
+                streamed = bool(first_turn)
+                yield from first_turn
+            else:
+                counts['tool_calls'] += len(calls)
+                contents, context_data, decision = self._run_tool_calls(prompt, query, calls)
+                
+                counts['model_calls'] += 1
+                response = model.generate_content(
+                    contents, tools=tools, tool_config=NO_FUNCTION_CALLS, stream=True
+                )
+                for chunk in response:
+                    texts = self._split_parts(chunk)[0]
+                    streamed = streamed or bool(texts)
+                    if texts:
+                        tier_call.chunk()
+                    yield from texts
+            tier_call.finish()
+            self._fill_trace(trace, decision, context_data)
+        
+        except UpstreamUnavailable as e:
+            if tier_call:
+                tier_call.finish()
+            yield self._degraded_answer(query, context_data, streamed, trace, e)
+        except Exception as e:
+            print(f"❌ Function calling hatası: {e}")
+            yield f"Hata oluştu: {str(e)}"
+        finally:
+            self._record_calls(trace, counts)
+    
+    async def _respond_with_tools_stream_async(self, query: str, trace: Optional[Dict[str, Any]] = None,
+                                               latency_budget: Optional[float] = None):
+        """_respond_with_tools_stream'in async versiyonu (araçlar thread havuzunda çalışır)"""
+        started = time.perf_counter()
+        counts = {'model_calls': 0, 'tool_calls': 0}
+        context_data, streamed, tier_call = None, False, None
+        try:
+            tools = self._function_tools()
+            prompt = self._create_function_calling_prompt(query)
+            # Kaynak kararı henüz yok: katman soru uzunluğu ve bütçeye göre seçilir
+            tier_call = self._start_tier_call(query, None, started, latency_budget, trace)
+            model = self.tier_models[tier_call.tier]
+            
+            counts['model_calls'] += 1
+            calls, first_turn = [], []
+            async for chunk in await model.generate_content_async(prompt, tools=tools, stream=True):
+                texts, chunk_calls = self._split_parts(chunk)
+                calls.extend(chunk_calls)
+                if texts:
+                    tier_call.chunk()
+                first_turn.extend(texts)
+            
+            decision, context_data = 'NO_SEARCH', {'results': [], 'source_info': 'Genel bilgi (arama yok)'}
+            if not calls:
+                streamed = bool(first_turn)
+                for text in first_turn:
+                    yield text
+            else:
+                counts['tool_calls'] += len(calls)
+                contents, context_data, decision = await run_blocking(self._run_tool_calls, prompt, query, calls)
+                
+                counts['model_calls'] += 1
+                response = await model.generate_content_async(
+                    contents, tools=tools, tool_config=NO_FUNCTION_CALLS, stream=True
+                )
+                async for chunk in response:
+                    for text in self._split_parts(chunk)[0]:
+                        streamed = True
+                        tier_call.chunk()
+                        yield text
+            tier_call.finish()
+            self._fill_trace(trace, decision, context_data)
+        
+        except asyncio.CancelledError:
+            raise
+        except UpstreamUnavailable as e:
+            if tier_call:
+                tier_call.finish()
+            yield await run_blocking(self._degraded_answer, query, context_data, streamed, trace, e)
+        except Exception as e:
+            print(f"❌ Function calling hatası: {e}")
+            yield f"Hata oluştu: {str(e)}"
+        finally:
+            self._record_calls(trace, counts)
+    
+    def _function_tools(self) -> List[Any]:
+        """Kayıtlı araçları Gemini function declaration'ları olarak döndür"""
+        declarations = [
+            genai.protos.FunctionDeclaration(
+                name=name,
+                description=info['description'],
+                parameters=genai.protos.Schema(
+                    type=genai.protos.Type.OBJECT,
+                    properties={
+                        'query': genai.protos.Schema(
+                            type=genai.protos.Type.STRING,
+                            description='Aranacak soru veya anahtar ifadeler'
+                        )
+                    },
+                    required=['query']
+                )
+            )
+            for name, info in self.available_tools.items()
+        ]
+        return [genai.protos.Tool(function_declarations=declarations)] if declarations else []
+    
+    @staticmethod
+    def _split_parts(chunk) -> Tuple[List[str], List[Any]]:
+        """Yanıt parçasındaki metinleri ve fonksiyon çağrılarını ayır"""
+        texts, calls = [], []
+        for candidate in chunk.candidates[:1]:
+            for part in candidate.content.parts:
+                if 'function_call' in part:
+                    calls.append(part.function_call)
+                elif part.text:
+                    texts.append(part.text)
+        return texts, calls
+    
+    def _call_tools(self, query: str, calls: List[Any]) -> List[Tuple[Optional[str], Dict[str, Any]]]:
+        """
+        Fonksiyon çağrılarını paralel çalıştır
+        
+        Returns:
+            Çağrı sırasıyla (kaynak etiketi, araç sonucu); bilinmeyen araçta etiket None
+        """
+        requests = []
+        for call in calls:
+            args = dict(call.args) if call.args else {}
+            requests.append((call.name, TOOL_SOURCES.get(call.name), str(args.get('query') or query)))
+        
+        futures = {}
+        if self.retriever is not None:
+            # Aynı sorguyla çağrılan kaynaklar tek embedding ile birlikte aranır
+            grouped: Dict[str, List[str]] = {}
+            for name, label, search_query in requests:
+                if label and name in self.available_tools and label not in grouped.setdefault(search_query, []):
+                    grouped[search_query].append(label)
+            for search_query, labels in grouped.items():
+                futures[search_query] = self.tool_executor.submit(self.retriever, search_query, labels)
+            retrieved = {
+                (search_query, label): result
+                for search_query, future in futures.items()
+                for label, result in future.result()['results']
+            }
+            return [
+                (label, retrieved[(search_query, label)]) if (search_query, label) in retrieved
+                else (None, {'error': f'Bilinmeyen araç: {name}'})
+                for name, label, search_query in requests
+            ]
+        
+        for index, (name, label, search_query) in enumerate(requests):
+            if name in self.available_tools:
+                futures[index] = self.tool_executor.submit(self.available_tools[name]['function'], search_query)
+        return [
+            (label, futures[index].result()) if index in futures
+            else (None, {'error': f'Bilinmeyen araç: {name}'})
+            for index, (name, label, _) in enumerate(requests)
+        ]
+    
+    def _run_tool_calls(self, prompt: str, query: str,
+                        calls: List[Any]) -> Tuple[List[Any], Dict[str, Any], str]:
+        """
+        Fonksiyon çağrılarını çalıştır ve ikinci model turu için içerikleri hazırla
+        
+        Returns:
+            (konuşma içerikleri, context_data, çağrılan kaynaklara karşılık gelen karar)
+        """
+        outputs = self._call_tools(query, calls)
+        print("🔧 Araç çağrıları: " + ", ".join(call.name for call in calls))
+        
+        # Bağlam bütçesi çağrılar arasında paylaştırılır
+        budget = self.context_builder.token_budget
+        builder = ContextBuilder(budget // len(calls) if budget > 0 else 0, self.context_builder.duplicate_of)
+        responses = []
+        results = []
+        for call, (label, result) in zip(calls, outputs):
+            if label is None:
+                payload = {'error': result.get('error', '')}
+            else:
+                results.append((label, result))
+                context_text, _ = builder.build([(label, result)])
+                payload = {'source': label, 'context': context_text or 'Sonuç bulunamadı.'}
+            responses.append(genai.protos.Part(
+                function_response=genai.protos.FunctionResponse(name=call.name, response=payload)
+            ))
+        
+        contents = [
+            genai.protos.Content(role='user', parts=[genai.protos.Part(text=prompt)]),
+            genai.protos.Content(role='model', parts=[genai.protos.Part(function_call=call) for call in calls]),
+            genai.protos.Content(role='user', parts=responses),
+        ]
+        
+        labels = {label for label, _ in results}
+        if labels >= {'transcript', 'book'}:
+            decision, source_info = 'BOTH_SOURCES', 'Ders İçeriği + Kitap (araç çağrısı)'
+        elif 'transcript' in labels:
+            decision, source_info = 'TRANSCRIPT_ONLY', 'Ders İçeriği (araç çağrısı)'
+        elif 'book' in labels:
+            decision, source_info = 'BOOK_ONLY', 'Kitap (araç çağrısı)'
+        else:
+            decision, source_info = 'NO_SEARCH', 'Genel bilgi (arama yok)'
+        context_data = {'results': results, 'source_info': source_info, 'query': query}
+        return contents, context_data, decision
+    
+    def _start_tier_call(self, query: str, decision: Optional[str], started: float,
+                         latency_budget: Optional[float], trace: Optional[Dict[str, Any]]) -> TierCall:
+        """
+        Final yanıt için model katmanını seç; seçim trace'e yazılır
+        
+        Args:
+            query: Kullanıcı sorusu
+            decision: Kaynak kararı (function calling modunda None)
+            started: İsteğin başladığı an (time.perf_counter)
+            latency_budget: İsteğin gecikme bütçesi (None ise varsayılan)
+            trace: Verilirse 'model_tier' ve 'model' yazılır
+        """
+        choice = self.tier_policy.choose(query, decision, time.perf_counter() - started, latency_budget)
+        if trace is not None:
+            trace['model_tier'] = choice['tier']
+            trace['model'] = choice['model']
+        print(f"🎚️ Model katmanı: {choice['tier']} ({choice['model']}, {choice['reason']})")
+        return TierCall(self.tier_policy, choice, started)
+    
+    def tier_stats(self) -> Dict[str, Any]:
+        """Model katmanı politikası, seçim sayaçları ve katman başına gecikmeler"""
+        return self.tier_policy.stats()
+    
+    def _record_calls(self, trace: Optional[Dict[str, Any]], counts: Dict[str, int]):
+        """İstek başına model/araç çağrı sayılarını trace'e ve toplam sayaçlara yaz"""
+        with self.call_lock:
+            self.call_counters['requests'] += 1
+            for name, value in counts.items():
+                self.call_counters[name] += value
+        if trace is not None:
+            trace.update(counts)
+        print(f"📞 Model çağrısı: {counts['model_calls']}, araç çağrısı: {counts['tool_calls']}")
+    
+    def call_stats(self) -> Dict[str, Any]:
+        """Toplam ve istek başına ortalama model/araç çağrı sayıları"""
+        with self.call_lock:
+            counters = dict(self.call_counters)
+        requests = counters['requests']
+        counters['mode'] = self.agent_mode
+        counters['model_calls_per_request'] = counters['model_calls'] / requests if requests else 0.0
+        counters['tool_calls_per_request'] = counters['tool_calls'] / requests if requests else 0.0
+        return counters
+    
+    def _degraded_answer(self, query: str, context_data: Optional[Dict[str, Any]], partial: bool,
+                         trace: Optional[Dict[str, Any]], error: Exception) -> str:
+        """
+        Model kullanılamadığında (süre aşımı, hata, açık devre) yedek yanıt: arama
+        sonuçlarından kısa alıntılar. Yanıt önbelleğe yazılmaz (trace tamamlanmış sayılmaz).
+        
+        Args:
+            query: Kullanıcı sorusu
+            context_data: Varsa daha önce toplanan arama sonuçları
+            partial: Model yanıtının bir kısmı zaten gönderildi mi
+            trace: Verilirse 'degraded' işaretlenir
+            error: Modelin kullanılamama nedeni
+        """
+        print(f"⚠️ Model kullanılamıyor, yedek moda geçildi: {error}")
+        with self.call_lock:
+            self.call_counters['degraded'] += 1
+        if trace is not None:
+            trace['degraded'] = True
+        if partial:
+            return "\n\n⚠️ Yanıt zaman aşımı nedeniyle yarıda kesildi. Lütfen tekrar deneyin."
+        
+        if not context_data or not context_data.get('results'):
+            try:
+                context_data = self._execute_decision('BOTH_SOURCES', query, 'yedek mod')
+            except Exception as search_error:
+                print(f"⚠️ Yedek mod araması başarısız: {search_error}")
+                context_data = {'results': []}
+        
+        snippets = []
+        for source, result in context_data['results']:
+            for document in (result.get('documents') or [])[:DEGRADED_SNIPPETS_PER_SOURCE]:
+                text = " ".join(document.split())
+                if len(text) > DEGRADED_SNIPPET_CHARS:
+                    text = text[:DEGRADED_SNIPPET_CHARS].rsplit(" ", 1)[0] + "..."
+                snippets.append(f"📌 {SOURCE_LABELS.get(source, source)}: {text}")
+        
+        if not snippets:
+            return "⚠️ Şu an yapay zekâ modeline ulaşılamıyor. Lütfen biraz sonra tekrar deneyin."
+        return ("⚠️ Şu an yapay zekâ modeline ulaşılamıyor. Sorunuzla ilgili ders kaynaklarından "
+                "alıntılar:\n\n" + "\n\n".join(snippets))
+    
+    def _fill_trace(self, trace: Optional[Dict[str, Any]], decision: str, context_data: Dict[str, Any]):
+        """
+        Tamamlanan yanıtın karar bilgisini trace sözlüğüne yaz. Arama zaman aşımına uğradı
+        veya başarısız olduysa yanıt bağlamsız üretilmiştir: tamamlanmış sayılmaz
+        (önbelleğe yazılmaz), 'degraded' ve 'retrieval_failed' işaretlenir.
+        """
+        retrieval_failed = context_data.get('retrieval_failed') or any(
+            result.get('failed') for _, result in context_data.get('results', [])
+        )
+        if retrieval_failed:
+            with self.call_lock:
+                self.call_counters['retrieval_failed'] += 1
+        if trace is None:
+            return
+        trace['decision'] = decision
+        trace['source_info'] = context_data.get('source_info', '')
+        if retrieval_failed:
+            trace['degraded'] = True
+            trace['retrieval_failed'] = True
+        else:
+            trace['complete'] = True
+    
+    def _create_function_calling_prompt(self, query: str) -> str:
+        """Native function calling modunda tek tur promptu"""
+        return f"""Sen yardımsever bir ders asistanısın. Kullanıcının sorusunu yanıtla.
+
+KURALLAR:
+- Soru derste anlatılan konularla veya kitapla ilgiliyse yanıtlamadan önce arama araçlarını çağır. İki kaynak da gerekiyorsa iki aracı aynı anda çağır.
+- Genel bilgi veya sohbet sorularında araç çağırmadan doğrudan yanıt ver.
+- Araç sonuçlarını kullanarak detaylı ve yararlı bir yanıt ver. Ders içeriğinden bahsederken "hocanın dersinde..." şeklinde ifade et. Hangi kaynaktan bilgi aldığını belirt.
+- Yanıtlarını Türkçe ver.
+
+KULLANICI SORUSU: {query}"""
     
     def _create_decision_prompt(self, query: str) -> str:
         """Karar verme promptu oluştur"""
@@ -126,14 +774,25 @@ Sadece şu formatlardan birini kullan:
 - "NO_SEARCH" - Genel bilgi, arama gerekmez
 
 Kararını tek kelime olarak ver, açıklama yapma."""
-
+        
         return prompt
     
-    def _execute_decision(self, decision: str, query: str) -> Dict[str, Any]:
-        """Karara göre araçları çalıştır"""
+    def _execute_decision(self, decision: str, query: str, decided_by: str = 'model kararı',
+                          prefetch: Optional[Future] = None) -> Dict[str, Any]:
+        """
+        Karara göre araçları çalıştır
+        
+        Args:
+            decision: Kaynak kararı
+            query: Kullanıcı sorusu
+            decided_by: Kararı veren (kaynak bilgisinde gösterilir)
+            prefetch: Karar beklenirken başlatılan tüm kaynak araması; karara uyan
+                sonuçlar kullanılır, diğerleri atılır
+        """
         context_data = {
             'transcript_docs': [],
             'book_docs': [],
+            'results': [],
             'source_info': '',
             'query': query
         }
@@ -141,48 +800,81 @@ Kararını tek kelime olarak ver, açıklama yapma."""
         decision = decision.upper().strip()
         
         if 'TRANSCRIPT_ONLY' in decision:
-            if 'search_transcript' in self.available_tools:
-                result = self.available_tools['search_transcript']['function'](query)
-                context_data['transcript_docs'] = result.get('documents', [])
-                context_data['source_info'] = 'Ders İçeriği (model kararı)'
-                # Debug print kaldırıldı
-        
+            sources = ['transcript']
+            context_data['source_info'] = f'Ders İçeriği ({decided_by})'
         elif 'BOOK_ONLY' in decision:
-            if 'search_book' in self.available_tools:
-                result = self.available_tools['search_book']['function'](query)
-                context_data['book_docs'] = result.get('documents', [])
-                context_data['source_info'] = 'Kitap (model kararı)'
-                # Debug print kaldırıldı
-        
+            sources = ['book']
+            context_data['source_info'] = f'Kitap ({decided_by})'
         elif 'BOTH_SOURCES' in decision:
-            if 'search_transcript' in self.available_tools:
-                result = self.available_tools['search_transcript']['function'](query)
-                context_data['transcript_docs'] = result.get('documents', [])
-            
-            if 'search_book' in self.available_tools:
-                result = self.available_tools['search_book']['function'](query)
-                context_data['book_docs'] = result.get('documents', [])
-            
-            context_data['source_info'] = 'Ders İçeriği + Kitap (model kararı)'
-            # Debug print kaldırıldı
-        
+            sources = ['transcript', 'book']
+            context_data['source_info'] = f'Ders İçeriği + Kitap ({decided_by})'
         else:  # NO_SEARCH
+            sources = []
             context_data['source_info'] = 'Genel bilgi (arama yok)'
-            # Debug print kaldırıldı
+        
+        if not sources:
+            self._discard_prefetch(prefetch)
+        
+        if sources and prefetch is not None:
+            # Spekülatif arama çoğunlukla karar gelmeden bitmiştir
+            started = time.perf_counter()
+            try:
+                retrieval = prefetch.result(timeout=Config.RETRIEVAL_TIMEOUT)
+            except Exception as e:
+                if isinstance(e, FuturesTimeout):
+                    print(f"⚠️ Arama {Config.RETRIEVAL_TIMEOUT:.0f} s içinde bitmedi, bağlamsız devam ediliyor")
+                else:
+                    print(f"⚠️ Spekülatif arama başarısız, bağlamsız devam ediliyor: {e}")
+                # Henüz başlamadıysa çalıştırma; yanıt bağlamsız üretildiği için önbelleğe yazılmaz
+                prefetch.cancel()
+                self._discard_prefetch(prefetch)
+                context_data['retrieval_failed'] = True
+                prefetch, retrieval = None, {'results': [], 'timings': {}}
+            results = [(source, result) for source, result in retrieval['results'] if source in sources]
+            context_data['timings'] = dict(retrieval['timings'], wait=time.perf_counter() - started)
+            if prefetch is not None:
+                self._count_speculation(
+                    kept_searches=len(results), discarded_searches=len(retrieval['results']) - len(results)
+                )
+            print("⏱️  Spekülatif arama: " + ", ".join(
+                f"{name} {seconds * 1000:.0f} ms" for name, seconds in context_data['timings'].items()
+            ))
+        elif sources and self.retriever is not None:
+            # Soru bir kez embed edilir, kaynaklar paralel aranır
+            retrieval = self.retriever(query, sources)
+            results = retrieval['results']
+            context_data['timings'] = retrieval['timings']
+            print("⏱️  Arama: " + ", ".join(
+                f"{name} {seconds * 1000:.0f} ms" for name, seconds in retrieval['timings'].items()
+            ))
+        else:
+            results = [
+                (source, self.available_tools[f'search_{source}']['function'](query))
+                for source in sources if f'search_{source}' in self.available_tools
+            ]
+        
+        for source, result in results:
+            context_data[f'{source}_docs'] = result.get('documents', [])
+            context_data['results'].append((source, result))
         
         return context_data
     
-    def _generate_final_response(self, query: str, context_data: Dict[str, Any], decision: str) -> str:
-        """Final yanıt oluştur"""
+    def _generate_final_response(self, query: str, context_data: Dict[str, Any], decision: str,
+                                 tier: str = 'large') -> str:
+        """Final yanıt oluştur (verilen model katmanıyla)"""
         final_prompt = self._create_final_prompt(query, context_data, decision)
-        response = self.model.generate_content(final_prompt)
+        response = self.tier_models[tier].generate_content(final_prompt)
         return response.text if response.text else "Yanıt oluşturulamadı."
     
     def _create_final_prompt(self, query: str, context_data: Dict[str, Any], decision: str) -> str:
         """Final yanıt promptu"""
         
-        all_docs = context_data['transcript_docs'] + context_data['book_docs']
-        context_text = "\n\n".join(all_docs) if all_docs else ""
+        # Komşu chunk'ları birleştir, örtüşmeyi at ve token bütçesine sığdır
+        context_text, report = self.context_builder.build(context_data.get('results', []))
+        context_data['context_report'] = report
+        if report['chunks']:
+            print(f"✂️  Bağlam: {report['chunks']} chunk -> {report['segments']} segment, "
+                  f"~{report['context_tokens']} token ({report['saved_tokens']} token tasarruf)")
         
         if context_text:
             prompt = f"""Sen yardımsever bir ders asistanısın. Kullanıcının sorusunu verilen bağlam bilgileri kullanarak yanıtla.
@@ -214,7 +906,7 @@ Genel bilginle yardımcı bir yanıt ver."""
             query: Kullanıcı sorusu
             context_documents: Bağlam dökümanları
             source_info: Kaynak bilgisi (transcript/kitap)
-            
+        
         Returns:
             Oluşturulan yanıt
         """
@@ -229,7 +921,7 @@ Genel bilginle yardımcı bir yanıt ver."""
             response = self.model.generate_content(prompt)
             
             return response.text if response.text else "Üzgünüm, yanıt oluşturamadım."
-            
+        
         except Exception as e:
             print(f"❌ Yanıt oluşturma hatası: {e}")
             return f"Hata oluştu: {str(e)}"
@@ -243,7 +935,7 @@ Genel bilginle yardımcı bir yanıt ver."""
             query: Kullanıcı sorusu
             context_documents: Bağlam dökümanları
             source_info: Kaynak bilgisi (transcript/kitap)
-            
+        
         Yields:
             Yanıt parçaları
         """
@@ -260,7 +952,7 @@ Genel bilginle yardımcı bir yanıt ver."""
             for chunk in response:
                 if chunk.text:
                     yield chunk.text
-                    
+        
         except Exception as e:
             print(f"❌ Streaming yanıt hatası: {e}")
             yield f"Hata oluştu: {str(e)}"
@@ -273,7 +965,7 @@ Genel bilginle yardımcı bir yanıt ver."""
             query: Kullanıcı sorusu
             context: Bağlam metni
             source_info: Kaynak bilgisi
-            
+        
         Returns:
             Oluşturulan prompt
         """
@@ -291,7 +983,7 @@ Genel bilginle yardımcı bir yanıt ver."""
 9. Konu dışı bir soru gelirse kibarca sınırlarını belirt ve yanıt verme.
 10. Bağlantılı konularda tartışma yapabilirsin.
 """
-
+        
         if context:
             source_text = f"\n\nKAYNAK: {source_info}" if source_info else ""
             prompt = f"""{base_prompt}
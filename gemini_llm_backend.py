@@ -0,0 +1,58 @@
+"""
+Gemini LLM backend modülü
+Bu modül üretim ve embedding çağrılarını google.generativeai SDK'sına yönlendirir.
+"""
+
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+
+import google.generativeai as genai
+
+from config import Config
+from llm_backend import LLMBackend
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini API backend'i"""
+    
+    name = "gemini"
+    
+    def __init__(self, api_key: Optional[str] = None):
+        """
+        Args:
+            api_key: Google API anahtarı (None ise Config.GOOGLE_API_KEY)
+        """
+        genai.configure(api_key=api_key or Config.GOOGLE_API_KEY)
+        self.models: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+    
+    def _model(self, model_name: str) -> Any:
+        """Model adı için GenerativeModel (ilk kullanımda oluşturulur)"""
+        with self.lock:
+            if model_name not in self.models:
+                self.models[model_name] = genai.GenerativeModel(model_name)
+            return self.models[model_name]
+    
+    def generate(self, model_name: str, contents: Any, stage: str = 'answer', **options) -> Any:
+        return self._model(model_name).generate_content(contents, **options)
+    
+    def generate_stream(self, model_name: str, contents: Any, stage: str = 'answer', **options) -> Iterator[Any]:
+        return iter(self._model(model_name).generate_content(contents, stream=True, **options))
+    
+    async def generate_async(self, model_name: str, contents: Any, stage: str = 'answer', **options) -> Any:
+        return await self._model(model_name).generate_content_async(contents, **options)
+    
+    async def generate_stream_async(self, model_name: str, contents: Any, stage: str = 'answer', **options) -> AsyncIterator[Any]:
+        response = await self._model(model_name).generate_content_async(contents, stream=True, **options)
+        async for chunk in response:
+            yield chunk
+    
+    def embed(self, model_name: str, content: Union[str, List[str]], task_type: str,
+              timeout: Optional[float] = None) -> List[Any]:
+        result = genai.embed_content(
+            model=model_name,
+            content=content,
+            task_type=task_type,
+            request_options={'timeout': timeout} if timeout else None
+        )
+        return result['embedding']
@@ -0,0 +1,150 @@
+"""
+İndeks manifest modülü
+Bu modül vektör veritabanının yanında tutulan ingestion manifestini yönetir.
+Chunk ID'leri içerik adreslidir: (dosya, chunk metni, chunk ayarları, embedding modeli)
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+MANIFEST_FILE_NAME = "ingest_manifest.json"
+MANIFEST_VERSION = 1
+
+
+class IndexManifest:
+    """Koleksiyon başına ingestion durumunu saklayan manifest sınıfı"""
+    
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: Vektör veritabanı dizini (manifest bu dizine yazılır)
+        """
+        self.path = os.path.join(db_path, MANIFEST_FILE_NAME)
+        self.data = self._load()
+        self._fingerprint: Optional[str] = None
+    
+    def _load(self) -> Dict[str, Any]:
+        """Manifesti diskten yükle, yoksa veya bozuksa boş manifest döndür"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                return data
+            print(f"⚠️ Manifest sürümü uyumsuz, yok sayılıyor: {self.path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Manifest okunamadı, yok sayılıyor: {e}")
+        return {"version": MANIFEST_VERSION, "collections": {}}
+    
+    def save(self):
+        """Manifesti atomik olarak diske yaz"""
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"⚠️ Manifest yazılamadı: {e}")
+    
+    def get_entry(self, collection_name: str) -> Optional[Dict[str, Any]]:
+        """Koleksiyonun manifest kaydını al"""
+        return self.data["collections"].get(collection_name)
+    
+    def set_entry(self, collection_name: str, entry: Dict[str, Any]):
+        """Koleksiyonun manifest kaydını güncelle"""
+        self.data["collections"][collection_name] = entry
+        self._fingerprint = None
+    
+    def fingerprint(self) -> str:
+        """İndekslenen korpusun sürümü: koleksiyon kayıtları değişince değişir"""
+        if self._fingerprint is None:
+            payload = json.dumps(self.data["collections"], sort_keys=True, ensure_ascii=False)
+            self._fingerprint = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+        return self._fingerprint
+    
+    def duplicate_of(self, source: str, chunk_index: int) -> Optional[str]:
+        """
+        Near-duplicate olarak elenen chunk'ın yerine tutulan chunk'ın ID'si
+        
+        Args:
+            source: Kaynak dosya (chunk metadata'sındaki 'source')
+            chunk_index: Elenen chunk'ın dosyadaki sırası
+        
+        Returns:
+            Tutulan chunk ID'si; chunk elenmemişse None
+        """
+        for entry in self.data["collections"].values():
+            file_state = entry.get("files", {}).get(source)
+            if file_state is not None:
+                return file_state.get("duplicates", {}).get(str(chunk_index))
+        return None
+    
+    @staticmethod
+    def is_unchanged(entry: Optional[Dict[str, Any]], params: Dict[str, Any]) -> bool:
+        """
+        Manifest kaydı verilen ingestion parametreleriyle birebir uyuşuyor mu?
+        
+        Args:
+            entry: Manifest kaydı
+            params: Güncel ingestion parametreleri (kaynak, dosya özeti, chunk ayarları, model)
+        """
+        if not entry:
+            return False
+        return all(entry.get(key) == value for key, value in params.items())
+    
+    @staticmethod
+    def file_fingerprint(file_path: str) -> str:
+        """Dosya içeriğinin SHA-256 özetini hesapla"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def chunk_id(source: str, chunk: str, chunk_size: int, chunk_overlap: int,
+                 embedding_model: str) -> str:
+        """İçerik adresli chunk ID'si üret"""
+        key = "\0".join([source, str(chunk_size), str(chunk_overlap), embedding_model, chunk])
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+    
+    @classmethod
+    def make_chunk_ids(cls, source: str, chunks: List[str], chunk_size: int,
+                       chunk_overlap: int, embedding_model: str) -> List[str]:
+        """
+        Chunk listesi için ID'ler üret. Aynı dosyada tekrar eden metinler
+        sıra numarası ile ayrıştırılır.
+        """
+        assigner = ChunkIdAssigner(source, chunk_size, chunk_overlap, embedding_model)
+        return [assigner.assign(chunk) for chunk in chunks]
+
+
+class ChunkIdAssigner:
+    """Akış halinde gelen chunk'lara sırayla içerik adresli ID veren sınıf"""
+    
+    def __init__(self, source: str, chunk_size: int, chunk_overlap: int, embedding_model: str):
+        """
+        Args:
+            source: Kaynak dosya
+            chunk_size: Chunk boyutu
+            chunk_overlap: Chunk örtüşmesi
+            embedding_model: Embedding modeli
+        """
+        self.source = source
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.embedding_model = embedding_model
+        self.seen: Dict[str, int] = {}
+    
+    def assign(self, chunk: str) -> str:
+        """Sıradaki chunk için ID üret (tekrarlar sıra numarası alır)"""
+        base_id = IndexManifest.chunk_id(
+            self.source, chunk, self.chunk_size, self.chunk_overlap, self.embedding_model
+        )
+        occurrence = self.seen.get(base_id, 0)
+        self.seen[base_id] = occurrence + 1
+        return base_id if occurrence == 0 else f"{base_id}-{occurrence}"
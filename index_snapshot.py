@@ -0,0 +1,193 @@
+"""
+İndeks snapshot modülü
+Bu modül önceden oluşturulmuş, sürümlü ve checksum'lı vektör veritabanı
+snapshot'larını üretir ve uyumluysa açılışta veritabanı dizinine geri yükler.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Any, Dict, List, Optional
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_META_FILE = "snapshot.json"
+SNAPSHOT_DB_DIR = "db"
+RESTORED_MARKER_FILE = "restored_snapshot.json"
+
+# Snapshot'a alınmayan yerel dosya/dizinler
+EXCLUDED_NAMES = {"checkpoints", RESTORED_MARKER_FILE}
+
+
+def _file_sha256(path: str) -> str:
+    """Dosyanın SHA-256 özetini hesapla"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def corpus_fingerprint(file_paths: List[str]) -> str:
+    """
+    Korpus dosyalarının birleşik özetini hesapla
+    
+    Args:
+        file_paths: Korpus dosyaları (var olmayanlar da özete dahil edilir)
+    """
+    digest = hashlib.sha256()
+    for path in sorted(file_paths):
+        file_hash = _file_sha256(path) if os.path.exists(path) else "missing"
+        digest.update(f"{path}\0{file_hash}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _list_files(root: str) -> List[str]:
+    """Snapshot'a alınacak dosyaların göreli yollarını listele"""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in EXCLUDED_NAMES)
+        for name in sorted(filenames):
+            if name in EXCLUDED_NAMES or name.endswith(".tmp"):
+                continue
+            files.append(os.path.relpath(os.path.join(dirpath, name), root))
+    return files
+
+
+def _snapshot_id(meta: Dict[str, Any]) -> str:
+    """Snapshot içeriğini tekil olarak tanımlayan özet"""
+    payload = json.dumps({"params": meta["params"], "files": meta["files"]}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def build_snapshot(source_db_path: str, snapshot_path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Hazır bir veritabanı dizininden snapshot oluştur
+    
+    Args:
+        source_db_path: Ingestion'ı tamamlanmış veritabanı dizini
+        snapshot_path: Snapshot'ın yazılacağı dizin
+        params: Uyumluluk parametreleri (model, chunk ayarları, korpus özeti)
+    
+    Returns:
+        Snapshot metadata'sı
+    """
+    staging = snapshot_path.rstrip("/\\") + ".building"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(os.path.join(staging, SNAPSHOT_DB_DIR))
+    
+    files = {}
+    for rel_path in _list_files(source_db_path):
+        target = os.path.join(staging, SNAPSHOT_DB_DIR, rel_path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(os.path.join(source_db_path, rel_path), target)
+        files[rel_path] = _file_sha256(target)
+    
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "params": params,
+        "files": files,
+    }
+    meta["snapshot_id"] = _snapshot_id(meta)
+    with open(os.path.join(staging, SNAPSHOT_META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    
+    # Eski snapshot'ı yenisiyle atomik olarak değiştir
+    previous = snapshot_path.rstrip("/\\") + ".previous"
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(snapshot_path):
+        os.replace(snapshot_path, previous)
+    os.replace(staging, snapshot_path)
+    shutil.rmtree(previous, ignore_errors=True)
+    
+    print(f"📦 Snapshot oluşturuldu: {snapshot_path} ({len(files)} dosya, id={meta['snapshot_id']})")
+    return meta
+
+
+def load_snapshot_meta(snapshot_path: str) -> Optional[Dict[str, Any]]:
+    """Snapshot metadata'sını oku, yoksa veya sürüm uyumsuzsa None döndür"""
+    try:
+        with open(os.path.join(snapshot_path, SNAPSHOT_META_FILE), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️ Snapshot metadata okunamadı: {e}")
+        return None
+    if meta.get("version") != SNAPSHOT_VERSION:
+        print(f"⚠️ Snapshot sürümü uyumsuz: {meta.get('version')}")
+        return None
+    return meta
+
+
+def verify_snapshot(snapshot_path: str, meta: Dict[str, Any]) -> bool:
+    """Snapshot dosyalarının checksum'larını doğrula"""
+    db_dir = os.path.join(snapshot_path, SNAPSHOT_DB_DIR)
+    for rel_path, expected in meta["files"].items():
+        path = os.path.join(db_dir, rel_path)
+        if not os.path.exists(path) or _file_sha256(path) != expected:
+            print(f"⚠️ Snapshot checksum hatası: {rel_path}")
+            return False
+    return True
+
+
+def restore_snapshot_if_compatible(snapshot_path: str, db_path: str, params: Dict[str, Any]) -> bool:
+    """
+    Uyumlu bir snapshot varsa veritabanı dizinine geri yükle
+    
+    Args:
+        snapshot_path: Snapshot dizini
+        db_path: Hedef veritabanı dizini
+        params: Güncel uyumluluk parametreleri
+    
+    Returns:
+        Veritabanı snapshot içeriğiyle hazırsa True
+    """
+    meta = load_snapshot_meta(snapshot_path)
+    if not meta:
+        return False
+    
+    mismatched = [key for key, value in params.items() if meta["params"].get(key) != value]
+    if mismatched:
+        print(f"ℹ️  Snapshot uyumsuz ({', '.join(mismatched)}), ingestion yapılacak")
+        return False
+    
+    # Bu snapshot zaten geri yüklendiyse tekrar kopyalama
+    marker_path = os.path.join(db_path, RESTORED_MARKER_FILE)
+    try:
+        with open(marker_path, 'r', encoding='utf-8') as f:
+            if json.load(f).get("snapshot_id") == meta["snapshot_id"]:
+                print(f"✅ Snapshot zaten yüklü: {meta['snapshot_id']}")
+                return True
+    except Exception:
+        pass
+    
+    started = time.perf_counter()
+    if not verify_snapshot(snapshot_path, meta):
+        return False
+    
+    # Önce yan dizine kopyala, sonra yer değiştir; yerel dosyalar (checkpoint, önbellek) korunur
+    staging = db_path.rstrip("/\\") + ".restoring"
+    shutil.rmtree(staging, ignore_errors=True)
+    shutil.copytree(os.path.join(snapshot_path, SNAPSHOT_DB_DIR), staging)
+    if os.path.isdir(db_path):
+        for name in os.listdir(db_path):
+            source = os.path.join(db_path, name)
+            if not os.path.exists(os.path.join(staging, name)) and (
+                    name in EXCLUDED_NAMES or name.startswith("embedding_cache")):
+                shutil.move(source, os.path.join(staging, name))
+    with open(os.path.join(staging, RESTORED_MARKER_FILE), 'w', encoding='utf-8') as f:
+        json.dump({"snapshot_id": meta["snapshot_id"], "created_at": meta["created_at"]}, f)
+    
+    previous = db_path.rstrip("/\\") + ".previous"
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(db_path):
+        os.replace(db_path, previous)
+    os.replace(staging, db_path)
+    shutil.rmtree(previous, ignore_errors=True)
+    
+    elapsed = time.perf_counter() - started
+    print(f"📦 Snapshot geri yüklendi: {meta['snapshot_id']} ({elapsed:.2f} s)")
+    return True
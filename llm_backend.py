@@ -0,0 +1,111 @@
+"""
+LLM backend modülü
+Bu modül metin üretimi, streaming üretim ve embedding için backend arayüzünü,
+agent'ın kullandığı GenerativeModel uyumlu model nesnesini ve yapılandırmaya
+göre backend seçen fabrika fonksiyonunu içerir. Backend'ler ayrı modüllerdedir
+ve yalnızca seçildiklerinde içe aktarılır.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+
+from async_utils import iterate_in_thread, run_blocking
+from config import Config
+
+
+class LLMBackend(ABC):
+    """
+    LLM / embedding backend arayüzü
+    
+    Yanıt ve streaming parçaları google.generativeai yanıt nesneleriyle aynı
+    biçimdedir (.text, .candidates[0].content.parts). Üretim seçenekleri
+    (tools, tool_config, generation_config, request_options) SDK'daki adlarıyla
+    aktarılır. stage çağrının aşamasıdır ('decision' kısa karar çağrısı, 'answer'
+    yanıt üretimi); süre sınırı ve kopya istek kararları buna göre verilir.
+    """
+    
+    name = "base"
+    
+    @abstractmethod
+    def generate(self, model_name: str, contents: Any, stage: str = 'answer', **options) -> Any:
+        """Tam yanıt üret"""
+    
+    @abstractmethod
+    def generate_stream(self, model_name: str, contents: Any, stage: str = 'answer', **options) -> Iterator[Any]:
+        """Yanıtı parça parça üret"""
+    
+    @abstractmethod
+    def embed(self, model_name: str, content: Union[str, List[str]], task_type: str,
+              timeout: Optional[float] = None) -> List[Any]:
+        """
+        Metin(ler)i embed et (timeout verilirse istek o sürede kesilir)
+        
+        Returns:
+            Tek metin için vektör, metin listesi için vektör listesi
+        """
+    
+    async def generate_async(self, model_name: str, contents: Any, stage: str = 'answer', **options) -> Any:
+        """generate'in async versiyonu (varsayılan: thread havuzunda çalıştırılır)"""
+        return await run_blocking(self.generate, model_name, contents, stage, **options)
+    
+    async def generate_stream_async(self, model_name: str, contents: Any, stage: str = 'answer', **options) -> AsyncIterator[Any]:
+        """generate_stream'in async versiyonu (varsayılan: senkron akış köprülenir)"""
+        async for chunk in iterate_in_thread(self.generate_stream(model_name, contents, stage, **options)):
+            yield chunk
+    
+    def stats(self) -> Dict[str, Any]:
+        """Backend sayaçları (/metrics için)"""
+        return {"backend": self.name}
+    
+    def model(self, model_name: str, stage: str = 'answer') -> "BackendModel":
+        """Modele ve aşamaya bağlı, GenerativeModel uyumlu nesne döndür"""
+        return BackendModel(self, model_name, stage)
+
+
+class BackendModel:
+    """genai.GenerativeModel ile aynı çağrı biçimini backend'e yönlendiren model nesnesi"""
+    
+    def __init__(self, backend: LLMBackend, model_name: str, stage: str = 'answer'):
+        self.backend = backend
+        self.model_name = model_name
+        self.stage = stage
+    
+    def generate_content(self, contents: Any, stream: bool = False, **options) -> Any:
+        """Yanıt üret (stream=True ise parça iterator'ı döner)"""
+        if stream:
+            return self.backend.generate_stream(self.model_name, contents, self.stage, **options)
+        return self.backend.generate(self.model_name, contents, self.stage, **options)
+    
+    async def generate_content_async(self, contents: Any, stream: bool = False, **options) -> Any:
+        """Yanıt üret (stream=True ise async parça iterator'ı döner)"""
+        if stream:
+            return self.backend.generate_stream_async(self.model_name, contents, self.stage, **options)
+        return await self.backend.generate_async(self.model_name, contents, self.stage, **options)
+
+
+def create_llm_backend(backend: Optional[str] = None) -> LLMBackend:
+    """
+    Yapılandırılan LLM / embedding backend'ini oluştur (LLM_RESILIENCE açıksa
+    dayanıklılık katmanıyla sarılır)
+    
+    Args:
+        backend: "gemini" veya "fake" (None ise Config.LLM_BACKEND)
+    
+    Returns:
+        LLM backend'i
+    """
+    backend = (backend or Config.LLM_BACKEND).lower()
+    if backend == "gemini":
+        from gemini_llm_backend import GeminiBackend
+        inner = GeminiBackend()
+    elif backend == "fake":
+        from fake_llm_backend import FakeLLMBackend
+        inner = FakeLLMBackend()
+    else:
+        raise ValueError(f"Bilinmeyen LLM backend'i: {backend}")
+    
+    if not Config.LLM_RESILIENCE:
+        return inner
+    # Süre sınırları, hedged istekler ve devre kesici
+    from resilience import ResilientBackend
+    return ResilientBackend(inner)
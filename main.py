@@ -3,34 +3,156 @@ Ana chatbot sistemi - Agentic Approach
 Bu modül agentic chatbot'u çalıştırır, model kendi kararlarını verir.
 """
 
+import asyncio
+import contextlib
 import os
 import sys
+import tempfile
 import time
-from typing import List, Tuple, Dict, Any
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncContextManager, Awaitable, Callable, List, Tuple, Dict, Any, Optional
 from config import Config
 from text_processor import TextProcessor
 from embedding_generator import EmbeddingGenerator
-from vector_database import VectorDatabase
+from llm_backend import create_llm_backend
+from vector_database import VectorDatabase, create_vector_database
+from index_manifest import IndexManifest
+from corpus_ingestor import CorpusIngestor, resolve_source_files
+from index_snapshot import build_snapshot, corpus_fingerprint, restore_snapshot_if_compatible
 from gemini_chatbot import AgenticGeminiChatbot
+from answer_cache import SemanticAnswerCache
+from query_router import CentroidQueryRouter
+from singleflight import SingleFlight, normalize_question
+from async_utils import run_blocking
+
+# Önbellekten dönen yanıt bu boyutta parçalar halinde (beklemesiz) akıtılır
+CACHED_ANSWER_CHUNK_CHARS = 200
+
+class RetrievalCoordinator:
+    """Soruyu bir kez embed edip seçilen koleksiyonlarda eşzamanlı arama yapan sınıf"""
+    
+    def __init__(self, embedding_generator: EmbeddingGenerator, vector_db: VectorDatabase,
+                 n_results: int = 4):
+        """
+        Args:
+            embedding_generator: Embedding oluşturucu
+            vector_db: Vektör veritabanı
+            n_results: Kaynak başına sonuç sayısı
+        """
+        self.embedding_generator = embedding_generator
+        self.vector_db = vector_db
+        self.n_results = n_results
+        self.collections: Dict[str, Any] = {}
+        # retrieve ortak havuzdan (run_blocking) ve spekülatif aramadan çağrılıp bu havuzu
+        # beklediği için aramalar ayrı havuzda çalışır; ortak havuz kadar eşzamanlı istek taşır
+        self.executor = ThreadPoolExecutor(
+            max_workers=Config.BLOCKING_WORKERS, thread_name_prefix="retrieval"
+        )
+    
+    def set_collection(self, label: str, collection):
+        """Kaynak etiketi (ör. 'transcript') için koleksiyonu kaydet"""
+        self.collections[label] = collection
+    
+    def _search(self, label: str, query_embedding: List[float]) -> Tuple[Dict[str, Any], float]:
+        """Tek koleksiyonda ara, sonucu ve süresini döndür"""
+        started = time.perf_counter()
+        results = self.vector_db.search_similar(
+            self.collections[label], query_embedding, n_results=self.n_results
+        )
+        return AgenticDemoChatbot._tool_result(results, label), time.perf_counter() - started
+    
+    def retrieve(self, query: str, sources: List[str]) -> Dict[str, Any]:
+        """
+        Soruyu bir kez embed et ve seçilen kaynaklarda paralel ara
+        
+        Args:
+            query: Kullanıcı sorusu
+            sources: Kaynak etiketleri (ör. ['transcript', 'book'])
+        
+        Returns:
+            {'results': [(etiket, araç sonucu)], 'timings': {'embed': s, etiket: s, 'total': s}}.
+            Embedding veya arama başarısız olan kaynağın sonucu boştur ve 'failed' işaretlidir.
+        """
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        available = [label for label in sources if self.collections.get(label) is not None]
+        empty = {label: {'documents': [], 'metadatas': [], 'distances': [], 'source': label}
+                 for label in sources}
+        
+        query_embedding = None
+        if available:
+            query_embedding = self.embedding_generator.generate_single_embedding(query)
+            timings['embed'] = time.perf_counter() - started
+        
+        searched: Dict[str, Dict[str, Any]] = {}
+        if query_embedding:
+            futures = {label: self.executor.submit(self._search, label, query_embedding)
+                       for label in available}
+            for label, future in futures.items():
+                try:
+                    searched[label], timings[label] = future.result()
+                except Exception as e:
+                    print(f"⚠️ {label} araması başarısız: {e}")
+                    searched[label] = dict(empty[label], failed=True)
+        else:
+            # Embedding alınamadı: aranabilecek kaynaklar bağlamsız kalır
+            searched = {label: dict(empty[label], failed=True) for label in available}
+        
+        timings['total'] = time.perf_counter() - started
+        return {
+            'results': [(label, searched.get(label, empty[label])) for label in sources],
+            'timings': timings
+        }
+
 
 class AgenticDemoChatbot:
     """Agentic Demo chatbot ana sınıfı"""
     
-    def __init__(self):
-        """Chatbot bileşenlerini başlat"""
+    def __init__(self, use_snapshot: bool = True):
+        """
+        Chatbot bileşenlerini başlat
+        
+        Args:
+            use_snapshot: Uyumlu bir indeks snapshot'ı varsa veritabanına yükle
+        """
         print("🚀 Agentic Demo Chatbot başlatılıyor...")
         
         # Konfigürasyonu doğrula
         if not Config.validate_config():
             raise Exception("Konfigürasyon doğrulaması başarısız!")
         
+        # Uyumlu snapshot varsa veritabanı açılmadan önce yerine koy
+        if use_snapshot:
+            try:
+                restore_snapshot_if_compatible(
+                    Config.SNAPSHOT_PATH, Config.VECTOR_DB_PATH, self._snapshot_params()
+                )
+            except Exception as snapshot_error:
+                print(f"⚠️ Snapshot yüklenemedi, ingestion ile devam ediliyor: {snapshot_error}")
+        
         # Bileşenleri başlat
-        self.text_processor = TextProcessor(Config.CHUNK_SIZE, Config.CHUNK_OVERLAP)
-        self.embedding_generator = EmbeddingGenerator()
-        self.vector_db = VectorDatabase()
-        self.agent = AgenticGeminiChatbot()  # Agentic chatbot
+        self.text_processor = TextProcessor(Config.CHUNK_SIZE, Config.CHUNK_OVERLAP, Config.CHUNK_MODE)
+        self.llm_backend = create_llm_backend()
+        self.embedding_generator = EmbeddingGenerator(self.llm_backend)
+        self.vector_db = create_vector_database()
+        self.manifest = IndexManifest(Config.VECTOR_DB_PATH)
+        self.ingestor = CorpusIngestor(
+            self.text_processor, self.embedding_generator, self.vector_db, self.manifest,
+            workers=Config.INGEST_WORKERS
+        )
+        self.retriever = RetrievalCoordinator(self.embedding_generator, self.vector_db, n_results=4)
+        self.agent = AgenticGeminiChatbot(self.llm_backend)  # Agentic chatbot
+        self.answer_cache = SemanticAnswerCache(
+            Config.ANSWER_CACHE_THRESHOLD, Config.ANSWER_CACHE_TTL_SECONDS, Config.ANSWER_CACHE_MAX_ENTRIES
+        ) if Config.ANSWER_CACHE_ENABLED else None
+        self.router = CentroidQueryRouter(
+            Config.ROUTER_MARGIN, Config.ROUTER_MIN_SIMILARITY
+        ) if Config.QUERY_ROUTING == "local" else None
+        self.singleflight = SingleFlight() if Config.SINGLEFLIGHT_ENABLED else None
         
         # Koleksiyonları başlat
+        self.collections = {}
         self.transcript_collection = None
         self.book_collection = None
         
@@ -43,26 +165,26 @@ class AgenticDemoChatbot:
         # Render platformu tespiti
         is_render = os.getenv("RENDER") == "true"
         
-        # Dosyaları işle
-        files_to_process = [
-            (Config.TRANSCRIPT_FILE, Config.TRANSCRIPT_COLLECTION),
-            (Config.BOOK_FILE, Config.BOOK_COLLECTION)
-        ]
-        
+        # Kaynakları işle (her glob bir koleksiyon)
         processed_any = False
-        for file_path, collection_name in files_to_process:
-            if os.path.exists(file_path):
+        for collection_name, file_paths in self._corpus_sources():
+            if file_paths:
                 try:
-                    self._process_and_store_file(file_path, collection_name)
+                    collection = self.ingestor.ingest_collection(collection_name, file_paths)
+                    self._set_collection(collection_name, collection)
                     processed_any = True
                 except Exception as file_error:
-                    print(f"⚠️ Dosya işleme hatası {file_path}: {file_error}")
+                    print(f"⚠️ Koleksiyon işleme hatası {collection_name}: {file_error}")
+                    # Eski içerik kullanılabilir kalsın
+                    existing = self.vector_db.get_collection(collection_name)
+                    if existing is not None:
+                        self._set_collection(collection_name, existing)
                     if is_render:
                         print("🔄 Render ortamında devam ediliyor...")
                     else:
                         raise file_error
             else:
-                print(f"⚠️  Dosya bulunamadı: {file_path}")
+                print(f"⚠️  Dosya bulunamadı: {collection_name}")
                 if is_render:
                     print("🔄 Render ortamında eksik dosya ile devam ediliyor...")
         
@@ -80,40 +202,54 @@ class AgenticDemoChatbot:
             print("⚠️ Hiçbir dosya işlenemedi")
             raise Exception("Gerekli dosyalar bulunamadı")
     
+    @staticmethod
+    def _corpus_sources() -> List[Tuple[str, List[str]]]:
+        """İndekslenecek (koleksiyon, dosyalar) çiftleri"""
+        return [
+            (collection_name, resolve_source_files(pattern))
+            for collection_name, pattern in Config.corpus_sources()
+        ]
+    
+    @classmethod
+    def _snapshot_params(cls) -> Dict[str, Any]:
+        """Snapshot uyumluluğunu belirleyen parametreler"""
+        return {
+            "embedding_model": Config.embedding_signature(),
+            "chunk_size": Config.CHUNK_SIZE,
+            "chunk_overlap": Config.CHUNK_OVERLAP,
+            "chunk_mode": Config.CHUNK_MODE,
+            "vector_backend": Config.VECTOR_BACKEND,
+            "dedup": [Config.DEDUP_THRESHOLD, Config.DEDUP_NUM_PERM, Config.DEDUP_SHINGLE_SIZE],
+            "corpus_sources": [list(source) for source in Config.corpus_sources()],
+            "corpus_sha256": corpus_fingerprint(
+                [path for _, paths in cls._corpus_sources() for path in paths]
+            ),
+        }
+    
+    @staticmethod
+    def _tool_result(results: Dict[str, Any], source: str) -> Dict[str, Any]:
+        """Arama sonucunu araç çıktısına dönüştür (bağlam oluşturucu için metadata ve mesafelerle)"""
+        def first(key):
+            values = results.get(key)
+            return values[0] if values and values[0] else []
+        
+        return {
+            'documents': first("documents"),
+            'metadatas': first("metadatas"),
+            'distances': first("distances"),
+            'source': source
+        }
+    
     def _register_agent_tools(self):
         """Agent'ın kullanabileceği araçları kaydet"""
         
         def search_transcript_tool(query: str) -> Dict[str, Any]:
             """Transcript koleksiyonunda arama yapar"""
-            if not self.transcript_collection:
-                return {'documents': [], 'source': 'transcript'}
-            
-            query_embedding = self.embedding_generator.generate_single_embedding(query)
-            if not query_embedding:
-                return {'documents': [], 'source': 'transcript'}
-            
-            results = self.vector_db.search_similar(
-                self.transcript_collection, query_embedding, n_results=4
-            )
-            
-            docs = results["documents"][0] if results["documents"] and results["documents"][0] else []
-            return {'documents': docs, 'source': 'transcript'}
+            return self.retriever.retrieve(query, ['transcript'])['results'][0][1]
         
         def search_book_tool(query: str) -> Dict[str, Any]:
             """Kitap koleksiyonunda arama yapar"""
-            if not self.book_collection:
-                return {'documents': [], 'source': 'book'}
-            
-            query_embedding = self.embedding_generator.generate_single_embedding(query)
-            if not query_embedding:
-                return {'documents': [], 'source': 'book'}
-            
-            results = self.vector_db.search_similar(
-                self.book_collection, query_embedding, n_results=4
-            )
-            
-            docs = results["documents"][0] if results["documents"] and results["documents"][0] else []
-            return {'documents': docs, 'source': 'book'}
+            return self.retriever.retrieve(query, ['book'])['results'][0][1]
         
         # Araçları agent'a kaydet
         self.agent.register_tool(
@@ -127,6 +263,12 @@ class AgenticDemoChatbot:
             search_book_tool,
             'Kitap içeriğinde detaylı teorik bilgi arar. Kavramsal açıklamalar için kullan.'
         )
+        
+        # Birden fazla kaynak gerektiğinde soru bir kez embed edilip paralel aranır
+        self.agent.set_retriever(self.retriever.retrieve)
+        self.agent.set_router(self.route_query if self.router is not None else None)
+        # Elenen kopya chunk'ların komşuları bağlamda yine birleştirilir
+        self.agent.set_duplicate_lookup(self.manifest.duplicate_of)
     
     def _register_agent_tools_limited(self):
         """Agent'ın kullanabileceği araçları kaydet - veritabanı olmadan sınırlı mod"""
@@ -150,72 +292,223 @@ class AgenticDemoChatbot:
             limited_search_tool,
             'Kitap içeriğinde arama yapar (sınırlı mod).'
         )
+        self.agent.set_retriever(None)
+        self.agent.set_router(None)
+        self.agent.set_duplicate_lookup(None)
     
-    def _process_and_store_file(self, file_path: str, collection_name: str):
-        """Dosyayı işler ve veritabanına kaydeder"""
-        print(f"\n📄 İşleniyor: {file_path}")
-        
-        # Dosyayı oku ve parçala
-        content = self.text_processor.read_file(file_path)
-        if not content:
+    def _set_collection(self, collection_name: str, collection):
+        """Koleksiyon referansını sakla"""
+        self.collections[collection_name] = collection
+        if collection_name == Config.TRANSCRIPT_COLLECTION:
+            self.transcript_collection = collection
+            label = 'transcript'
+        elif collection_name == Config.BOOK_COLLECTION:
+            self.book_collection = collection
+            label = 'book'
+        else:
             return
+        self.retriever.set_collection(label, collection)
+        if self.router is not None:
+            self.router.set_centroid(label, self.vector_db.collection_centroid(collection))
+    
+    def route_query(self, question: str) -> Optional[str]:
+        """
+        Kaynak kararını soru embedding'inin koleksiyon merkezlerine uzaklığından ver
         
-        chunks = self.text_processor.create_chunks(content)
-        if not chunks:
-            return
+        Args:
+            question: Kullanıcı sorusu
         
-        # Embeddings oluştur
-        embeddings = self.embedding_generator.generate_embeddings(chunks)
-        if not embeddings:
-            return
+        Returns:
+            TRANSCRIPT_ONLY / BOOK_ONLY veya fark düşükse None (LLM kararı kullanılır)
+        """
+        if self.router is None or not self.router.ready:
+            return None
+        # Embedding önbelleğe girer; arama aynı embedding'i API çağrısı yapmadan kullanır
+        route = self.router.route(self.embedding_generator.generate_single_embedding(question))
+        scores = ", ".join(f"{label} {score:.3f}" for label, score in route['scores'].items())
+        if route['decision']:
+            print(f"🧭 Yerel yönlendirme: {route['decision']} (fark {route['margin']:.3f}; {scores})")
+        else:
+            print(f"🧭 Yönlendirme belirsiz (fark {route['margin']:.3f}), model karar veriyor")
+        return route['decision']
+    
+    def find_cached_answer(self, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Soruya benzeyen bir soru daha önce yanıtlandıysa önbellekteki kaydı döndür
         
-        # Koleksiyon oluştur ve dökümanları ekle
-        collection = self.vector_db.create_collection(collection_name)
+        Args:
+            question: Kullanıcı sorusu
         
-        metadatas = [{"source": file_path, "chunk_index": i} for i in range(len(chunks))]
-        self.vector_db.add_documents(collection, chunks, embeddings, metadatas)
+        Returns:
+            Önbellek kaydı (response, decision, source_info, similarity) veya None
+        """
+        if self.answer_cache is None:
+            return None
+        # Sorgu embedding'i embedding önbelleğine girer; aramada tekrar API çağrısı yapılmaz
+        embedding = self.embedding_generator.generate_single_embedding(question)
+        if not embedding:
+            return None
+        cached = self.answer_cache.lookup(embedding, self.manifest.fingerprint())
+        if cached:
+            print(f"⚡ Yanıt önbellekten (benzerlik {cached['similarity']:.3f}, {cached['source_info']})")
+        return cached
+    
+    @staticmethod
+    def stream_cached_answer(cached: Dict[str, Any]):
+        """
+        Önbellekteki yanıtı streaming yanıtla aynı biçimde parçalar halinde döndür
         
-        # Koleksiyon referansını sakla
-        if collection_name == Config.TRANSCRIPT_COLLECTION:
-            self.transcript_collection = collection
-        elif collection_name == Config.BOOK_COLLECTION:
-            self.book_collection = collection
+        Args:
+            cached: find_cached_answer kaydı
+        """
+        response = cached['response']
+        for start in range(0, len(response), CACHED_ANSWER_CHUNK_CHARS):
+            yield response[start:start + CACHED_ANSWER_CHUNK_CHARS]
+    
+    def _remember_answer(self, question: str, response: str, trace: Dict[str, Any]):
+        """Tamamlanan yanıtı kaynak kararıyla birlikte önbelleğe yaz (yedek / eksik yanıtlar yazılmaz)"""
+        if self.answer_cache is None or not trace.get('complete') or trace.get('degraded'):
+            return
+        embedding = self.embedding_generator.generate_single_embedding(question)
+        if embedding:
+            self.answer_cache.store(
+                question, embedding, response, trace['decision'], trace['source_info'],
+                self.manifest.fingerprint()
+            )
     
-    def ask_question_agentic(self, question: str) -> str:
+    def ask_question_agentic(self, question: str, latency_budget: Optional[float] = None) -> str:
         """
         Agentic yaklaşımla kullanıcı sorusuna yanıt verir
         Model kendi kararını verir hangi kaynaklara bakacağına
         
         Args:
             question: Kullanıcı sorusu
-            
+            latency_budget: İsteğin gecikme bütçesi, saniye (model katmanı seçimi için)
+        
         Returns:
             Chatbot yanıtı
         """
         print(f"\n❓ Soru: {question}")
         
+        cached = self.find_cached_answer(question)
+        if cached:
+            return cached['response']
+        
         # Agent'a karar ver ve yanıtla
-        response = self.agent.decide_and_respond(question)
+        trace: Dict[str, Any] = {}
+        response = self.agent.decide_and_respond(question, trace, latency_budget)
+        self._remember_answer(question, response, trace)
         
         return response
     
-    def ask_question_agentic_stream(self, question: str):
+    def ask_question_agentic_stream(self, question: str, use_cache: bool = True,
+                                    latency_budget: Optional[float] = None):
         """
         Agentic yaklaşımla streaming yanıt verir
         
         Args:
             question: Kullanıcı sorusu
+            use_cache: Önce yanıt önbelleğine bak (çağıran zaten baktıysa False)
+            latency_budget: İsteğin gecikme bütçesi, saniye (model katmanı seçimi için)
         """
         # Streaming yanıt oluştur - debug print'ler API server için kaldırıldı
         
+        cached = self.find_cached_answer(question) if use_cache else None
+        if cached:
+            yield from self.stream_cached_answer(cached)
+            return cached['response']
+        
         full_response = ""
-        for chunk in self.agent.decide_and_respond_stream(question):
+        trace: Dict[str, Any] = {}
+        for chunk in self.agent.decide_and_respond_stream(question, trace, latency_budget):
             full_response += chunk
             yield chunk  # API server için chunk'ları yield et
             time.sleep(0.02)  # Küçük bir gecikme ekleyerek daha doğal görünüm
         
+        self._remember_answer(question, full_response, trace)
         return full_response
     
+    async def find_cached_answer_async(self, question: str) -> Optional[Dict[str, Any]]:
+        """find_cached_answer'ın async versiyonu (embedding thread havuzunda oluşturulur)"""
+        return await run_blocking(self.find_cached_answer, question)
+    
+    @classmethod
+    async def stream_cached_answer_async(cls, cached: Dict[str, Any]):
+        """stream_cached_answer'ın async iterator versiyonu"""
+        for chunk in cls.stream_cached_answer(cached):
+            yield chunk
+    
+    async def ask_question_agentic_stream_async(self, question: str, use_cache: bool = True,
+                                                latency_budget: Optional[float] = None):
+        """
+        ask_question_agentic_stream'in async versiyonu; event loop'u bloklamaz
+        
+        Args:
+            question: Kullanıcı sorusu
+            use_cache: Önce yanıt önbelleğine bak (çağıran zaten baktıysa False)
+            latency_budget: İsteğin gecikme bütçesi, saniye (model katmanı seçimi için)
+        """
+        cached = await self.find_cached_answer_async(question) if use_cache else None
+        if cached:
+            async for chunk in self.stream_cached_answer_async(cached):
+                yield chunk
+            return
+        
+        full_response = ""
+        trace: Dict[str, Any] = {}
+        async for chunk in self.agent.decide_and_respond_stream_async(question, trace, latency_budget):
+            full_response += chunk
+            yield chunk
+            await asyncio.sleep(0.02)  # Küçük bir gecikme ekleyerek daha doğal görünüm
+        
+        await run_blocking(self._remember_answer, question, full_response, trace)
+    
+    async def ask_question_shared_stream_async(self, question: str, latency_budget: Optional[float] = None,
+                                               admit: Optional[Callable[[Callable], AsyncContextManager]] = None,
+                                               on_position: Optional[Callable[[int, int], Awaitable[None]]] = None):
+        """
+        Önbellekte olmayan soru için async streaming yanıt; aynı anda akmakta olan
+        aynı soru varsa yeni bir pipeline başlatılmaz, o akışa (baştan) abone olunur
+        (paylaşılan akışın model katmanı onu başlatan isteğin bütçesiyle seçilir)
+        
+        Args:
+            question: Kullanıcı sorusu
+            latency_budget: İsteğin gecikme bütçesi, saniye (model katmanı seçimi için)
+            admit: Yeni üretim için kabul slotu veren fonksiyon (kuyruk sırası geri çağrısını
+                alır); slot upstream başlarken alınır ve upstream bitene kadar tutulur,
+                akan akışa katılan istek slot almaz
+            on_position: Paylaşılan akış kuyrukta beklerken (sıra, tahmini saniye) ile
+                çağrılır; akışa sonradan katılan istek de geçerli sırayı hemen alır
+        
+        Raises:
+            Overloaded: admit slot vermediyse (akışa abone olan herkese iletilir)
+        """
+        key = normalize_question(question)
+        
+        async def broadcast_position(position: int, retry_after: int):
+            # Sıra bilgisi yalnızca başlatana değil, akışa abone olan herkese gider
+            if self.singleflight is None:
+                if on_position is not None:
+                    await on_position(position, retry_after)
+            else:
+                await self.singleflight.publish(key, position, retry_after)
+        
+        async def upstream():
+            async with admit(broadcast_position) if admit is not None else contextlib.nullcontext():
+                if self.singleflight is not None:
+                    # Slot alındı: sonradan katılanlara eski sıra bilgisi gönderilmesin
+                    await self.singleflight.publish(key)
+                async for chunk in self.ask_question_agentic_stream_async(
+                    question, use_cache=False, latency_budget=latency_budget
+                ):
+                    yield chunk
+        
+        stream = upstream() if self.singleflight is None else self.singleflight.stream(
+            key, upstream, on_position
+        )
+        async for chunk in stream:
+            yield chunk
+    
     def start_interactive_chat(self):
         """İnteraktif sohbet başlatır"""
         print("\n🤖 Agentic Demo Chatbot hazır! Sorularınızı yazabilirsiniz.")
@@ -238,15 +531,38 @@ class AgenticDemoChatbot:
                 
                 # Agentic streaming yanıt kullan
                 self.ask_question_agentic_stream(user_input)
-                
+            
             except KeyboardInterrupt:
                 print("\n👋 Güle güle!")
                 break
             except Exception as e:
                 print(f"❌ Hata: {e}")
 
+def build_index(snapshot_path: str = None):
+    """
+    Korpusu çevrimdışı olarak indeksler ve sürümlü bir snapshot yazar
+    
+    Args:
+        snapshot_path: Snapshot dizini (varsayılan: Config.SNAPSHOT_PATH)
+    """
+    snapshot_path = snapshot_path or Config.SNAPSHOT_PATH
+    build_dir = tempfile.mkdtemp(prefix="index_build_")
+    original_db_path = Config.VECTOR_DB_PATH
+    Config.VECTOR_DB_PATH = build_dir
+    try:
+        chatbot = AgenticDemoChatbot(use_snapshot=False)
+        chatbot.setup_database()
+        build_snapshot(build_dir, snapshot_path, chatbot._snapshot_params())
+    finally:
+        Config.VECTOR_DB_PATH = original_db_path
+        shutil.rmtree(build_dir, ignore_errors=True)
+
 def main():
     """Ana fonksiyon"""
+    if len(sys.argv) > 1 and sys.argv[1] == "build-index":
+        build_index(sys.argv[2] if len(sys.argv) > 2 else None)
+        return
+    
     try:
         # Agentic chatbot'u başlat
         chatbot = AgenticDemoChatbot()
@@ -256,7 +572,7 @@ def main():
         
         # İnteraktif sohbeti başlat
         chatbot.start_interactive_chat()
-        
+    
     except Exception as e:
         print(f"❌ Chatbot başlatma hatası: {e}")
 
@@ -0,0 +1,190 @@
+"""
+Model katmanlama modülü
+Bu modül final yanıt için hızlı (ucuz) ve büyük model arasında seçim yapar.
+Kısa ve kaynağı net sorular hızlı modele gider. Diğer sorularda, isteğin o ana
+kadar harcadığı süre ile büyük modelin son yanıtlarda gözlenen p95 ilk parça
+süresinin (TTFT) toplamı isteğin gecikme bütçesini (ilk parçaya kadar) aşıyorsa
+hızlı model seçilir. Büyük model bu yüzden uzun süre seçilmezse ara sıra bir istek
+yine ona gönderilir (yoklama), böylece gözlenen gecikme eskimez. Son seçimler ve model başına gecikmeler /metrics'te yayınlanır.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from resilience import LatencyTracker
+
+TIERS = ('fast', 'large')
+
+# Gözlenen gecikme penceresi küçük tutulur: seçim güncel upstream durumunu izler
+LATENCY_WINDOW = 50
+
+# Kaynağı tek ve net olan kararlar (BOTH_SOURCES ve yedek karar daha zor sorulardır)
+CONFIDENT_DECISIONS = ('TRANSCRIPT_ONLY', 'BOOK_ONLY', 'NO_SEARCH')
+
+
+class ModelTierPolicy:
+    """Gecikme bütçesine ve gözlenen upstream gecikmesine göre model seçimi"""
+    
+    def __init__(self, models: Dict[str, str], budget_seconds: float, short_question_words: int,
+                 mode: str = "large", min_samples: int = 5, probe_seconds: float = 30.0,
+                 history: int = 50):
+        """
+        Args:
+            models: Katman -> model adı ({'fast': ..., 'large': ...})
+            budget_seconds: Varsayılan istek gecikme bütçesi (istek başından ilk parçaya kadar)
+            short_question_words: Bu kadar veya daha az kelimeli sorular kısa sayılır
+            mode: budget (bütçeye göre seçim) | large | fast (sabit katman)
+            min_samples: Gözlenen gecikmenin kullanılması için gereken yanıt sayısı
+            probe_seconds: Bütçe nedeniyle seçilmeyen büyük modelin yoklanma aralığı (0 ise kapalı)
+            history: /metrics'te tutulan son seçim sayısı
+        """
+        self.models = dict(models)
+        self.budget_seconds = budget_seconds
+        self.short_question_words = short_question_words
+        self.mode = mode
+        self.min_samples = min_samples
+        self.probe_seconds = probe_seconds
+        self.last_large = time.monotonic()
+        self.first_token = {tier: LatencyTracker(LATENCY_WINDOW) for tier in TIERS}
+        self.total = {tier: LatencyTracker(LATENCY_WINDOW) for tier in TIERS}
+        self.choices = {tier: 0 for tier in TIERS}
+        self.reasons: Dict[str, int] = {}
+        self.history = deque(maxlen=history)
+        self.lock = threading.Lock()
+    
+    def choose(self, question: str, decision: Optional[str] = None, elapsed: float = 0.0,
+               budget: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Final yanıt için katman seç
+        
+        Args:
+            question: Kullanıcı sorusu
+            decision: Kaynak kararı (function calling modunda henüz yok: None)
+            elapsed: İsteğin şu ana kadar harcadığı süre (karar + arama)
+            budget: İsteğin ilk parçaya kadar gecikme bütçesi (None ise varsayılan)
+        
+        Returns:
+            {'tier', 'model', 'reason', 'budget_s', 'elapsed_s', 'predicted_s'}
+        """
+        budget = self.budget_seconds if budget is None else budget
+        large_p95 = self.first_token['large'].percentile(95, self.min_samples)
+        predicted = None if large_p95 is None else elapsed + large_p95
+        
+        with self.lock:
+            now = time.monotonic()
+            if self.mode in TIERS:
+                tier, reason = self.mode, 'sabit katman'
+            elif len(question.split()) <= self.short_question_words and decision in CONFIDENT_DECISIONS + (None,):
+                tier, reason = 'fast', 'kısa ve net soru'
+            elif predicted is None or predicted <= budget:
+                tier, reason = 'large', 'bütçe yeterli'
+            elif self.probe_seconds > 0 and now - self.last_large >= self.probe_seconds:
+                tier, reason = 'large', 'gecikme yoklaması'
+            else:
+                tier, reason = 'fast', 'bütçe yetersiz'
+            if tier == 'large':
+                self.last_large = now
+            self.choices[tier] += 1
+            self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        return {
+            'tier': tier,
+            'model': self.models[tier],
+            'reason': reason,
+            'budget_s': budget,
+            'elapsed_s': round(elapsed, 3),
+            'predicted_s': None if predicted is None else round(predicted, 3),
+        }
+    
+    def observe(self, choice: Dict[str, Any], first_token: Optional[float], total: float,
+                elapsed: Optional[float]):
+        """
+        Tamamlanan final yanıtın gecikmelerini kaydet
+        
+        Args:
+            choice: choose sonucu
+            first_token: Çağrıdan ilk parçaya kadar geçen süre (parça gelmediyse None)
+            total: Çağrının toplam süresi
+            elapsed: İsteğin başından ilk parçaya kadar geçen süre (parça gelmediyse None)
+        """
+        tier = choice['tier']
+        # Parça gelmeden biten (süre aşımı / hata) çağrının ilk parça süresi en az toplam süresidir
+        self.first_token[tier].add(total if first_token is None else first_token)
+        self.total[tier].add(total)
+        with self.lock:
+            self.history.append(dict(
+                choice,
+                actual_s=None if elapsed is None else round(elapsed, 3),
+                within_budget=elapsed is not None and elapsed <= choice['budget_s'],
+                at=time.time()
+            ))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Politika ayarları, katman sayaçları, model başına gecikmeler ve son seçimler"""
+        def ms(tracker: LatencyTracker, q: float):
+            value = tracker.percentile(q)
+            return None if value is None else round(value * 1000, 1)
+        
+        with self.lock:
+            history = list(self.history)
+            choices = dict(self.choices)
+            reasons = dict(self.reasons)
+        within = [item['within_budget'] for item in history]
+        return {
+            "policy": {
+                "mode": self.mode,
+                "models": self.models,
+                "budget_s": self.budget_seconds,
+                "short_question_words": self.short_question_words,
+                "min_samples": self.min_samples,
+                "probe_seconds": self.probe_seconds,
+            },
+            "choices": choices,
+            "reasons": reasons,
+            "latency": {
+                tier: {
+                    "first_token_p50_ms": ms(self.first_token[tier], 50),
+                    "first_token_p95_ms": ms(self.first_token[tier], 95),
+                    "total_p50_ms": ms(self.total[tier], 50),
+                    "total_p95_ms": ms(self.total[tier], 95),
+                }
+                for tier in TIERS
+            },
+            "within_budget_rate": sum(within) / len(within) if within else None,
+            "recent": history,
+        }
+
+
+class TierCall:
+    """Seçilen katmandaki final yanıt çağrısının zamanlaması (bitince politikaya yazılır)"""
+    
+    def __init__(self, policy: ModelTierPolicy, choice: Dict[str, Any], request_started: float):
+        """
+        Args:
+            policy: Gecikmelerin kaydedileceği politika
+            choice: ModelTierPolicy.choose sonucu
+            request_started: İsteğin başladığı an (time.perf_counter)
+        """
+        self.policy = policy
+        self.choice = choice
+        self.tier = choice['tier']
+        self.request_started = request_started
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.finished = False
+    
+    def chunk(self):
+        """Metin parçası alındı (ilk parçanın zamanı kaydedilir)"""
+        if self.first_token is None:
+            self.first_token = time.perf_counter() - self.started
+    
+    def finish(self):
+        """Çağrı tamamlandı veya upstream kullanılamadı (süre aşımı da gözlenen gecikmedir)"""
+        if self.finished:
+            return
+        self.finished = True
+        first_token_elapsed = None
+        if self.first_token is not None:
+            first_token_elapsed = self.started - self.request_started + self.first_token
+        self.policy.observe(self.choice, self.first_token, time.perf_counter() - self.started, first_token_elapsed)
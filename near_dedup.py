@@ -0,0 +1,105 @@
+"""
+Near-duplicate tespit modülü
+Bu modül kelime shingle'ları üzerinde MinHash imzaları ve LSH bantlaması ile
+birbirine çok benzeyen chunk'ları embedding'den önce tespit eder.
+"""
+
+import hashlib
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# 32-bit hash'ler için asal modül: a * h + b taşmadan uint64'e sığar
+MINHASH_PRIME = np.uint64(4294967291)
+
+
+def choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    LSH bant/satır sayısını seç. Eşik (1/b)^(1/r), yapılandırılan benzerlik
+    eşiğinin hemen altında kalacak şekilde seçilir ki gerçek kopyalar kaçmasın.
+    
+    Returns:
+        (bant sayısı, bant başına satır)
+    """
+    best = (num_perm, 1)
+    best_lsh_threshold = 0.0
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        lsh_threshold = (1.0 / bands) ** (1.0 / rows)
+        if best_lsh_threshold < lsh_threshold <= threshold:
+            best, best_lsh_threshold = (bands, rows), lsh_threshold
+    return best
+
+
+class NearDuplicateFilter:
+    """MinHash/LSH tabanlı near-duplicate filtresi"""
+    
+    def __init__(self, threshold: float, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        """
+        Args:
+            threshold: Jaccard benzerlik eşiği (bu değer ve üstü kopya sayılır)
+            num_perm: MinHash permütasyon sayısı
+            shingle_size: Shingle başına kelime sayısı
+            seed: Permütasyon tohumu (sonuçların deterministik olması için sabit)
+        """
+        self.threshold = threshold
+        self.shingle_size = max(1, shingle_size)
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, int(MINHASH_PRIME), size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, int(MINHASH_PRIME), size=num_perm).astype(np.uint64)
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        self.buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(self.bands)]
+        self.signatures: Dict[str, np.ndarray] = {}
+    
+    def _shingles(self, text: str) -> Set[str]:
+        """Metnin kelime shingle kümesi"""
+        words = text.lower().split()
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)}
+        return {
+            " ".join(words[i:i + self.shingle_size])
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+    
+    def signature(self, text: str) -> np.ndarray:
+        """Metnin MinHash imzası"""
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'little')
+             for shingle in self._shingles(text)),
+            dtype=np.uint64
+        )
+        return ((hashes[:, None] * self.a + self.b) % MINHASH_PRIME).min(axis=0)
+    
+    def find_duplicate(self, key: str, text: str) -> Optional[str]:
+        """
+        Metin daha önce görülen bir chunk'ın near-duplicate'i mi?
+        Değilse filtreye eklenir.
+        
+        Args:
+            key: Chunk anahtarı (ID)
+            text: Chunk metni
+        
+        Returns:
+            Kopyası olduğu chunk'ın anahtarı veya None
+        """
+        signature = self.signature(text)
+        band_keys = [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+        
+        checked = set()
+        for band, band_key in enumerate(band_keys):
+            for candidate in self.buckets[band].get(band_key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                if np.mean(self.signatures[candidate] == signature) >= self.threshold:
+                    return candidate
+        
+        self.signatures[key] = signature
+        for band, band_key in enumerate(band_keys):
+            self.buckets[band].setdefault(band_key, []).append(key)
+        return None
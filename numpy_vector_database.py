@@ -0,0 +1,579 @@
+"""
+NumPy vektör veritabanı modülü
+Bu modül birkaç bin chunk'lık korpuslar için süreç içi bir vektör indeksi sağlar.
+Normalize edilmiş embedding'ler bitişik bir matriste tutulur, .npy olarak diske
+yazılır ve bellek eşlemeli (mmap) açılır. Arama tek bir matris-vektör çarpımı
+ve argpartition ile yapılır.
+
+Vektörler isteğe bağlı olarak float16 veya vektör başına ölçekli int8 olarak ve
+kısaltılmış boyutla saklanabilir. Bu durumda arama sıkıştırılmış matris üzerinde
+yapılır, en iyi adaylar float32 vektörlerle tam olarak yeniden puanlanır.
+"""
+
+import json
+import os
+import shutil
+import threading
+from collections import namedtuple
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+from vector_database import SearchBlock, VectorDatabase, empty_search_block
+
+EMBEDDINGS_FILE = "embeddings.npy"
+RECORDS_FILE = "records.json"
+STORAGE_DTYPES = ("float32", "float16", "int8")
+
+# Çok sorgulu aramada float16/int8 matrisin float32'ye dönüştürüldüğü blok boyu ve
+# yeniden puanlamada aynı anda işlenen sorgu sayısı (bellek sınırı)
+CONVERT_BLOCK_ROWS = 4096
+QUERY_BLOCK = 64
+
+# Saklama seçenekleri: dtype, dims (0 = tam boyut), rescore_candidates (0 = yeniden puanlama yok),
+# keep_float32 (tam float32 kopyası diskte tutulsun mu)
+StorageOptions = namedtuple("StorageOptions", "dtype dims rescore_candidates keep_float32")
+
+# Koleksiyon durumu; okuyucular tek seferde alır, yazarlar yenisini hazırlayıp yerine koyar
+CollectionState = namedtuple("CollectionState", "full compact scales ids documents metadatas index")
+
+
+def storage_options_from_config() -> StorageOptions:
+    """Config'teki saklama seçeneklerini oku"""
+    return StorageOptions(
+        Config.VECTOR_STORAGE_DTYPE, Config.VECTOR_STORAGE_DIMENSIONS,
+        Config.VECTOR_RESCORE_CANDIDATES, Config.VECTOR_KEEP_FLOAT32
+    )
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Satırları birim uzunluğa getir"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def quantize(vectors: np.ndarray, dtype: str, dims: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Normalize float32 vektörleri saklama biçimine dönüştür
+    
+    Args:
+        vectors: (n, boyut) normalize float32 matris
+        dtype: float32, float16 veya int8
+        dims: Saklanacak ilk boyut sayısı (0 ise tamamı); kısaltılan vektörler yeniden normalize edilir
+    
+    Returns:
+        (sıkıştırılmış matris, int8 için vektör başına ölçek, diğerleri için None)
+    """
+    if dims and dims < vectors.shape[1]:
+        vectors = _normalize_rows(vectors[:, :dims])
+    if dtype == "float32":
+        return np.ascontiguousarray(vectors, dtype=np.float32), None
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    if dtype == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.clip(np.round(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+    raise ValueError(f"Bilinmeyen saklama tipi: {dtype} (seçenekler: {', '.join(STORAGE_DTYPES)})")
+
+
+def approximate_scores(compact: np.ndarray, scales: Optional[np.ndarray], queries: np.ndarray) -> np.ndarray:
+    """
+    Sıkıştırılmış matris üzerinde kosinüs benzerliği tahmini
+    
+    Args:
+        compact: (n, boyut) saklanan matris
+        scales: int8 için vektör başına ölçek
+        queries: (sorgu sayısı, boyut) normalize sorgular
+    
+    Returns:
+        (sorgu sayısı, n) skor matrisi
+    """
+    if compact.dtype == np.float32:
+        scores = queries @ compact.T
+    elif len(queries) == 1:
+        # Tek sorgu: tamponlu dönüşümle çarp, matrisin float32 kopyası oluşturulmaz
+        scores = np.einsum('ij,j->i', compact, queries[0], dtype=np.float32, casting='unsafe')[None, :]
+    else:
+        # Çok sorgu: dönüşüm maliyeti bloklar halinde tüm sorgulara paylaştırılır (BLAS)
+        scores = np.empty((len(queries), len(compact)), dtype=np.float32)
+        for start in range(0, len(compact), CONVERT_BLOCK_ROWS):
+            block = compact[start:start + CONVERT_BLOCK_ROWS].astype(np.float32)
+            scores[:, start:start + len(block)] = queries @ block.T
+    if scales is not None:
+        scores *= scales
+    return scores
+
+
+def _top_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Her satırda en yüksek k skorun indeksleri (azalan sırada)"""
+    if k < scores.shape[1]:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape).copy()
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1)
+
+
+def _merged(array: Optional[np.ndarray], rows: List[int], replacements: np.ndarray,
+            additions: np.ndarray) -> np.ndarray:
+    """Dizinin kopyasında satırları değiştir ve sonuna yenilerini ekle"""
+    if array is None or not len(array):
+        return additions
+    array = np.array(array)  # mmap'ten belleğe kopya
+    if rows:
+        array[rows] = replacements
+    if len(additions):
+        array = np.concatenate([array, additions])
+    return array
+
+
+class NumpyCollection:
+    """Tek bir koleksiyonun matrisleri ve kayıtları"""
+    
+    def __init__(self, name: str, path: Optional[str], options: Optional[StorageOptions] = None):
+        """
+        Args:
+            name: Koleksiyon adı
+            path: Koleksiyon dizini (None ise yalnızca bellekte tutulur)
+            options: Saklama seçenekleri (None ise tam float32)
+        """
+        self.name = name
+        self.path = path
+        self.options = options or StorageOptions("float32", 0, 0, True)
+        if self.options.dtype not in STORAGE_DTYPES:
+            raise ValueError(f"Bilinmeyen saklama tipi: {self.options.dtype}")
+        # Tam boyutlu float32 saklamada arama matrisi float32 kopyanın kendisidir
+        self.exact = self.options.dtype == "float32" and not self.options.dims
+        self.lock = threading.Lock()
+        self.state = CollectionState(None, None, None, [], [], [], {})
+        self._load()
+    
+    def _compact_files(self) -> Tuple[str, str]:
+        """Güncel seçeneklere ait sıkıştırılmış matris ve ölçek dosya adları"""
+        suffix = f"{self.options.dtype}_{self.options.dims or 'full'}"
+        return f"vectors_{suffix}.npy", f"scales_{suffix}.npy"
+    
+    def _load(self):
+        """Matrisleri mmap ile, kayıtları JSON'dan yükle"""
+        if not self.path or not os.path.exists(os.path.join(self.path, RECORDS_FILE)):
+            return
+        with open(os.path.join(self.path, RECORDS_FILE), 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        ids = records["ids"]
+        
+        full_path = os.path.join(self.path, EMBEDDINGS_FILE)
+        full = np.load(full_path, mmap_mode='r') if os.path.exists(full_path) else None
+        if self.exact:
+            compact, scales = full, None
+        else:
+            compact_file, scales_file = self._compact_files()
+            compact_path = os.path.join(self.path, compact_file)
+            if os.path.exists(compact_path):
+                compact = np.load(compact_path, mmap_mode='r')
+                scales_path = os.path.join(self.path, scales_file)
+                scales = np.load(scales_path) if os.path.exists(scales_path) else None
+            elif full is not None:
+                # Saklama seçenekleri değişmiş: float32 kopyadan yeniden üret
+                compact, scales = quantize(np.asarray(full), self.options.dtype, self.options.dims)
+            else:
+                print(f"⚠️ {self.name}: saklanan vektörler güncel seçeneklerle uyumsuz, koleksiyon boş açılıyor")
+                return
+        
+        if compact is None or len(compact) != len(ids):
+            print(f"⚠️ {self.name}: vektör dosyaları eksik veya tutarsız, koleksiyon boş açılıyor")
+            return
+        self.state = CollectionState(
+            full, compact, scales, ids, records["documents"], records["metadatas"],
+            {doc_id: row for row, doc_id in enumerate(ids)}
+        )
+        if full is None and self.options.rescore_candidates and not self.exact:
+            print(f"ℹ️  {self.name}: float32 kopya yok, yeniden puanlama yapılmayacak")
+    
+    def _save(self, full: Optional[np.ndarray], compact: np.ndarray, scales: Optional[np.ndarray],
+              ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]):
+        """Yeni durumu atomik olarak diske yaz ve mmap ile yeniden aç (kilit altında çağrılır)"""
+        index = {doc_id: row for row, doc_id in enumerate(ids)}
+        if not self.exact and not self.options.keep_float32:
+            full = None
+        if not self.path:
+            self.state = CollectionState(full, compact, scales, ids, documents, metadatas, index)
+            return
+        
+        os.makedirs(self.path, exist_ok=True)
+        compact_file, scales_file = self._compact_files()
+        arrays = {}
+        if full is not None:
+            arrays[EMBEDDINGS_FILE] = np.ascontiguousarray(full, dtype=np.float32)
+        if not self.exact:
+            arrays[compact_file] = np.ascontiguousarray(compact)
+            if scales is not None:
+                arrays[scales_file] = scales
+        for name, array in arrays.items():
+            with open(os.path.join(self.path, name + ".tmp"), 'wb') as f:
+                np.save(f, array)
+        for name in arrays:
+            os.replace(os.path.join(self.path, name + ".tmp"), os.path.join(self.path, name))
+        self._write_records(ids, documents, metadatas)
+        
+        # Eski seçeneklerden kalan matrisleri temizle
+        for name in os.listdir(self.path):
+            if name.endswith(".npy") and name not in arrays:
+                os.remove(os.path.join(self.path, name))
+        
+        def reopen(name):
+            return np.load(os.path.join(self.path, name), mmap_mode='r')
+        
+        full = reopen(EMBEDDINGS_FILE) if EMBEDDINGS_FILE in arrays else None
+        compact = full if self.exact else reopen(compact_file)
+        self.state = CollectionState(full, compact, scales, ids, documents, metadatas, index)
+    
+    def _write_records(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]):
+        """Kayıtları (ID, metin, metadata) atomik olarak diske yaz (kilit altında çağrılır)"""
+        records_path = os.path.join(self.path, RECORDS_FILE)
+        with open(records_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({"ids": ids, "documents": documents, "metadatas": metadatas}, f, ensure_ascii=False)
+        os.replace(records_path + ".tmp", records_path)
+    
+    def upsert(self, ids: List[str], texts: List[str], embeddings: List[List[float]],
+               metadatas: List[Dict[str, Any]]):
+        """Dökümanları ekle veya güncelle"""
+        vectors = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        new_compact, new_scales = quantize(vectors, self.options.dtype, self.options.dims)
+        
+        with self.lock:
+            state = self.state
+            if state.ids and state.compact.shape[1] != new_compact.shape[1]:
+                raise ValueError(
+                    f"Embedding boyutu uyumsuz: koleksiyon {state.compact.shape[1]}, "
+                    f"gelen {new_compact.shape[1]}"
+                )
+            all_ids, documents, all_metadatas = list(state.ids), list(state.documents), list(state.metadatas)
+            
+            rows, replaced, added = [], [], []
+            for position, doc_id in enumerate(ids):
+                row = state.index.get(doc_id)
+                if row is None:
+                    added.append(position)
+                    all_ids.append(doc_id)
+                    documents.append(texts[position])
+                    all_metadatas.append(metadatas[position])
+                else:
+                    rows.append(row)
+                    replaced.append(position)
+                    documents[row] = texts[position]
+                    all_metadatas[row] = metadatas[position]
+            
+            keep_full = self.exact or self.options.keep_float32
+            if keep_full and state.ids and state.full is None:
+                print(f"⚠️ {self.name}: float32 kopya eksik, yalnızca sıkıştırılmış vektörler yazılıyor")
+                keep_full = False
+            full = _merged(state.full, rows, vectors[replaced], vectors[added]) if keep_full else None
+            compact = full if self.exact else _merged(
+                state.compact, rows, new_compact[replaced], new_compact[added]
+            )
+            scales = None if new_scales is None else _merged(
+                state.scales, rows, new_scales[replaced], new_scales[added]
+            )
+            self._save(full, compact, scales, all_ids, documents, all_metadatas)
+    
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        """
+        Yalnızca metadata bilgilerini güncelle. Matrislere dokunulmaz, yalnızca kayıt
+        dosyası yazılır; hiçbir metadata değişmediyse hiçbir şey yazılmaz.
+        """
+        with self.lock:
+            state = self.state
+            all_metadatas = None
+            for doc_id, metadata in zip(ids, metadatas):
+                row = state.index.get(doc_id)
+                if row is not None and state.metadatas[row] != metadata:
+                    if all_metadatas is None:
+                        all_metadatas = list(state.metadatas)
+                    all_metadatas[row] = metadata
+            if all_metadatas is None:
+                return
+            if self.path:
+                self._write_records(state.ids, state.documents, all_metadatas)
+            self.state = state._replace(metadatas=all_metadatas)
+    
+    def get_metadatas(self, ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """ID'lerin metadata bilgileri (bulunmayanlar için None)"""
+        state = self.state
+        return [
+            state.metadatas[state.index[doc_id]] if doc_id in state.index else None
+            for doc_id in ids
+        ]
+    
+    def delete(self, ids: List[str]):
+        """Verilen ID'leri sil"""
+        with self.lock:
+            state = self.state
+            drop = {state.index[doc_id] for doc_id in ids if doc_id in state.index}
+            if not drop:
+                return
+            keep = [row for row in range(len(state.ids)) if row not in drop]
+            
+            def take(array):
+                return None if array is None else np.array(array[keep])
+            
+            full = take(state.full)
+            self._save(
+                full, full if self.exact else take(state.compact), take(state.scales),
+                [state.ids[row] for row in keep],
+                [state.documents[row] for row in keep],
+                [state.metadatas[row] for row in keep]
+            )
+    
+    def storage_bytes(self) -> Dict[str, int]:
+        """Aramada taranan (sıcak) matrisin, float32 kopyanın ve diskteki dosyaların boyutu"""
+        state = self.state
+        disk = 0
+        if self.path and os.path.isdir(self.path):
+            disk = sum(
+                os.path.getsize(os.path.join(self.path, name))
+                for name in os.listdir(self.path) if name.endswith(".npy")
+            )
+        return {
+            "search_bytes": (state.compact.nbytes if state.compact is not None else 0)
+                            + (state.scales.nbytes if state.scales is not None else 0),
+            "float32_bytes": state.full.nbytes if state.full is not None else 0,
+            "disk_bytes": disk,
+        }
+    
+    def centroid(self) -> Optional[np.ndarray]:
+        """Normalize vektörlerin ortalaması (kısaltılmış saklamada float32 kopya gerekir)"""
+        state = self.state
+        if state.full is not None:
+            matrix, scales = state.full, None
+        elif not self.options.dims:
+            matrix, scales = state.compact, state.scales
+        else:
+            return None
+        if matrix is None or not len(matrix):
+            return None
+        total = np.zeros(matrix.shape[1], dtype=np.float64)
+        for start in range(0, len(matrix), CONVERT_BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + CONVERT_BLOCK_ROWS], dtype=np.float32)
+            if scales is not None:
+                block = block * scales[start:start + len(block), None]
+            total += block.sum(axis=0)
+        return (total / len(matrix)).astype(np.float32)
+    
+    def query_many(self, queries: np.ndarray, k: int) -> Tuple[CollectionState, np.ndarray, np.ndarray]:
+        """
+        Sorgu matrisi için en yakın k satırı bul
+        
+        Args:
+            queries: (sorgu sayısı, boyut) float32 matris
+            k: Sorgu başına sonuç sayısı
+        
+        Returns:
+            (kullanılan durum, (sorgu, k) satır indeksleri - boşluklar -1,
+             (sorgu, k) kosinüs benzerlikleri - boşluklar -inf)
+        """
+        state = self.state
+        rows = np.full((len(queries), k), -1, dtype=np.int64)
+        similarities = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        found = min(k, len(state.ids))
+        if found <= 0 or not len(queries):
+            return state, rows, similarities
+        
+        queries = _normalize_rows(np.asarray(queries, dtype=np.float32))
+        dims = state.compact.shape[1]
+        search_queries = queries if dims >= queries.shape[1] else _normalize_rows(queries[:, :dims])
+        rescore = (not self.exact and state.full is not None and self.options.rescore_candidates)
+        
+        for start in range(0, len(queries), QUERY_BLOCK):
+            block = slice(start, start + QUERY_BLOCK)
+            if self.exact:
+                scores = queries[block] @ state.compact.T
+            else:
+                scores = approximate_scores(state.compact, state.scales, search_queries[block])
+            
+            if rescore:
+                # Adayları float32 kopyayla tam olarak yeniden puanla (yalnızca aday satırları okunur)
+                candidates = _top_indices(
+                    scores, min(len(state.ids), max(found, self.options.rescore_candidates))
+                )
+                exact_scores = np.einsum(
+                    'qcd,qd->qc', np.asarray(state.full[candidates]), queries[block]
+                )
+                order = _top_indices(exact_scores, found)
+                top = np.take_along_axis(candidates, order, axis=1)
+                top_scores = np.take_along_axis(exact_scores, order, axis=1)
+            else:
+                top = _top_indices(scores, found)
+                top_scores = np.take_along_axis(scores, top, axis=1)
+            
+            rows[block, :found] = top
+            similarities[block, :found] = top_scores
+        return state, rows, similarities
+    
+    def query(self, query_embedding: List[float], n_results: int) -> Dict[str, Any]:
+        """Kosinüs benzerliğine göre en yakın n_results kaydı döndür"""
+        state, rows, similarities = self.query_many(
+            np.asarray([query_embedding], dtype=np.float32), n_results
+        )
+        top = [row for row in rows[0] if row >= 0]
+        return {
+            "ids": [[state.ids[row] for row in top]],
+            "documents": [[state.documents[row] for row in top]],
+            "metadatas": [[state.metadatas[row] for row in top]],
+            "distances": [(1.0 - similarities[0, :len(top)]).tolist()],
+        }
+
+
+class NumpyVectorDatabase(VectorDatabase):
+    """Bellek eşlemeli matris tabanlı vektör veritabanı"""
+    
+    def __init__(self, db_path: Optional[str] = None, options: Optional[StorageOptions] = None):
+        """
+        Args:
+            db_path: Veritabanı dizini (None ise Config.VECTOR_DB_PATH)
+            options: Saklama seçenekleri (None ise Config'ten okunur)
+        """
+        self.options = options or storage_options_from_config()
+        root = db_path or Config.VECTOR_DB_PATH
+        self.root: Optional[str] = os.path.join(root, "numpy_index")
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            print(f"✅ NumPy vektör veritabanı başlatıldı: {self.root} "
+                  f"({self.options.dtype}, boyut: {self.options.dims or 'tam'})")
+        except Exception as e:
+            print(f"⚠️ Veritabanı dizini oluşturulamadı ({e}), bellek içi çalışılacak")
+            self.root = None
+        self.collections: Dict[str, NumpyCollection] = {}
+        self.lock = threading.Lock()
+    
+    def _collection_path(self, collection_name: str) -> Optional[str]:
+        """Koleksiyon dizini"""
+        return os.path.join(self.root, collection_name) if self.root else None
+    
+    def _exists(self, collection_name: str) -> bool:
+        """Koleksiyon bellekte veya diskte var mı?"""
+        path = self._collection_path(collection_name)
+        return collection_name in self.collections or bool(
+            path and os.path.exists(os.path.join(path, RECORDS_FILE))
+        )
+    
+    def create_collection(self, collection_name: str) -> NumpyCollection:
+        """Koleksiyonu sıfırdan oluştur"""
+        with self.lock:
+            self.collections.pop(collection_name, None)
+            path = self._collection_path(collection_name)
+            if path and os.path.exists(path):
+                shutil.rmtree(path)
+                print(f"🗑️  Eski koleksiyon silindi: {collection_name}")
+            collection = NumpyCollection(collection_name, path, self.options)
+            self.collections[collection_name] = collection
+        print(f"✅ Koleksiyon oluşturuldu: {collection_name}")
+        return collection
+    
+    def get_or_create_collection(self, collection_name: str) -> NumpyCollection:
+        """Koleksiyonu silmeden al, yoksa oluştur"""
+        with self.lock:
+            collection = self.collections.get(collection_name)
+            if collection is None:
+                collection = NumpyCollection(
+                    collection_name, self._collection_path(collection_name), self.options
+                )
+                self.collections[collection_name] = collection
+        print(f"✅ Koleksiyon hazır: {collection_name}")
+        return collection
+    
+    def get_collection(self, collection_name: str) -> Optional[NumpyCollection]:
+        """Mevcut koleksiyonu al"""
+        if not self._exists(collection_name):
+            return None
+        with self.lock:
+            collection = self.collections.get(collection_name)
+            if collection is None:
+                collection = NumpyCollection(
+                    collection_name, self._collection_path(collection_name), self.options
+                )
+                self.collections[collection_name] = collection
+            return collection
+    
+    def list_collections(self) -> List[str]:
+        """Mevcut koleksiyonları listele"""
+        names = set(self.collections)
+        if self.root and os.path.isdir(self.root):
+            names.update(name for name in os.listdir(self.root) if self._exists(name))
+        return sorted(names)
+    
+    def count(self, collection: NumpyCollection) -> int:
+        """Koleksiyondaki döküman sayısı"""
+        return len(collection.state.ids)
+    
+    def get_ids(self, collection: NumpyCollection) -> List[str]:
+        """Koleksiyondaki tüm döküman ID'leri"""
+        return list(collection.state.ids)
+    
+    def upsert_documents(self, collection: NumpyCollection, ids: List[str], texts: List[str],
+                         embeddings: List[List[float]], metadatas: List[Dict[str, Any]]):
+        """Dökümanları ekle veya güncelle"""
+        if not ids:
+            return
+        try:
+            collection.upsert(ids, texts, embeddings, metadatas)
+            print(f"✅ {len(ids)} döküman koleksiyona yazıldı")
+        except Exception as e:
+            print(f"❌ Döküman yazma hatası: {e}")
+            raise
+    
+    def update_metadatas(self, collection: NumpyCollection, ids: List[str],
+                         metadatas: List[Dict[str, Any]]):
+        """Metadata bilgilerini güncelle"""
+        if not ids:
+            return
+        try:
+            collection.update_metadatas(ids, metadatas)
+        except Exception as e:
+            print(f"❌ Metadata güncelleme hatası: {e}")
+            raise
+    
+    def get_metadatas(self, collection: NumpyCollection, ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """ID'lerin metadata bilgileri (bulunmayanlar için None)"""
+        return collection.get_metadatas(ids)
+    
+    def delete_documents(self, collection: NumpyCollection, ids: List[str]):
+        """Verilen ID'lere sahip dökümanları sil"""
+        if not ids:
+            return
+        try:
+            collection.delete(ids)
+            print(f"🗑️  {len(ids)} eski döküman silindi")
+        except Exception as e:
+            print(f"❌ Döküman silme hatası: {e}")
+            raise
+    
+    def _search_block(self, collection: NumpyCollection, queries: np.ndarray, k: int) -> SearchBlock:
+        """Tüm sorguları tek matris çarpımıyla ara"""
+        state, rows, similarities = collection.query_many(queries, k)
+        block = empty_search_block(len(queries), k)
+        valid = rows >= 0
+        if valid.any():
+            picked = rows[valid]
+            block.ids[valid] = np.asarray(state.ids, dtype=object)[picked]
+            block.documents[valid] = np.asarray(state.documents, dtype=object)[picked]
+            metadatas = np.empty(len(state.metadatas), dtype=object)
+            metadatas[:] = state.metadatas
+            block.metadatas[valid] = metadatas[picked]
+            block.distances[valid] = 1.0 - similarities[valid]
+        return block
+    
+    def collection_centroid(self, collection: NumpyCollection) -> Optional[np.ndarray]:
+        """Koleksiyon merkezi"""
+        return collection.centroid()
+    
+    def search_similar(self, collection: NumpyCollection, query_embedding: List[float],
+                       n_results: int = 3) -> Dict[str, Any]:
+        """Benzer dökümanları ara"""
+        try:
+            return collection.query(query_embedding, n_results)
+        except Exception as e:
+            print(f"❌ Arama hatası: {e}")
+            return {"documents": [[]], "distances": [[]], "metadatas": [[]]}
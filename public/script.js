@@ -12,6 +12,11 @@ class ChatBot {
         this.isConnected = false;
         this.isThinking = false;
         this.currentBotMessage = '';
+        this.reconnectDelay = 3000;
+        
+        // Protokol v2 artımlı render durumu
+        this.streamView = null;
+        this.renderFrame = null;
         
         this.init();
         this.initWavesAnimation();
@@ -27,12 +32,14 @@ class ChatBot {
             const wsPath = window.location.hostname === 'localhost' ? 
                 '/ws/chat' : '/ws/chat';
             
-            const wsUrl = `${wsProtocol}//${wsHost}${wsPath}`;
+            // protocol=2: yalnızca delta çerçeveleri (eski sunucu v1 ile yanıt verse de çalışır)
+            const wsUrl = `${wsProtocol}//${wsHost}${wsPath}?protocol=2`;
             
             this.ws = new WebSocket(wsUrl);
             
             this.ws.onopen = () => {
                 this.isConnected = true;
+                this.reconnectDelay = 3000;
                 this.updateSendButton();
             };
 
@@ -44,8 +51,9 @@ class ChatBot {
             this.ws.onclose = () => {
                 this.isConnected = false;
                 this.updateSendButton();
-                // 3 saniye sonra yeniden bağlan
-                setTimeout(() => this.connectWebSocket(), 3000);
+                // 3 saniye (sunucu meşgulse bildirilen süre) sonra yeniden bağlan
+                setTimeout(() => this.connectWebSocket(), this.reconnectDelay);
+                this.reconnectDelay = 3000;
             };
 
             this.ws.onerror = (error) => {
@@ -71,6 +79,17 @@ class ChatBot {
             case 'bot_start':
                 // Thinking indicator'ı burada GİZLEME, ilk chunk geldiğinde gizle
                 this.currentBotMessage = '';
+                this.streamView = null;
+                break;
+            
+            case 'bot_delta':
+                // Protokol v2: yalnızca yeni metin gelir, render animasyon karesinde yapılır
+                if (this.isThinking) {
+                    this.isThinking = false;
+                    this.hideThinkingIndicator();
+                }
+                this.currentBotMessage += data.content;
+                this.scheduleStreamRender();
                 break;
             
             case 'bot_chunk':
@@ -83,12 +102,30 @@ class ChatBot {
                 break;
             
             case 'bot_complete':
-                this.finalizeMessage(data.content);
+                // v1 yanıtın tamamını gönderir, v2'de deltalar birleştirilir
+                this.finalizeMessage(data.content !== undefined ? data.content : this.currentBotMessage);
                 this.isThinking = false;
                 this.hideThinkingIndicator(); // Güvenlik için
                 this.currentBotMessage = '';
                 break;
             
+            case 'queue_position':
+                // Sunucu yoğun: soru kuyrukta, sıra bilgisi thinking indicator'da gösterilir
+                this.updateThinkingText(data.content);
+                break;
+            
+            case 'busy':
+                // Aşırı yük: soru reddedildi, retry_after saniye sonra tekrar denenebilir.
+                // Yalnızca bağlantı sınırında sunucu bağlantıyı kapatır; yeniden bağlanma bu süre kadar ertelenir
+                if (data.reason === 'too_many_connections') {
+                    this.reconnectDelay = Math.max(3000, data.retry_after * 1000);
+                }
+                this.addMessage(data.content, 'bot', true);
+                this.isThinking = false;
+                this.hideThinkingIndicator();
+                this.currentBotMessage = '';
+                break;
+            
             case 'error':
                 this.addMessage(data.content, 'bot', true);
                 this.isThinking = false;
@@ -231,6 +268,13 @@ class ChatBot {
         this.scrollToBottom();
     }
 
+    updateThinkingText(text) {
+        const textDiv = document.querySelector('#thinking-indicator .thinking-text');
+        if (textDiv) {
+            textDiv.textContent = text;
+        }
+    }
+
     hideThinkingIndicator() {
         const existing = document.getElementById('thinking-indicator');
         if (existing) {
@@ -275,7 +319,86 @@ class ChatBot {
         this.scrollToBottom();
     }
 
+    scheduleStreamRender() {
+        if (this.renderFrame === null) {
+            this.renderFrame = requestAnimationFrame(() => {
+                this.renderFrame = null;
+                this.renderStreamingDelta();
+            });
+        }
+    }
+
+    renderMarkdown(text) {
+        if (typeof marked !== 'undefined') {
+            return marked.parse(text);
+        }
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
+    createStreamingView() {
+        // Remove existing streaming message
+        const existing = document.getElementById('streaming-message');
+        if (existing) {
+            existing.remove();
+        }
+        
+        const messageDiv = document.createElement('div');
+        messageDiv.className = 'message bot-message streaming';
+        messageDiv.id = 'streaming-message';
+        
+        const avatarDiv = document.createElement('div');
+        avatarDiv.className = 'message-avatar';
+        avatarDiv.innerHTML = '<img src="/static/Avatar_Default.svg" alt="Bot" width="32" height="32">';
+        messageDiv.appendChild(avatarDiv);
+        
+        // Tamamlanan bloklar bir kez render edilir, yalnızca son (yazılmakta olan) blok yenilenir
+        const contentDiv = document.createElement('div');
+        contentDiv.className = 'message-content';
+        const committedDiv = document.createElement('div');
+        const tailDiv = document.createElement('div');
+        const cursorDiv = document.createElement('div');
+        cursorDiv.className = 'typing-cursor';
+        contentDiv.appendChild(committedDiv);
+        contentDiv.appendChild(tailDiv);
+        contentDiv.appendChild(cursorDiv);
+        
+        messageDiv.appendChild(contentDiv);
+        this.messagesContainer.appendChild(messageDiv);
+        return { committed: committedDiv, tail: tailDiv, committedLength: 0, fences: 0 };
+    }
+
+    renderStreamingDelta() {
+        if (!this.streamView) {
+            this.streamView = this.createStreamingView();
+        }
+        const view = this.streamView;
+        const text = this.currentBotMessage;
+        
+        // Son boş satıra kadarki metin (açık kod bloğu içinde değilse) sabitlenir
+        const boundary = text.lastIndexOf('\n\n');
+        if (boundary >= view.committedLength) {
+            const block = text.slice(view.committedLength, boundary);
+            const fences = view.fences + (block.match(/```/g) || []).length;
+            if (fences % 2 === 0) {
+                view.committed.insertAdjacentHTML('beforeend', this.renderMarkdown(block));
+                view.committedLength = boundary + 2;
+                view.fences = fences;
+            }
+        }
+        view.tail.innerHTML = this.renderMarkdown(text.slice(view.committedLength));
+        this.scrollToBottom();
+    }
+
     finalizeMessage(content) {
+        // Bekleyen artımlı render'ı iptal et; son hali tek seferde render edilir
+        if (this.renderFrame !== null) {
+            cancelAnimationFrame(this.renderFrame);
+            this.renderFrame = null;
+        }
+        this.streamView = null;
+        
         // Remove streaming message
         const existing = document.getElementById('streaming-message');
         if (existing) {
@@ -0,0 +1,108 @@
+"""
+Yerel sorgu yönlendirme modülü
+Bu modül kaynak kararını (TRANSCRIPT_ONLY / BOOK_ONLY) LLM'e sormadan, soru
+embedding'inin koleksiyon merkezlerine (normalize chunk embedding'lerinin
+ortalaması) kosinüs benzerliğiyle verir. En yakın iki merkez arasındaki fark
+eşikten küçükse karar verilmez ve LLM kararına düşülür.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Kaynak etiketi -> yerel olarak verilebilen karar
+ROUTE_DECISIONS = {
+    'transcript': 'TRANSCRIPT_ONLY',
+    'book': 'BOOK_ONLY',
+}
+
+
+class CentroidQueryRouter:
+    """En yakın koleksiyon merkezi + skor farkı ile çalışan yönlendirici"""
+    
+    def __init__(self, margin: float = 0.03, min_similarity: float = 0.0):
+        """
+        Args:
+            margin: Yerel karar için en iyi iki skor arasındaki minimum fark
+            min_similarity: En iyi skor bunun altındaysa (ör. konu dışı soru) LLM'e düş
+        """
+        self.margin = margin
+        self.min_similarity = min_similarity
+        self.centroids: Dict[str, np.ndarray] = {}
+        self.lock = threading.Lock()
+        self.local_decisions = 0
+        self.fallbacks = 0
+    
+    def set_centroid(self, label: str, centroid: Optional[np.ndarray]):
+        """
+        Kaynağın merkez vektörünü ayarla (None ise kaynak yönlendirmeden çıkarılır)
+        
+        Args:
+            label: Kaynak etiketi ('transcript' veya 'book')
+            centroid: Koleksiyon merkezi
+        """
+        with self.lock:
+            if centroid is None or label not in ROUTE_DECISIONS:
+                self.centroids.pop(label, None)
+                return
+            centroid = np.asarray(centroid, dtype=np.float32)
+            norm = float(np.linalg.norm(centroid))
+            if norm > 0:
+                self.centroids[label] = centroid / norm
+    
+    @property
+    def ready(self) -> bool:
+        """Karşılaştırılacak en az iki kaynak var mı?"""
+        return len(self.centroids) >= 2
+    
+    def scores(self, query_embedding: List[float]) -> Dict[str, float]:
+        """Sorunun her kaynak merkezine kosinüs benzerliği"""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if norm == 0:
+            return {}
+        query = query / norm
+        with self.lock:
+            return {
+                label: float(centroid @ query)
+                for label, centroid in self.centroids.items()
+                if centroid.shape == query.shape
+            }
+    
+    def route(self, query_embedding: List[float]) -> Dict[str, Any]:
+        """
+        Soru için yerel karar ver
+        
+        Args:
+            query_embedding: Soru embedding'i
+        
+        Returns:
+            {'decision': karar veya None (LLM'e düş), 'scores': kaynak skorları, 'margin': fark}
+        """
+        scores = self.scores(query_embedding) if query_embedding else {}
+        decision = None
+        margin = 0.0
+        if len(scores) >= 2:
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            margin = ranked[0][1] - ranked[1][1]
+            if margin >= self.margin and ranked[0][1] >= self.min_similarity:
+                decision = ROUTE_DECISIONS[ranked[0][0]]
+        
+        with self.lock:
+            if decision:
+                self.local_decisions += 1
+            else:
+                self.fallbacks += 1
+        return {'decision': decision, 'scores': scores, 'margin': margin}
+    
+    def stats(self) -> Dict[str, float]:
+        """Yerel karar / LLM'e düşme sayaçları"""
+        with self.lock:
+            total = self.local_decisions + self.fallbacks
+            return {
+                "local_decisions": self.local_decisions,
+                "fallbacks": self.fallbacks,
+                "local_rate": self.local_decisions / total if total else 0.0,
+                "sources": sorted(self.centroids),
+            }
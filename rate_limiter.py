@@ -0,0 +1,77 @@
+"""
+Hız sınırlama modülü
+Bu modül uzak API çağrılarını token bucket algoritması ile sınırlar.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket hız sınırlayıcı"""
+    
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        """
+        Args:
+            rate_per_minute: Dakika başına izin verilen istek sayısı
+            capacity: Anlık patlama kapasitesi (varsayılan: bir saniyelik kota, en az 1)
+        """
+        self.rate = max(rate_per_minute, 1) / 60.0
+        self.capacity = capacity if capacity else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+    
+    def _refill(self, now: float):
+        """Geçen süreye göre token ekle"""
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+    
+    def acquire(self, tokens: float = 1.0):
+        """
+        Yeterli token birikene kadar bekle ve tüket
+        
+        Args:
+            tokens: Tüketilecek token miktarı
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = max(self.blocked_until - now, (tokens - self.tokens) / self.rate)
+            time.sleep(max(wait, 0.001))
+    
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Beklemeden token tüketmeyi dene
+        
+        Args:
+            tokens: Tüketilecek token miktarı
+        
+        Returns:
+            0 (tüketildi) veya yeterli token birikmesi için gereken bekleme süresi
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now >= self.blocked_until and self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return max(self.blocked_until - now, (tokens - self.tokens) / self.rate)
+    
+    def penalize(self, seconds: float):
+        """
+        Sunucu kota aşımı bildirdiğinde tüm istekleri bir süre durdur
+        
+        Args:
+            seconds: Bekleme süresi
+        """
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
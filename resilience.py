@@ -0,0 +1,399 @@
+"""
+Dayanıklılık modülü
+Bu modül LLM backend'ini aşama başına süre sınırları, gecikmeli kopya (hedged)
+istekler ve devre kesici ile saran katmanı içerir:
+
+- Karar çağrısı, cevap üretimi (ilk parça, parçalar arası bekleme, toplam süre),
+  sorgu embedding'i ve batch embedding için ayrı süre sınırları vardır.
+- Kısa çağrılar (karar, sorgu embedding'i) gecikmeleri son çağrıların p95'ini
+  aşarsa bir kez daha gönderilir; önce biten kullanılır. Kopya oranı sınırlıdır.
+- Üst üste hatalarda devre açılır ve çağrılar beklemeden UpstreamUnavailable ile
+  reddedilir; agent bu durumda yedek moda (yalnızca arama alıntıları) geçer.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+from config import Config
+from llm_backend import LLMBackend
+
+# Aşama -> (süre sınırı ayarı, kopya istek yapılır mı, devre kesici)
+# Batch embedding (ingestion) devreye bağlı değildir; pipeline kendi yeniden denemesini yapar
+STAGES = {
+    'decision': ('LLM_DECISION_TIMEOUT', True, 'generation'),
+    'answer': ('LLM_ANSWER_TIMEOUT', False, 'generation'),
+    'embed_query': ('EMBED_QUERY_TIMEOUT', True, 'embedding'),
+    'embed_batch': ('EMBED_BATCH_TIMEOUT', False, None),
+}
+
+
+class UpstreamUnavailable(Exception):
+    """Model / embedding servisi şu an kullanılamıyor (süre aşımı, hata veya açık devre)"""
+
+
+class DeadlineExceeded(UpstreamUnavailable, TimeoutError):
+    """Aşama süre sınırı aşıldı"""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    """Devre açık: çağrı yapılmadan reddedildi"""
+
+
+class LatencyTracker:
+    """Son başarılı çağrıların gecikme penceresi"""
+    
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+        self.lock = threading.Lock()
+    
+    def add(self, seconds: float):
+        with self.lock:
+            self.samples.append(seconds)
+    
+    def percentile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        """Yüzdelik gecikme (yeterli örnek yoksa None)"""
+        with self.lock:
+            if len(self.samples) < max(1, min_samples):
+                return None
+            return float(np.percentile(list(self.samples), q))
+
+
+class CircuitBreaker:
+    """
+    Ardışık hata sayacıyla çalışan devre kesici: closed -> open (reset süresi boyunca
+    çağrılar reddedilir) -> half_open (tek deneme; başarılıysa closed, değilse open)
+    """
+    
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.trial_started = 0.0
+        self.opens = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+    
+    def before_call(self):
+        """Çağrıya izin ver veya CircuitOpenError fırlat"""
+        with self.lock:
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = 'half_open'
+                self.trial_in_flight = False
+            if self.state == 'closed':
+                return
+            # Sonucu bildirilmeyen (ör. yarıda bırakılan akış) deneme yenisini engellemesin
+            if self.state == 'half_open' and (
+                not self.trial_in_flight or time.monotonic() - self.trial_started >= self.reset_seconds
+            ):
+                self.trial_in_flight = True
+                self.trial_started = time.monotonic()
+                return
+            self.rejected += 1
+        raise CircuitOpenError(f"{self.name} devresi açık, servis geçici olarak kullanılamıyor")
+    
+    def record_success(self):
+        with self.lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.trial_in_flight = False
+    
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.opens += 1
+                    print(f"🔌 {self.name} devresi açıldı ({self.failures} ardışık hata)")
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "opens": self.opens,
+                "rejected": self.rejected,
+            }
+
+
+class ResilientBackend(LLMBackend):
+    """Başka bir backend'i süre sınırları, hedged istekler ve devre kesicilerle saran backend"""
+    
+    def __init__(self, inner: LLMBackend):
+        """
+        Args:
+            inner: Sarılan backend (Gemini veya sahte)
+        """
+        self.inner = inner
+        self.name = inner.name
+        self.deadlines = {stage: getattr(Config, setting) for stage, (setting, _, _) in STAGES.items()}
+        self.first_token_timeout = Config.LLM_FIRST_TOKEN_TIMEOUT
+        self.stream_idle_timeout = Config.LLM_STREAM_IDLE_TIMEOUT
+        self.hedging = Config.HEDGE_ENABLED
+        self.hedge_percentile = Config.HEDGE_PERCENTILE
+        self.hedge_min_samples = Config.HEDGE_MIN_SAMPLES
+        self.hedge_min_delay = Config.HEDGE_MIN_DELAY
+        self.hedge_max_rate = Config.HEDGE_MAX_RATE
+        self.breakers = {
+            kind: CircuitBreaker(kind, Config.BREAKER_FAILURE_THRESHOLD, Config.BREAKER_RESET_SECONDS)
+            for kind in ('generation', 'embedding')
+        }
+        self.latencies = {stage: LatencyTracker() for stage in STAGES}
+        self.executor = ThreadPoolExecutor(max_workers=Config.BLOCKING_WORKERS, thread_name_prefix="resilience")
+        self.lock = threading.Lock()
+        self.counters = {
+            stage: {'calls': 0, 'hedged': 0, 'hedge_wins': 0, 'timeouts': 0, 'errors': 0}
+            for stage in STAGES
+        }
+    
+    # --- yardımcılar ---
+    
+    def _before_call(self, stage: str):
+        """Aşamanın devresi açıksa CircuitOpenError fırlat, değilse çağrıyı say"""
+        kind = STAGES[stage][2]
+        if kind:
+            self.breakers[kind].before_call()
+        self._count(stage, calls=1)
+    
+    def _succeeded(self, stage: str):
+        kind = STAGES[stage][2]
+        if kind:
+            self.breakers[kind].record_success()
+    
+    def _count(self, stage: str, **increments: int):
+        with self.lock:
+            for name, value in increments.items():
+                self.counters[stage][name] += value
+    
+    def _hedge_delay(self, stage: str) -> Optional[float]:
+        """Kopya isteğin gönderileceği gecikme (kapalıysa, ısınmadıysa veya oran dolduysa None)"""
+        if not (self.hedging and STAGES[stage][1]):
+            return None
+        with self.lock:
+            counters = self.counters[stage]
+            if counters['hedged'] >= self.hedge_max_rate * max(1, counters['calls']):
+                return None
+        delay = self.latencies[stage].percentile(self.hedge_percentile, self.hedge_min_samples)
+        return None if delay is None else max(self.hedge_min_delay, delay)
+    
+    def _failed(self, stage: str, error: BaseException) -> UpstreamUnavailable:
+        """Hatayı say, devreye bildir ve UpstreamUnavailable'a çevir"""
+        kind = STAGES[stage][2]
+        if kind:
+            self.breakers[kind].record_failure()
+        if isinstance(error, DeadlineExceeded):
+            self._count(stage, timeouts=1)
+            return error
+        self._count(stage, errors=1)
+        if isinstance(error, UpstreamUnavailable):
+            return error
+        unavailable = UpstreamUnavailable(f"{stage} çağrısı başarısız: {error}")
+        unavailable.__cause__ = error
+        return unavailable
+    
+    def _timed(self, stage: str, func: Callable[[], Any]) -> Callable[[], Any]:
+        """Başarılı çağrının kendi süresini gecikme penceresine yazan sarmalayıcı"""
+        def call():
+            started = time.perf_counter()
+            result = func()
+            self.latencies[stage].add(time.perf_counter() - started)
+            return result
+        return call
+    
+    def _call(self, stage: str, func: Callable[[], Any]) -> Any:
+        """
+        Senkron çağrıyı süre sınırı, gerekirse kopya istek ve devre kesiciyle çalıştır.
+        Kaybeden / süresi dolan istek arka planda biter, sonucu atılır.
+        """
+        self._before_call(stage)
+        deadline = time.monotonic() + self.deadlines[stage]
+        hedge_at = self._hedge_delay(stage)
+        hedge_at = None if hedge_at is None else time.monotonic() + hedge_at
+        pending = {self.executor.submit(self._timed(stage, func))}
+        primary = next(iter(pending))
+        last_error: Optional[BaseException] = None
+        
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            until = deadline if hedge_at is None else min(deadline, hedge_at)
+            done, pending = wait(pending, timeout=max(0.0, until - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self._succeeded(stage)
+                    if future is not primary:
+                        self._count(stage, hedge_wins=1)
+                    return future.result()
+                last_error = future.exception()
+            if hedge_at is not None and time.monotonic() >= hedge_at and pending:
+                # Birincil istek p95'i aştı: kopyasını gönder
+                hedge_at = None
+                self._count(stage, hedged=1)
+                pending.add(self.executor.submit(self._timed(stage, func)))
+        
+        if pending or last_error is None:
+            last_error = DeadlineExceeded(f"{stage} {self.deadlines[stage]:.1f} s içinde yanıt vermedi")
+        raise self._failed(stage, last_error)
+    
+    async def _call_async(self, stage: str, func: Callable[[], Any]) -> Any:
+        """_call'ın async versiyonu: func coroutine döndürür, kaybeden istek iptal edilir"""
+        self._before_call(stage)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadlines[stage]
+        hedge_at = self._hedge_delay(stage)
+        hedge_at = None if hedge_at is None else loop.time() + hedge_at
+        
+        async def timed():
+            started = time.perf_counter()
+            result = await func()
+            self.latencies[stage].add(time.perf_counter() - started)
+            return result
+        
+        primary = asyncio.ensure_future(timed())
+        pending = {primary}
+        last_error: Optional[BaseException] = None
+        try:
+            while pending:
+                now = loop.time()
+                if now >= deadline:
+                    break
+                until = deadline if hedge_at is None else min(deadline, hedge_at)
+                done, pending = await asyncio.wait(pending, timeout=until - now, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._succeeded(stage)
+                        if task is not primary:
+                            self._count(stage, hedge_wins=1)
+                        return task.result()
+                    last_error = task.exception()
+                if hedge_at is not None and loop.time() >= hedge_at and pending:
+                    hedge_at = None
+                    self._count(stage, hedged=1)
+                    pending.add(asyncio.ensure_future(timed()))
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        if pending or last_error is None:
+            last_error = DeadlineExceeded(f"{stage} {self.deadlines[stage]:.1f} s içinde yanıt vermedi")
+        raise self._failed(stage, last_error)
+    
+    def _chunk_timeout(self, started: float, first: bool) -> float:
+        """Sıradaki parça için kalan süre (ilk parça / parçalar arası / toplam sınırın küçüğü)"""
+        remaining = self.deadlines['answer'] - (time.monotonic() - started)
+        limit = self.first_token_timeout if first else self.stream_idle_timeout
+        return min(limit, remaining)
+    
+    # --- LLMBackend arayüzü ---
+    
+    @staticmethod
+    def _with_timeout(options: Dict[str, Any], seconds: float) -> Dict[str, Any]:
+        """Süre sınırını alt backend'e de ilet (Gemini'de HTTP isteği de kesilir)"""
+        request_options = dict(options.get('request_options') or {})
+        request_options.setdefault('timeout', seconds)
+        return dict(options, request_options=request_options)
+    
+    def generate(self, model_name: str, contents: Any, stage: str = 'answer', **options) -> Any:
+        stage = stage if stage in ('decision', 'answer') else 'answer'
+        options = self._with_timeout(options, self.deadlines[stage])
+        return self._call(stage, lambda: self.inner.generate(model_name, contents, stage=stage, **options))
+    
+    async def generate_async(self, model_name: str, contents: Any, stage: str = 'answer', **options) -> Any:
+        stage = stage if stage in ('decision', 'answer') else 'answer'
+        options = self._with_timeout(options, self.deadlines[stage])
+        return await self._call_async(
+            stage, lambda: self.inner.generate_async(model_name, contents, stage=stage, **options)
+        )
+    
+    def generate_stream(self, model_name: str, contents: Any, stage: str = 'answer', **options) -> Iterator[Any]:
+        self._before_call('answer')
+        options = self._with_timeout(options, self.deadlines['answer'])
+        started = time.monotonic()
+        iterator = None
+        
+        def advance():
+            # Gemini isteği akış oluşturulurken gönderir; o da süre sınırına dahil
+            nonlocal iterator
+            if iterator is None:
+                iterator = iter(self.inner.generate_stream(model_name, contents, stage=stage, **options))
+            return next(iterator, StopIteration)
+        
+        first = True
+        try:
+            while True:
+                future = self.executor.submit(advance)
+                timeout = self._chunk_timeout(started, first)
+                done, _ = wait([future], timeout=max(0.0, timeout))
+                if not done:
+                    raise DeadlineExceeded(
+                        "İlk parça süre sınırı aşıldı" if first else "Yanıt akışı süre sınırını aştı"
+                    )
+                chunk = future.result()
+                if chunk is StopIteration:
+                    break
+                if first:
+                    self.latencies['answer'].add(time.monotonic() - started)
+                    first = False
+                yield chunk
+        except Exception as error:
+            raise self._failed('answer', error)
+        self._succeeded('answer')
+    
+    async def generate_stream_async(self, model_name: str, contents: Any, stage: str = 'answer',
+                                    **options) -> AsyncIterator[Any]:
+        self._before_call('answer')
+        options = self._with_timeout(options, self.deadlines['answer'])
+        started = time.monotonic()
+        iterator = self.inner.generate_stream_async(model_name, contents, stage=stage, **options).__aiter__()
+        first = True
+        try:
+            while True:
+                timeout = self._chunk_timeout(started, first)
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), max(0.0, timeout))
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded(
+                        "İlk parça süre sınırı aşıldı" if first else "Yanıt akışı süre sınırını aştı"
+                    )
+                if first:
+                    self.latencies['answer'].add(time.monotonic() - started)
+                    first = False
+                yield chunk
+        except Exception as error:
+            raise self._failed('answer', error)
+        self._succeeded('answer')
+    
+    def embed(self, model_name: str, content: Union[str, List[str]], task_type: str,
+              timeout: Optional[float] = None) -> List[Any]:
+        stage = 'embed_query' if isinstance(content, str) else 'embed_batch'
+        seconds = timeout or self.deadlines[stage]
+        return self._call(stage, lambda: self.inner.embed(model_name, content, task_type, timeout=seconds))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Aşama sayaçları, p95 gecikmeleri ve devre durumları"""
+        with self.lock:
+            stages = {stage: dict(counters) for stage, counters in self.counters.items()}
+        for stage, counters in stages.items():
+            p95 = self.latencies[stage].percentile(95)
+            counters['p95_ms'] = None if p95 is None else round(p95 * 1000, 1)
+            counters['deadline_s'] = self.deadlines[stage]
+        return {
+            "backend": self.name,
+            "stages": stages,
+            "breakers": {kind: breaker.stats() for kind, breaker in self.breakers.items()},
+        }
@@ -0,0 +1,162 @@
+"""
+Singleflight modülü
+Bu modül aynı anda sorulan aynı soruları tek bir upstream akışında birleştirir.
+İlk istek akışı başlatır; eşzamanlı kopyalar aynı parça akışına abone olur.
+Parçalar bir tampona yazıldığından sonradan katılan abone önce o ana kadar
+üretilenleri (replay), sonra canlı parçaları alır. Akış, abone kalmazsa iptal
+edilir; bittiğinde anahtar serbest kalır (sonraki aynı sorular yanıt önbelleğine
+veya yeni bir akışa gider). Upstream parça üretmeden önceki durumunu (ör. kabul
+kuyruğundaki sırası) publish ile tüm abonelere iletebilir; sonradan katılan abone
+son durumu hemen alır.
+"""
+
+import asyncio
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+_PUNCTUATION = re.compile(r"[^\w\s]", re.UNICODE)
+
+
+def normalize_question(question: str) -> str:
+    """Birleştirme anahtarı: küçük harf, noktalama yok, tek boşluk"""
+    # casefold "İ"yi "i" + birleşen nokta yapar; nokta noktalama gibi silinip kelimeyi bölmesin
+    question = question.replace("İ", "i")
+    return " ".join(_PUNCTUATION.sub(" ", question.casefold()).split())
+
+
+class _Flight:
+    """Tek bir upstream akışın tamponu ve aboneleri"""
+    
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.listeners: List[Callable[..., Awaitable[None]]] = []
+        self.status: Optional[Tuple] = None
+        self.task: Optional[asyncio.Task] = None
+        self.changed = asyncio.Event()
+    
+    def notify(self):
+        """Bekleyen abonelere yeni parça / bitiş bildir"""
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+
+class SingleFlight:
+    """Anahtar başına tek upstream akış, çok aboneli fan-out"""
+    
+    def __init__(self):
+        self.flights: Dict[str, _Flight] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.late_joiners = 0
+        self.replayed_chunks = 0
+        self.abandoned = 0
+    
+    async def stream(self, key: str, factory: Callable[[], AsyncIterator[str]],
+                     on_status: Optional[Callable[..., Awaitable[None]]] = None) -> AsyncIterator[str]:
+        """
+        Anahtar için akan bir upstream varsa ona abone ol, yoksa factory ile başlat
+        
+        Args:
+            key: Birleştirme anahtarı (ör. normalize_question(soru))
+            factory: Upstream parça akışını oluşturan fonksiyon
+            on_status: Upstream'in publish ettiği durumlarla çağrılır (abone olunca
+                geçerli bir durum varsa o da hemen iletilir)
+        
+        Yields:
+            Upstream parçaları (baştan itibaren)
+        """
+        flight = self.flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self.flights[key] = flight
+            flight.task = asyncio.create_task(self._drive(key, flight, factory))
+            self.leaders += 1
+        else:
+            self.followers += 1
+            if flight.chunks:
+                self.late_joiners += 1
+                self.replayed_chunks += len(flight.chunks)
+        
+        flight.subscribers += 1
+        if on_status is not None:
+            flight.listeners.append(on_status)
+        index = 0
+        try:
+            if on_status is not None and flight.status is not None:
+                await on_status(*flight.status)
+            while True:
+                while index < len(flight.chunks):
+                    yield flight.chunks[index]
+                    index += 1
+                if flight.done:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                await flight.changed.wait()
+        finally:
+            flight.subscribers -= 1
+            if on_status is not None:
+                flight.listeners.remove(on_status)
+            if flight.subscribers == 0 and not flight.done:
+                # Dinleyen kalmadı: upstream'i boşuna sürdürme
+                self.abandoned += 1
+                self._release(key, flight)
+                flight.task.cancel()
+    
+    async def _drive(self, key: str, flight: _Flight, factory: Callable[[], AsyncIterator[str]]):
+        """Upstream'i abonelerden bağımsız tüket (ilk abone ayrılsa da diğerleri alır)"""
+        try:
+            async for chunk in factory():
+                flight.chunks.append(chunk)
+                flight.notify()
+        except asyncio.CancelledError:
+            flight.error = ConnectionAbortedError("Upstream akış iptal edildi")
+        except Exception as error:
+            flight.error = error
+        finally:
+            flight.done = True
+            self._release(key, flight)
+            flight.notify()
+    
+    async def publish(self, key: str, *status):
+        """
+        Akışın durumunu tüm abonelere ilet; durum, sonradan katılanlar için saklanır.
+        Boş durum saklanan durumu temizler ve abonelere iletilmez.
+        
+        Args:
+            key: Birleştirme anahtarı
+            status: on_status'a verilecek argümanlar
+        """
+        flight = self.flights.get(key)
+        if flight is None:
+            return
+        flight.status = status or None
+        if not status:
+            return
+        for listener in list(flight.listeners):
+            try:
+                await listener(*status)
+            except Exception:
+                # Bir abonenin hatası diğerlerini ve upstream'i etkilemesin
+                pass
+    
+    def _release(self, key: str, flight: _Flight):
+        """Anahtarı serbest bırak (yalnızca hâlâ bu akışa aitse)"""
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Birleştirme sayaçları"""
+        requests = self.leaders + self.followers
+        return {
+            "upstream_calls": self.leaders,
+            "saved_upstream_calls": self.followers,
+            "late_joiners": self.late_joiners,
+            "replayed_chunks": self.replayed_chunks,
+            "abandoned_upstreams": self.abandoned,
+            "in_flight": len(self.flights),
+            "coalesce_rate": self.followers / requests if requests else 0.0,
+        }
@@ -0,0 +1,125 @@
+"""
+Websocket akış protokolü modülü
+Bu modül yanıt parçalarını websocket çerçevelerine (JSON) dönüştürür.
+
+- v1 (varsayılan, eski istemciler): her parça için bir bot_chunk çerçevesi; çerçeve
+  parçayı ve o ana kadarki yanıtın tamamını (full_content) taşır, bot_complete yanıtın
+  tamamını tekrar gönderir. Gönderilen bayt yanıt uzunluğuyla karesel büyür.
+- v2 (istemci /ws/chat?protocol=2 ile bağlanır): yalnızca yeni metin (bot_delta)
+  gönderilir; parçalar küçük bir süre / boyut penceresinde birleştirilir, ilk parça
+  beklemeden gönderilir. bot_complete metin taşımaz, istemci deltaları birleştirir.
+  Türkçe karakterler \\u kaçışı yerine UTF-8 olarak yazılır.
+"""
+
+import asyncio
+import json
+from typing import AsyncIterator
+
+PROTOCOL_VERSIONS = (1, 2)
+
+
+def negotiate_protocol(requested: str) -> int:
+    """İstemcinin istediği protokol sürümü (bilinmiyorsa v1)"""
+    try:
+        version = int(requested)
+    except (TypeError, ValueError):
+        return 1
+    return version if version in PROTOCOL_VERSIONS else 1
+
+
+async def coalesce(chunks: AsyncIterator[str], window: float, max_chars: int) -> AsyncIterator[str]:
+    """
+    Parçaları birleştir: ilk parça hemen, sonrakiler ilk bekleyen parçadan itibaren
+    window saniye dolunca veya max_chars karaktere ulaşınca tek parça olarak verilir
+    
+    Args:
+        chunks: Yanıt parçaları
+        window: Birleştirme penceresi (saniye, 0 ise birleştirme yok)
+        max_chars: Bu uzunluğa ulaşan birleşik parça pencere dolmadan verilir
+    """
+    if window <= 0:
+        async for chunk in chunks:
+            if chunk:
+                yield chunk
+        return
+    
+    loop = asyncio.get_running_loop()
+    iterator = chunks.__aiter__()
+    buffer, size, deadline, first = [], 0, 0.0, True
+    pending = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            timeout = max(0.0, deadline - loop.time()) if buffer else None
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                # Pencere doldu, yeni parça beklenmeden gönder
+                yield "".join(buffer)
+                buffer, size = [], 0
+                continue
+            
+            task, pending = pending, None
+            try:
+                chunk = task.result()
+            except StopAsyncIteration:
+                break
+            if not chunk:
+                continue
+            if first:
+                first = False
+                yield chunk
+                continue
+            
+            if not buffer:
+                deadline = loop.time() + window
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= max_chars:
+                yield "".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def stream_frames(chunks: AsyncIterator[str], protocol: int = 1, window: float = 0.0,
+                        max_chars: int = 0) -> AsyncIterator[str]:
+    """
+    Yanıt parçalarından websocket çerçeveleri üret (bot_start ... bot_complete)
+    
+    Args:
+        chunks: Yanıt parçaları
+        protocol: Protokol sürümü (1 | 2)
+        window: v2 birleştirme penceresi (saniye)
+        max_chars: v2 birleştirilen çerçeve başına karakter sınırı
+    """
+    if protocol >= 2:
+        yield json.dumps({"type": "bot_start", "protocol": 2})
+        async for delta in coalesce(chunks, window, max_chars):
+            yield json.dumps({"type": "bot_delta", "content": delta}, ensure_ascii=False)
+        yield json.dumps({"type": "bot_complete"})
+        return
+    
+    # Streaming yanıt başlat (sadece frontend'e stream başlıyor sinyali)
+    yield json.dumps({
+        "type": "bot_start",
+        "content": ""
+    })
+    full_response = ""
+    async for chunk in chunks:
+        if chunk:
+            full_response += chunk
+            yield json.dumps({
+                "type": "bot_chunk",
+                "content": chunk,
+                "full_content": full_response
+            })
+    
+    # Yanıt tamamlandı
+    yield json.dumps({
+        "type": "bot_complete",
+        "content": full_response
+    })
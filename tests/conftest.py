@@ -0,0 +1,65 @@
+"""
+Test ayarları: proje kökü import yoluna eklenir ve testler ağ / API anahtarı
+olmadan sahte LLM backend'iyle çalışır
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class CountingEmbeddings:
+    """Sahte backend'le embedding üretir ve embed edilen chunk'ları kaydeder"""
+    
+    def __init__(self, generator):
+        self.generator = generator
+        self.embedded = []
+    
+    def generate_embeddings(self, texts):
+        self.embedded.extend(texts)
+        return self.generator.generate_embeddings(texts)
+
+
+@pytest.fixture
+def ingestion(tmp_path, monkeypatch):
+    """
+    Geçici dizinde NumPy backend'li, sahte embedding'li korpus ingestion ortamı
+    
+    Returns:
+        ingest(dosyalar, koleksiyon), write(ad, metin) -> yol, vector_db, manifest ve
+        embeddings (CountingEmbeddings) alanları olan nesne
+    """
+    from config import Config
+    from corpus_ingestor import CorpusIngestor
+    from embedding_generator import EmbeddingGenerator
+    from fake_llm_backend import FakeLLMBackend
+    from index_manifest import IndexManifest
+    from numpy_vector_database import NumpyVectorDatabase, StorageOptions
+    from text_processor import TextProcessor
+    
+    monkeypatch.setattr(Config, "EMBEDDING_CACHE_PATH", "")
+    monkeypatch.setattr(Config, "EMBEDDING_CHECKPOINT_DIR", None)
+    monkeypatch.setattr(Config, "INGEST_GROUP_SIZE", 4)
+    db_path = str(tmp_path / "db")
+    backend = FakeLLMBackend(latency="const:0", embed_latency="const:0", dimensions=32, seed=0)
+    embeddings = CountingEmbeddings(EmbeddingGenerator(backend))
+    vector_db = NumpyVectorDatabase(db_path, StorageOptions("float32", 0, 0, True))
+    manifest = IndexManifest(db_path)
+    ingestor = CorpusIngestor(TextProcessor(200, 40, "sentence"), embeddings, vector_db, manifest)
+    
+    def ingest(file_paths, collection_name="book_collection"):
+        return ingestor.ingest_collection(collection_name, [str(path) for path in file_paths])
+    
+    def write(name, text):
+        path = tmp_path / name
+        path.write_text(text, encoding="utf-8")
+        return str(path)
+    
+    return SimpleNamespace(ingest=ingest, write=write, vector_db=vector_db, manifest=manifest,
+                           embeddings=embeddings)
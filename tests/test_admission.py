@@ -0,0 +1,253 @@
+"""Kabul kontrolü: kuyruk, hızlı ret, IP sınırları ve paylaşılan akışın slotu"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from admission import AdmissionController, Overloaded
+from main import AgenticDemoChatbot
+from singleflight import SingleFlight
+
+
+def controller(**options):
+    options.setdefault('max_inflight', 1)
+    options.setdefault('max_queue', 2)
+    options.setdefault('queue_timeout', 1.0)
+    return AdmissionController(**options)
+
+
+async def hold(admission, client, release, positions=None):
+    """Slotu al ve release tetiklenene kadar tut"""
+    async def on_position(position, retry_after):
+        if positions is not None:
+            positions.append(position)
+    
+    async with admission.slot(client, on_position):
+        await release.wait()
+
+
+def test_queue_full_is_rejected_without_waiting():
+    async def scenario():
+        admission = controller(max_queue=1)
+        release = asyncio.Event()
+        holders = [asyncio.ensure_future(hold(admission, admission.connect(f"10.0.0.{i}"), release))
+                   for i in range(2)]
+        await asyncio.sleep(0.01)
+        
+        with pytest.raises(Overloaded) as rejected:
+            await hold(admission, admission.connect("10.0.0.9"), release)
+        release.set()
+        await asyncio.gather(*holders)
+        return admission, rejected.value
+    
+    admission, error = asyncio.run(scenario())
+    assert error.reason == 'queue_full'
+    assert error.retry_after >= 1
+    assert admission.stats()['rejected'] == {'queue_full': 1}
+    assert admission.stats()['inflight'] == 0
+
+
+def test_queue_timeout_leaves_the_queue():
+    async def scenario():
+        admission = controller(queue_timeout=0.05)
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(admission, admission.connect("10.0.0.1"), release))
+        await asyncio.sleep(0.01)
+        
+        with pytest.raises(Overloaded) as rejected:
+            await hold(admission, admission.connect("10.0.0.2"), release)
+        depth = admission.stats()['queue_depth']
+        release.set()
+        await holder
+        return admission, rejected.value, depth
+    
+    admission, error, depth = asyncio.run(scenario())
+    assert error.reason == 'queue_timeout'
+    assert depth == 0
+    assert admission.stats()['inflight'] == 0
+
+
+def test_slots_are_handed_over_in_fifo_order():
+    async def scenario():
+        admission = controller(max_queue=3)
+        order, positions = [], []
+        
+        async def ask(name, release):
+            async with admission.slot(admission.connect(name), lambda p, r: record(name, p)):
+                order.append(name)
+                await release.wait()
+        
+        async def record(name, position):
+            positions.append((name, position))
+        
+        releases = {name: asyncio.Event() for name in ("a", "b", "c")}
+        tasks = []
+        for name in ("a", "b", "c"):
+            tasks.append(asyncio.ensure_future(ask(name, releases[name])))
+            await asyncio.sleep(0.01)
+        for name in ("a", "b", "c"):
+            releases[name].set()
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*tasks)
+        return admission, order, positions
+    
+    admission, order, positions = asyncio.run(scenario())
+    assert order == ["a", "b", "c"]
+    assert ("b", 1) in positions and ("c", 2) in positions and ("c", 1) in positions
+    assert admission.stats()['queued'] == 2
+
+
+def test_per_ip_limits():
+    admission = controller(max_connections_per_ip=1, max_requests_per_ip=1)
+    client = admission.connect("10.0.0.1")
+    with pytest.raises(Overloaded) as rejected:
+        admission.connect("10.0.0.1")
+    assert rejected.value.reason == 'too_many_connections'
+    
+    admission.disconnect(client)
+    client = admission.connect("10.0.0.1")
+    
+    async def scenario():
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(admission, client, release))
+        await asyncio.sleep(0.01)
+        with pytest.raises(Overloaded) as second:
+            await hold(admission, client, release)
+        release.set()
+        await holder
+        return second.value
+    
+    assert asyncio.run(scenario()).reason == 'too_many_requests_per_ip'
+
+
+# --- paylaşılan akış ---
+
+def shared_chatbot(calls):
+    async def answer(question, use_cache=False, latency_budget=None):
+        calls.append(question)
+        for chunk in ("a", "b", "c"):
+            await asyncio.sleep(0.02)
+            yield chunk
+    return SimpleNamespace(singleflight=SingleFlight(), ask_question_agentic_stream_async=answer)
+
+
+def test_identical_questions_share_one_slot():
+    async def scenario():
+        admission, calls, inflight = controller(max_queue=0), [], []
+        chatbot = shared_chatbot(calls)
+        
+        async def ask(ip):
+            client = admission.connect(ip)
+            stream = AgenticDemoChatbot.ask_question_shared_stream_async(
+                chatbot, "Neolitik devrim nedir?", admit=lambda on_position: admission.slot(client, on_position)
+            )
+            chunks = []
+            async for chunk in stream:
+                inflight.append(admission.inflight)
+                chunks.append(chunk)
+            return chunks
+        
+        # Aynı anda başlayan kopyalar tek slotla yanıtlanır (kuyruk olmadan da reddedilmez)
+        results = await asyncio.gather(*(ask(f"10.0.0.{i}") for i in range(3)))
+        return admission, calls, inflight, results
+    
+    admission, calls, inflight, results = asyncio.run(scenario())
+    assert results == [["a", "b", "c"]] * 3
+    assert len(calls) == 1
+    # Upstream bittiğinde slot bırakılır; aboneler tampondaki son parçaları sonra okuyabilir
+    assert max(inflight) == 1
+    assert admission.stats()['inflight'] == 0
+    assert admission.stats()['admitted'] == 1
+
+
+def test_leader_slot_is_held_after_leader_leaves():
+    async def scenario():
+        admission, calls = controller(), []
+        chatbot = shared_chatbot(calls)
+        client = admission.connect("10.0.0.1")
+        
+        def ask():
+            return AgenticDemoChatbot.ask_question_shared_stream_async(
+                chatbot, "Neolitik devrim nedir?", admit=lambda on_position: admission.slot(client, on_position)
+            )
+        
+        leader = ask()
+        await leader.__anext__()
+        follower = asyncio.ensure_future(ask().__anext__())
+        await asyncio.sleep(0)
+        await leader.aclose()
+        held = admission.inflight
+        await follower
+        await asyncio.sleep(0.1)
+        return admission, held
+    
+    admission, held = asyncio.run(scenario())
+    assert held == 1
+    assert admission.stats()['inflight'] == 0
+
+
+def test_rejected_leader_rejects_joined_followers():
+    async def scenario():
+        admission, calls = controller(max_inflight=1, max_queue=0), []
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(admission, admission.connect("10.0.0.1"), release))
+        await asyncio.sleep(0.01)
+        
+        chatbot = shared_chatbot(calls)
+        client = admission.connect("10.0.0.2")
+        
+        async def ask():
+            stream = AgenticDemoChatbot.ask_question_shared_stream_async(
+                chatbot, "Neolitik devrim nedir?", admit=lambda on_position: admission.slot(client, on_position)
+            )
+            return [chunk async for chunk in stream]
+        
+        results = await asyncio.gather(ask(), ask(), return_exceptions=True)
+        release.set()
+        await holder
+        return calls, results
+    
+    calls, results = asyncio.run(scenario())
+    assert calls == []
+    assert all(isinstance(result, Overloaded) and result.reason == 'queue_full' for result in results)
+
+
+def test_queue_position_reaches_every_subscriber():
+    async def scenario():
+        admission, calls = controller(max_queue=2), []
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(admission, admission.connect("10.0.0.1"), release))
+        await asyncio.sleep(0.01)
+        
+        chatbot = shared_chatbot(calls)
+        client = admission.connect("10.0.0.2")
+        positions = {"leader": [], "follower": [], "late": []}
+        
+        async def ask(name):
+            async def on_position(position, retry_after):
+                positions[name].append(position)
+            
+            stream = AgenticDemoChatbot.ask_question_shared_stream_async(
+                chatbot, "Neolitik devrim nedir?",
+                admit=lambda on_position: admission.slot(client, on_position), on_position=on_position
+            )
+            return [chunk async for chunk in stream]
+        
+        leader = asyncio.ensure_future(ask("leader"))
+        follower = asyncio.ensure_future(ask("follower"))
+        await asyncio.sleep(0.01)
+        # Kuyrukta bekleyen akışa sonradan katılan da geçerli sırayı hemen alır
+        late = asyncio.ensure_future(ask("late"))
+        await asyncio.sleep(0.01)
+        queued = {name: list(received) for name, received in positions.items()}
+        
+        release.set()
+        results = await asyncio.gather(leader, follower, late)
+        await holder
+        return calls, queued, results
+    
+    calls, queued, results = asyncio.run(scenario())
+    assert queued == {"leader": [1], "follower": [1], "late": [1]}
+    assert results == [["a", "b", "c"]] * 3
+    assert len(calls) == 1
@@ -0,0 +1,102 @@
+"""Semantik yanıt önbelleği: eşik, TTL, LRU, korpus sürümü ve yalnızca tamamlanan yanıtların saklanması"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import answer_cache
+from answer_cache import SemanticAnswerCache
+from index_manifest import IndexManifest
+from main import AgenticDemoChatbot
+
+
+def rotated(similarity, dimensions=8):
+    """Birinci eksenle verilen kosinüs benzerliğine sahip birim vektör"""
+    vector = np.zeros(dimensions)
+    vector[0] = similarity
+    vector[1] = np.sqrt(1 - similarity ** 2)
+    return vector.tolist()
+
+
+def axis(index, dimensions=8):
+    vector = np.zeros(dimensions)
+    vector[index] = 1.0
+    return vector.tolist()
+
+
+def test_hit_above_threshold():
+    cache = SemanticAnswerCache(threshold=0.95)
+    cache.store("Neolitik devrim nedir?", axis(0), "yanıt", "BOOK_ONLY", "kitap")
+    
+    hit = cache.lookup(rotated(0.97))
+    assert hit['response'] == "yanıt"
+    assert hit['decision'] == "BOOK_ONLY"
+    assert hit['similarity'] == pytest.approx(0.97, abs=1e-5)
+    assert cache.stats()['hits'] == 1
+
+
+def test_miss_below_threshold():
+    cache = SemanticAnswerCache(threshold=0.95)
+    cache.store("Neolitik devrim nedir?", axis(0), "yanıt", "BOOK_ONLY")
+    
+    assert cache.lookup(rotated(0.93)) is None
+    assert cache.lookup(axis(1)) is None
+    assert cache.stats()['misses'] == 2
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(answer_cache.time, "time", lambda: now[0])
+    cache = SemanticAnswerCache(threshold=0.95, ttl_seconds=60)
+    cache.store("soru", axis(0), "yanıt", "BOOK_ONLY")
+    
+    now[0] += 59
+    assert cache.lookup(axis(0)) is not None
+    now[0] += 2
+    assert cache.lookup(axis(0)) is None
+    assert cache.stats()['expirations'] == 1
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticAnswerCache(threshold=0.95, max_entries=2)
+    cache.store("birinci", axis(0), "1", "BOOK_ONLY")
+    cache.store("ikinci", axis(1), "2", "BOOK_ONLY")
+    # Birinci kullanıldı: en eski kullanılan ikinci olur
+    assert cache.lookup(axis(0))['response'] == "1"
+    cache.store("üçüncü", axis(2), "3", "BOOK_ONLY")
+    
+    assert cache.lookup(axis(1)) is None
+    assert cache.lookup(axis(0))['response'] == "1"
+    assert cache.lookup(axis(2))['response'] == "3"
+    assert cache.stats()['evictions'] == 1
+
+
+def test_manifest_change_invalidates_cache(tmp_path):
+    manifest = IndexManifest(str(tmp_path))
+    cache = SemanticAnswerCache(threshold=0.95)
+    cache.store("soru", axis(0), "eski yanıt", "BOOK_ONLY", corpus_version=manifest.fingerprint())
+    assert cache.lookup(axis(0), manifest.fingerprint()) is not None
+    
+    manifest.set_entry("book_collection", {"files": {"kitap.txt": {"sha256": "yeni", "ids": []}}})
+    assert cache.lookup(axis(0), manifest.fingerprint()) is None
+    assert cache.stats()['invalidations'] == 1
+    assert cache.stats()['entries'] == 0
+
+
+@pytest.mark.parametrize("trace,stored", [
+    ({'complete': True, 'decision': 'BOOK_ONLY', 'source_info': 'kitap'}, True),
+    ({}, False),
+    ({'degraded': True}, False),
+    ({'degraded': True, 'retrieval_failed': True, 'decision': 'BOOK_ONLY', 'source_info': ''}, False),
+    ({'complete': True, 'degraded': True, 'decision': 'BOOK_ONLY', 'source_info': ''}, False),
+])
+def test_only_complete_answers_are_stored(tmp_path, trace, stored):
+    chatbot = SimpleNamespace(
+        answer_cache=SemanticAnswerCache(threshold=0.95),
+        embedding_generator=SimpleNamespace(generate_single_embedding=lambda question: axis(0)),
+        manifest=IndexManifest(str(tmp_path)),
+    )
+    AgenticDemoChatbot._remember_answer(chatbot, "Neolitik devrim nedir?", "yanıt", trace)
+    assert (chatbot.answer_cache.stats()['entries'] == 1) == stored
@@ -0,0 +1,123 @@
+"""Bağlam oluşturma: komşu chunk'ların örtüşmesiz birleştirilmesi, sıralama ve token bütçesi"""
+
+import pytest
+
+from context_builder import ContextBuilder, _strip_overlap, estimate_tokens
+from text_processor import TextProcessor
+
+TEXT = (
+    "Neolitik devrim, avcı toplayıcı toplulukların yerleşik tarıma geçişidir. "
+    "Buğday ve arpa ilk kez Bereketli Hilal'de ekildi; keçi ve koyun evcilleştirildi.\n\n"
+    "Çatalhöyük'te evler birbirine bitişikti ve girişler çatıdandı. "
+    "Duvar resimleri, boğa başları ve mezarlar ölüm inancını gösterir.\n\n"
+    "Göbeklitepe tarımdan önce yapılmış anıtsal bir tapınaktır; dikilitaşlarda tilki, "
+    "yaban domuzu ve akrep kabartmaları vardır. Çömlekçilik daha sonra yaygınlaştı.\n"
+)
+
+
+def result(chunks, distances=None, offsets=True, source="kitap.txt"):
+    """(chunk_index, metin, başlangıç_byte, bitiş_byte) listesinden arama sonucu"""
+    metadatas = []
+    for chunk_index, _, start_byte, end_byte in chunks:
+        metadata = {"source": source, "chunk_index": chunk_index}
+        if offsets:
+            metadata.update(start_byte=start_byte, end_byte=end_byte)
+        metadatas.append(metadata)
+    return {
+        "documents": [text for _, text, _, _ in chunks],
+        "metadatas": metadatas,
+        "distances": distances if distances is not None else [0.1 * (i + 1) for i in range(len(chunks))],
+    }
+
+
+def file_chunks(tmp_path, text=TEXT, chunk_size=120, chunk_overlap=30, mode="sentence"):
+    path = tmp_path / "kitap.txt"
+    path.write_text(text, encoding="utf-8")
+    processor = TextProcessor(chunk_size, chunk_overlap, mode)
+    return [(index, chunk, start, end) for index, (chunk, start, end)
+            in enumerate(processor.iter_file_chunks(str(path)))]
+
+
+@pytest.mark.parametrize("mode", ["compat", "sentence"])
+@pytest.mark.parametrize("offsets", [True, False])
+def test_merged_file_chunks_rebuild_original_text(tmp_path, mode, offsets):
+    chunks = file_chunks(tmp_path, mode=mode)
+    assert len(chunks) > 3
+    # Sıra karışık gelse de tek segmentte ve örtüşmesiz birleşir
+    context, report = ContextBuilder(0).build([("book", result(chunks[::-1], offsets=offsets))])
+    
+    assert context == TEXT.strip()
+    assert report["segments"] == 1
+    assert report["context_tokens"] < report["naive_tokens"]
+
+
+def test_overlap_is_stripped_by_byte_offsets():
+    chunks = [(0, "bir iki üç", 0, 13), (1, "üç dört", 9, 17)]
+    context, _ = ContextBuilder(0).build([("book", result(chunks))])
+    assert context == "bir iki üç dört"
+
+
+def test_chunk_inside_segment_is_skipped():
+    chunks = [(0, "bir iki üç dört", 0, 18), (1, "iki üç", 4, 12)]
+    context, report = ContextBuilder(0).build([("book", result(chunks))])
+    assert context == "bir iki üç dört"
+    assert report["segments"] == 1
+
+
+def test_overlap_is_stripped_from_text_without_offsets():
+    assert _strip_overlap("bir iki üç dört", "iki üç dört beş") == " beş"
+    assert _strip_overlap("bir iki üç dört", "üç dört") == ""
+    # Kısa, tesadüfi eşleşmeler örtüşme sayılmaz
+    assert _strip_overlap("bir iki üç dört", "ört beş altı yedi") == "ört beş altı yedi"
+    
+    chunks = [(0, "bir iki üç dört", None, None), (1, "iki üç dört beş", None, None),
+              (2, "altı yedi", None, None)]
+    context, _ = ContextBuilder(0).build([("book", result(chunks, offsets=False))])
+    # Örtüşme yoksa chunk'lar boşlukla eklenir
+    assert context == "bir iki üç dört beş altı yedi"
+
+
+def test_distant_chunks_and_sources_stay_separate():
+    chunks = [(0, "bir", 0, 3), (5, "altı", 40, 45)]
+    _, report = ContextBuilder(0).build([
+        ("book", result(chunks)),
+        ("book", result([(1, "iki", 4, 7)], source="diger.txt")),
+    ])
+    assert report["segments"] == 3
+
+
+def test_segments_are_ordered_by_distance():
+    chunks = [(0, "uzak", 0, 4), (4, "yakın", 30, 36), (8, "orta", 60, 64)]
+    context, _ = ContextBuilder(0).build([("book", result(chunks, distances=[0.9, 0.1, 0.5]))])
+    assert context.split("\n\n") == ["yakın", "orta", "uzak"]
+
+
+def test_merged_segment_takes_best_distance():
+    chunks = [(0, "bir", 0, 3), (1, "iki", 4, 7), (8, "orta", 60, 64)]
+    context, _ = ContextBuilder(0).build([("book", result(chunks, distances=[0.9, 0.1, 0.5]))])
+    assert context.split("\n\n") == ["bir iki", "orta"]
+
+
+def test_budget_drops_least_relevant_segments():
+    chunks = [(0, "bir iki üç dört", 0, 18), (4, "beş altı", 40, 49), (8, "yedi sekiz dokuz", 80, 97)]
+    context, report = ContextBuilder(6).build([("book", result(chunks, distances=[0.1, 0.2, 0.3]))])
+    assert context == "bir iki üç dört\n\nbeş altı"
+    assert report["context_tokens"] == estimate_tokens(context) <= 6
+    assert report["dropped_segments"] == 1
+    assert report["saved_tokens"] == report["naive_tokens"] - report["context_tokens"]
+
+
+def test_first_segment_is_truncated_to_the_budget():
+    words = " ".join(f"kelime{i}" for i in range(50))
+    context, report = ContextBuilder(20).build([("book", result([(0, words, 0, len(words))]))])
+    assert words.startswith(context)
+    assert 0 < report["context_tokens"] == estimate_tokens(context) <= 20
+    # Bir kelime daha eklenince bütçe aşılır
+    assert estimate_tokens(words[:len(context)] + " " + words.split(" ")[len(context.split(" "))]) > 20
+
+
+def test_truncate_keeps_word_boundaries():
+    builder = ContextBuilder(0)
+    assert builder._truncate("bir iki üç dört", 2) == "bir iki"
+    assert builder._truncate("bir iki", 0) == ""
+    assert builder._truncate("bir iki", 100) == "bir iki"
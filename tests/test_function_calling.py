@@ -0,0 +1,61 @@
+"""Native function calling modu: ilk turun metni ve çağrı sayaçları"""
+
+import asyncio
+
+from fake_llm_backend import TOOL_PREAMBLE, FakeLLMBackend, stable_hash
+from gemini_chatbot import AgenticGeminiChatbot
+
+QUESTIONS = [f"Neolitik dönemde {topic} nasıl değişti?" for topic in
+             ("mülkiyet", "tarım", "din", "savaş", "aile", "ticaret", "yerleşim", "sanat")]
+
+
+def make_agent():
+    backend = FakeLLMBackend(latency="const:0", tokens_per_second=1e6, embed_latency="const:0",
+                             response_tokens=24, seed=0)
+    agent = AgenticGeminiChatbot(backend)
+    agent.agent_mode = "function_calling"
+    for name in ("search_transcript", "search_book"):
+        def search(query, source=name):
+            return {'documents': [f"{query} hakkında not"], 'source': source}
+        agent.register_tool(name, search, name)
+    return agent, backend
+
+
+def question_with_calls(backend, wanted):
+    """Sahte backend'in araç çağırdığı (wanted=True) veya çağırmadığı bir soru"""
+    return next(q for q in QUESTIONS if (stable_hash(q, backend.seed) % 3 != 0) == wanted)
+
+
+def test_first_turn_text_dropped_when_tools_are_called():
+    agent, backend = make_agent()
+    trace = {}
+    answer = "".join(agent.decide_and_respond_stream(question_with_calls(backend, True), trace))
+    
+    assert TOOL_PREAMBLE.strip() not in answer
+    assert answer
+    assert trace['tool_calls'] >= 1
+    assert trace['model_calls'] == 2
+    assert trace['complete']
+
+
+def test_first_turn_text_is_the_answer_without_tool_calls():
+    agent, backend = make_agent()
+    trace = {}
+    chunks = list(agent.decide_and_respond_stream(question_with_calls(backend, False), trace))
+    
+    assert chunks
+    assert trace['tool_calls'] == 0
+    assert trace['model_calls'] == 1
+
+
+def test_async_stream_drops_first_turn_text():
+    agent, backend = make_agent()
+    trace = {}
+    
+    async def collect():
+        return [chunk async for chunk in agent.decide_and_respond_stream_async(
+            question_with_calls(backend, True), trace)]
+    
+    answer = "".join(asyncio.run(collect()))
+    assert TOOL_PREAMBLE.strip() not in answer
+    assert trace['tool_calls'] >= 1
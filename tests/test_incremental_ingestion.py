@@ -0,0 +1,151 @@
+"""Artımlı ingestion: değişmeyen chunk'lar yeniden embed edilmez, silinenler kaldırılır"""
+
+import json
+
+from index_manifest import MANIFEST_FILE_NAME, ChunkIdAssigner, IndexManifest
+
+WORDS = ("tarım köy çömlek buğday avcı toplayıcı yerleşim mülkiyet tapınak sulama kanal "
+         "hayvan evcil arpa keçi koyun değirmen ocak duvar mezar").split()
+
+
+def paragraphs(count, seed=1):
+    return [" ".join(WORDS[(seed + index * 7 + word) % len(WORDS)] for word in range(30)) + f" {seed}-{index}."
+            for index in range(count)]
+
+
+def book(parts):
+    return "\n\n".join(parts) + "\n"
+
+
+def stored_ids(ingestion, path):
+    return ingestion.manifest.get_entry("book_collection")["files"][path]["ids"]
+
+
+def test_chunk_ids_are_content_addressed():
+    first = ChunkIdAssigner("kitap.txt", 200, 40, "model")
+    second = ChunkIdAssigner("kitap.txt", 200, 40, "model")
+    ids = [first.assign(chunk) for chunk in ("a", "b", "a", "a")]
+    
+    assert ids == [second.assign(chunk) for chunk in ("a", "b", "a", "a")]
+    assert ids == IndexManifest.make_chunk_ids("kitap.txt", ["a", "b", "a", "a"], 200, 40, "model")
+    # Aynı dosyada tekrar eden metin sıra numarası alır
+    assert ids[2:] == [f"{ids[0]}-1", f"{ids[0]}-2"]
+    assert len(set(ids)) == 4
+    # Kaynak, chunk ayarları veya model değişince ID de değişir
+    assert ChunkIdAssigner("diger.txt", 200, 40, "model").assign("a") != ids[0]
+    assert ChunkIdAssigner("kitap.txt", 300, 40, "model").assign("a") != ids[0]
+    assert ChunkIdAssigner("kitap.txt", 200, 40, "başka-model").assign("a") != ids[0]
+
+
+def test_manifest_round_trip(tmp_path):
+    manifest = IndexManifest(str(tmp_path))
+    params = {"chunk_size": 200, "embedding_model": "model"}
+    entry = dict(params, files={"kitap.txt": {"sha256": "abc", "ids": ["1", "2"], "duplicates": {}}})
+    manifest.set_entry("book_collection", entry)
+    manifest.save()
+    
+    reopened = IndexManifest(str(tmp_path))
+    assert reopened.get_entry("book_collection") == entry
+    assert reopened.fingerprint() == manifest.fingerprint()
+    assert IndexManifest.is_unchanged(reopened.get_entry("book_collection"), params)
+    assert not IndexManifest.is_unchanged(reopened.get_entry("book_collection"), dict(params, chunk_size=300))
+    assert not IndexManifest.is_unchanged(reopened.get_entry("yok"), params)
+
+
+def test_unreadable_or_old_manifest_is_ignored(tmp_path):
+    path = tmp_path / MANIFEST_FILE_NAME
+    path.write_text("{bozuk", encoding="utf-8")
+    assert IndexManifest(str(tmp_path)).data["collections"] == {}
+    
+    path.write_text(json.dumps({"version": 0, "collections": {"book_collection": {}}}), encoding="utf-8")
+    assert IndexManifest(str(tmp_path)).get_entry("book_collection") is None
+
+
+def test_unchanged_corpus_is_a_no_op(ingestion, capsys):
+    paths = [ingestion.write("a.txt", book(paragraphs(6))), ingestion.write("b.txt", book(paragraphs(4, seed=2)))]
+    collection = ingestion.ingest(paths)
+    count = ingestion.vector_db.count(collection)
+    assert len(ingestion.embeddings.embedded) == count > 0
+    
+    ingestion.embeddings.embedded.clear()
+    capsys.readouterr()
+    ingestion.ingest(paths)
+    assert ingestion.embeddings.embedded == []
+    assert "Değişiklik yok" in capsys.readouterr().out
+    assert ingestion.vector_db.count(collection) == count
+
+
+def test_edited_file_embeds_only_its_new_chunks(ingestion):
+    parts = paragraphs(8)
+    paths = [ingestion.write("a.txt", book(parts)), ingestion.write("b.txt", book(paragraphs(4, seed=2)))]
+    collection = ingestion.ingest(paths)
+    before = set(collection.state.documents)
+    untouched = stored_ids(ingestion, paths[1])
+    
+    ingestion.embeddings.embedded.clear()
+    parts[4] = paragraphs(1, seed=5)[0]
+    ingestion.write("a.txt", book(parts))
+    collection = ingestion.ingest(paths)
+    
+    embedded = ingestion.embeddings.embedded
+    assert embedded
+    assert all(chunk not in before for chunk in embedded)
+    assert any(parts[4][:40] in chunk for chunk in embedded)
+    assert len(embedded) < len(stored_ids(ingestion, paths[0]))
+    assert stored_ids(ingestion, paths[1]) == untouched
+    assert set(collection.state.ids) == set(stored_ids(ingestion, paths[0])) | set(untouched)
+
+
+def test_vanished_chunks_and_files_are_deleted(ingestion):
+    parts = paragraphs(8)
+    paths = [ingestion.write("a.txt", book(parts)), ingestion.write("b.txt", book(paragraphs(4, seed=2)))]
+    ingestion.ingest(paths)
+    old_ids = set(stored_ids(ingestion, paths[0]))
+    removed_file_ids = set(stored_ids(ingestion, paths[1]))
+    
+    ingestion.embeddings.embedded.clear()
+    ingestion.write("a.txt", book(parts[:5]))
+    collection = ingestion.ingest(paths[:1])
+    
+    ids = set(collection.state.ids)
+    vanished = old_ids - set(stored_ids(ingestion, paths[0]))
+    assert vanished
+    assert not ids & vanished
+    assert not ids & removed_file_ids
+    assert ids == set(stored_ids(ingestion, paths[0]))
+    assert paths[1] not in ingestion.manifest.get_entry("book_collection")["files"]
+
+
+def spy_metadata_updates(ingestion, monkeypatch):
+    """vector_db.update_metadatas çağrılarına giden ID'leri kaydet"""
+    updated = []
+    update = ingestion.vector_db.update_metadatas
+    
+    def record(collection, ids, metadatas):
+        updated.extend(ids)
+        return update(collection, ids, metadatas)
+    
+    monkeypatch.setattr(ingestion.vector_db, "update_metadatas", record)
+    return updated
+
+
+def test_unmoved_chunks_are_not_rewritten(ingestion, monkeypatch):
+    parts = paragraphs(8)
+    path = ingestion.write("kitap.txt", book(parts))
+    ingestion.ingest([path])
+    updated = spy_metadata_updates(ingestion, monkeypatch)
+    
+    # Sona eklenen paragraf önceki chunk'ların yerini değiştirmez
+    ingestion.write("kitap.txt", book(parts + paragraphs(1, seed=2)))
+    ingestion.ingest([path])
+    assert updated == []
+    
+    # Başa eklenen paragraf tüm bayt aralıklarını kaydırır
+    ingestion.write("kitap.txt", book(paragraphs(1, seed=3) + parts + paragraphs(1, seed=2)))
+    collection = ingestion.ingest([path])
+    assert updated
+    stored = dict(zip(collection.state.ids, collection.state.metadatas))
+    text = open(path, encoding="utf-8").read().encode("utf-8")
+    for doc_id, document in zip(collection.state.ids, collection.state.documents):
+        metadata = stored[doc_id]
+        assert text[metadata["start_byte"]:metadata["end_byte"]].decode("utf-8") == document
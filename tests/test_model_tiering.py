@@ -0,0 +1,59 @@
+"""Gecikme bütçesine göre model katmanı seçimi"""
+
+from model_tiering import ModelTierPolicy
+
+MODELS = {'fast': "hizli-model", 'large': "buyuk-model"}
+LONG_QUESTION = "Neolitik devrim sonrası mülkiyet anlayışı ve toplumsal yapı nasıl değişti?"
+
+
+def budget_policy(**options):
+    options.setdefault('probe_seconds', 0)
+    return ModelTierPolicy(MODELS, budget_seconds=4.0, short_question_words=6, mode="budget",
+                           min_samples=3, **options)
+
+
+def observe_large(policy, first_token, total, times=3):
+    choice = {'tier': 'large', 'budget_s': 4.0}
+    for _ in range(times):
+        policy.observe(choice, first_token, total, first_token)
+
+
+def test_default_mode_is_large():
+    policy = ModelTierPolicy(MODELS, budget_seconds=4.0, short_question_words=6)
+    choice = policy.choose("Kısa soru?", 'BOOK_ONLY')
+    assert choice['tier'] == 'large'
+    assert choice['reason'] == 'sabit katman'
+
+
+def test_short_confident_question_goes_fast():
+    assert budget_policy().choose("Neolitik devrim nedir?", 'BOOK_ONLY')['tier'] == 'fast'
+    assert budget_policy().choose("Neolitik devrim nedir?", 'BOTH_SOURCES')['tier'] == 'large'
+
+
+def test_prediction_uses_first_token_not_total_stream_time():
+    policy = budget_policy()
+    # Uzun yanıtlar toplamda bütçeyi aşar ama ilk parça hızlı gelir
+    observe_large(policy, first_token=1.0, total=12.0)
+    
+    choice = policy.choose(LONG_QUESTION, 'BOTH_SOURCES', elapsed=1.5)
+    assert choice['tier'] == 'large'
+    assert choice['predicted_s'] == 2.5
+
+
+def test_slow_first_token_falls_back_to_fast():
+    policy = budget_policy()
+    observe_large(policy, first_token=3.5, total=5.0)
+    
+    choice = policy.choose(LONG_QUESTION, 'BOTH_SOURCES', elapsed=1.0)
+    assert choice['tier'] == 'fast'
+    assert choice['reason'] == 'bütçe yetersiz'
+    # İstek başına bütçe varsayılanı geçersiz kılar
+    assert policy.choose(LONG_QUESTION, 'BOTH_SOURCES', elapsed=1.0, budget=6.0)['tier'] == 'large'
+
+
+def test_call_without_first_token_counts_its_total_time():
+    policy = budget_policy()
+    observe_large(policy, first_token=None, total=10.0)
+    
+    assert policy.choose(LONG_QUESTION, 'BOTH_SOURCES')['tier'] == 'fast'
+    assert not any(item['within_budget'] for item in policy.stats()['recent'])
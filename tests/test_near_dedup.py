@@ -0,0 +1,81 @@
+"""Near-duplicate chunk'ların ingestion sırasında elenmesi ve komşu eşlemesi"""
+
+import random
+
+from config import Config
+from context_builder import ContextBuilder
+
+WORDS = ("tarım köy çömlek buğday avcı toplayıcı yerleşim mülkiyet tapınak sulama kanal "
+         "hayvan evcil arpa keçi koyun değirmen ocak duvar mezar").split()
+
+
+def paragraphs(count, seed=1):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(40)) + "." for _ in range(count)]
+
+
+def repeated_text():
+    """İlk üç paragraf metnin ortasında aynen tekrar eder"""
+    parts = paragraphs(10)
+    return "\n\n".join(parts[:6] + parts[:3] + parts[6:]) + "\n"
+
+
+def stored(ingestion, collection):
+    """Koleksiyondaki chunk'lar: chunk_index -> (ID, metadata)"""
+    state = collection.state
+    return {metadata["chunk_index"]: (doc_id, metadata) for doc_id, metadata in zip(state.ids, state.metadatas)}
+
+
+def test_repeated_paragraph_is_dropped_and_mapped(ingestion, monkeypatch, capsys):
+    monkeypatch.setattr(Config, "DEDUP_THRESHOLD", 0.9)
+    path = ingestion.write("kitap.txt", repeated_text())
+    collection = ingestion.ingest([path])
+    
+    file_state = ingestion.manifest.get_entry("book_collection")["files"][path]
+    duplicates = {int(index): kept for index, kept in file_state["duplicates"].items()}
+    chunks = stored(ingestion, collection)
+    assert duplicates
+    assert f"🧹 {len(duplicates)} near-duplicate chunk" in capsys.readouterr().out
+    
+    # Elenen chunk'lar numaralandırmada boşluk bırakır, geri kalanlar saklanır
+    assert not set(duplicates) & set(chunks)
+    assert set(duplicates) | set(chunks) == set(range(max(chunks) + 1))
+    assert max(duplicates) < max(chunks)
+    assert ingestion.vector_db.count(collection) == len(file_state["ids"]) == len(chunks)
+    
+    # Eşleme, tutulan ve saklanan bir chunk'a işaret eder
+    kept_ids = {doc_id for doc_id, _ in chunks.values()}
+    for chunk_index, kept in duplicates.items():
+        assert kept in kept_ids
+        assert ingestion.manifest.duplicate_of(path, chunk_index) == kept
+    assert ingestion.manifest.duplicate_of(path, min(chunks)) is None
+
+
+def test_dedup_is_off_by_default(ingestion):
+    path = ingestion.write("kitap.txt", repeated_text())
+    collection = ingestion.ingest([path])
+    
+    assert ingestion.manifest.get_entry("book_collection")["files"][path]["duplicates"] == {}
+    chunks = stored(ingestion, collection)
+    assert set(chunks) == set(range(len(chunks)))
+
+
+def test_context_bridges_dropped_chunks(ingestion, monkeypatch):
+    monkeypatch.setattr(Config, "DEDUP_THRESHOLD", 0.9)
+    path = ingestion.write("kitap.txt", repeated_text())
+    collection = ingestion.ingest([path])
+    duplicates = sorted(int(index) for index in ingestion.manifest.get_entry("book_collection")["files"][path]["duplicates"])
+    chunks = stored(ingestion, collection)
+    documents = dict(zip(collection.state.ids, collection.state.documents))
+    
+    # Elenen ilk chunk'ın iki yanındaki saklanan chunk'lar
+    before = max(index for index in chunks if index < duplicates[0])
+    after = min(index for index in chunks if index > duplicates[0])
+    hits = [(chunks[index][0], chunks[index][1]) for index in (before, after)]
+    result = {'documents': [documents[doc_id] for doc_id, _ in hits], 'metadatas': [m for _, m in hits],
+              'distances': [0.1, 0.2]}
+    
+    _, report = ContextBuilder(0).build([('book', result)])
+    assert report['segments'] == 2
+    _, report = ContextBuilder(0, ingestion.manifest.duplicate_of).build([('book', result)])
+    assert report['segments'] == 1
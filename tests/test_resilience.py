@@ -0,0 +1,227 @@
+"""Süre sınırları, hedged istekler, devre kesici ve model / arama kullanılamadığında agent davranışı"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from config import Config
+from fake_llm_backend import FakeLLMBackend
+from gemini_chatbot import AgenticGeminiChatbot
+from main import RetrievalCoordinator
+from resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, ResilientBackend, UpstreamUnavailable
+
+DECISION_PROMPT = 'Seç: "TRANSCRIPT_ONLY" veya "BOOK_ONLY"'
+
+
+def fake_backend(latency="const:0", error_rate=0.0):
+    return FakeLLMBackend(latency=latency, tokens_per_second=1e6, embed_latency="const:0",
+                          response_tokens=16, seed=0, spike_rate=0.0, error_rate=error_rate)
+
+
+def resilient(inner, breaker_threshold=2, reset_seconds=0.1):
+    backend = ResilientBackend(inner)
+    backend.hedging = False
+    backend.breakers = {kind: CircuitBreaker(kind, breaker_threshold, reset_seconds)
+                        for kind in ('generation', 'embedding')}
+    return backend
+
+
+# --- devre kesici ---
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=60)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == 'closed'
+    
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.stats()['rejected'] == 1
+    assert breaker.stats()['opens'] == 1
+
+
+def test_breaker_success_resets_failure_count():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+
+
+def test_breaker_half_open_allows_single_trial():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    time.sleep(0.06)
+    
+    breaker.before_call()
+    assert breaker.state == 'half_open'
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    breaker.before_call()
+
+
+def test_breaker_failed_trial_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert breaker.stats()['opens'] == 2
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_backend_breaker_transitions_with_fake_errors():
+    inner = fake_backend(error_rate=1.0)
+    backend = resilient(inner, breaker_threshold=2, reset_seconds=0.1)
+    for _ in range(2):
+        with pytest.raises(UpstreamUnavailable):
+            backend.generate("model", DECISION_PROMPT, stage='decision')
+    assert backend.breakers['generation'].state == 'open'
+    
+    # Açık devre çağrıyı backend'e göndermeden reddeder
+    with pytest.raises(CircuitOpenError):
+        backend.generate("model", DECISION_PROMPT, stage='decision')
+    assert backend.stats()['stages']['decision']['errors'] == 2
+    
+    time.sleep(0.12)
+    inner.error_rate = 0.0
+    assert backend.generate("model", DECISION_PROMPT, stage='decision').text
+    assert backend.breakers['generation'].state == 'closed'
+
+
+# --- süre sınırları ---
+
+def test_decision_deadline_expires():
+    backend = resilient(fake_backend(latency="const:500"))
+    backend.deadlines['decision'] = 0.05
+    started = time.monotonic()
+    with pytest.raises(UpstreamUnavailable):
+        backend.generate("model", DECISION_PROMPT, stage='decision')
+    assert time.monotonic() - started < 0.4
+    counters = backend.stats()['stages']['decision']
+    assert counters['timeouts'] + counters['errors'] == 1
+
+
+def test_stream_first_token_deadline_expires():
+    backend = resilient(fake_backend(latency="const:500"))
+    backend.first_token_timeout = 0.05
+    with pytest.raises(DeadlineExceeded):
+        list(backend.generate_stream("model", "Merhaba dünya nasılsın"))
+    assert backend.stats()['stages']['answer']['timeouts'] == 1
+
+
+# --- hedged istekler ---
+
+def test_slow_decision_is_hedged_after_warmup():
+    backend = resilient(fake_backend(latency="const:150"))
+    backend.hedging = True
+    backend.hedge_min_samples = 5
+    backend.hedge_min_delay = 0.02
+    backend.hedge_max_rate = 1.0
+    for _ in range(5):
+        backend.latencies['decision'].add(0.02)
+    
+    assert backend.generate("model", DECISION_PROMPT, stage='decision').text
+    assert backend.stats()['stages']['decision']['hedged'] == 1
+
+
+def test_no_hedge_before_enough_samples():
+    backend = resilient(fake_backend(latency="const:50"))
+    backend.hedging = True
+    backend.hedge_min_samples = 5
+    backend.hedge_max_rate = 1.0
+    backend.generate("model", DECISION_PROMPT, stage='decision')
+    assert backend.stats()['stages']['decision']['hedged'] == 0
+
+
+# --- agent ---
+
+class FixedDecision:
+    """Karar modeli yerine sabit karar veya hata döndüren nesne"""
+    
+    def __init__(self, text=None, error=None):
+        self.text = text
+        self.error = error
+    
+    def generate_content(self, prompt, **options):
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(text=self.text)
+    
+    async def generate_content_async(self, prompt, **options):
+        return self.generate_content(prompt, **options)
+
+
+def make_agent(decision_model, retriever):
+    agent = AgenticGeminiChatbot(fake_backend())
+    agent.agent_mode = "decision"
+    agent.decision_model = decision_model
+    agent.set_retriever(retriever)
+    return agent
+
+
+def found(query, sources):
+    return {'results': [(source, {'documents': [f"{query} notu"], 'source': source}) for source in sources],
+            'timings': {}}
+
+
+def test_failed_decision_call_is_counted():
+    agent = make_agent(FixedDecision(error=UpstreamUnavailable("karar yok")), found)
+    trace = {}
+    answer = "".join(agent.decide_and_respond_stream("Neolitik devrim nedir?", trace))
+    
+    assert answer
+    assert trace['decision'] == 'BOTH_SOURCES'
+    assert trace['model_calls'] == 2
+    assert trace['complete']
+
+
+def test_failed_retrieval_answer_is_not_complete():
+    def failing(query, sources):
+        return {'results': [(source, {'documents': [], 'source': source, 'failed': True}) for source in sources],
+                'timings': {}}
+    
+    agent = make_agent(FixedDecision(text="BOOK_ONLY"), failing)
+    trace = {}
+    "".join(agent.decide_and_respond_stream("Neolitik devrim nedir?", trace))
+    
+    assert not trace.get('complete')
+    assert trace['degraded'] and trace['retrieval_failed']
+    assert agent.call_stats()['retrieval_failed'] == 1
+
+
+def test_retrieval_timeout_answer_is_not_complete(monkeypatch):
+    monkeypatch.setattr(Config, "RETRIEVAL_TIMEOUT", 0.05)
+    
+    def slow(query, sources):
+        time.sleep(0.3)
+        return found(query, sources)
+    
+    agent = make_agent(FixedDecision(text="BOTH_SOURCES"), slow)
+    trace = {}
+    "".join(agent.decide_and_respond_stream("Neolitik devrim nedir?", trace))
+    
+    assert not trace.get('complete')
+    assert trace['retrieval_failed']
+    assert agent.speculation_stats()['discarded_runs'] == 1
+
+
+def test_retrieval_marks_sources_failed_without_embedding():
+    embedder = SimpleNamespace(generate_single_embedding=lambda query: [])
+    retriever = RetrievalCoordinator(embedder, vector_db=None)
+    retriever.set_collection('book', object())
+    
+    results = dict(retriever.retrieve("soru", ['transcript', 'book'])['results'])
+    assert results['book']['failed']
+    assert not results['transcript'].get('failed')
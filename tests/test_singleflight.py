@@ -0,0 +1,163 @@
+"""Aynı anda sorulan aynı soruların tek upstream akışında birleştirilmesi"""
+
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight, normalize_question
+
+
+def counting_factory(chunks, calls, delay=0.01):
+    """Her çağrıyı sayan, parçaları aralıklarla veren upstream"""
+    async def upstream():
+        calls.append(1)
+        for chunk in chunks:
+            await asyncio.sleep(delay)
+            yield chunk
+    return upstream
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+def test_normalize_question_ignores_case_punctuation_and_spacing():
+    assert normalize_question("  Neolitik  Devrim nedir?") == normalize_question("neolitik devrim NEDİR")
+
+
+def test_concurrent_identical_questions_share_one_upstream():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+        factory = counting_factory(["a", "b", "c"], calls)
+        results = await asyncio.gather(*(collect(flight.stream("soru", factory)) for _ in range(5)))
+        return flight, calls, results
+    
+    flight, calls, results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert results == [["a", "b", "c"]] * 5
+    stats = flight.stats()
+    assert stats["upstream_calls"] == 1
+    assert stats["saved_upstream_calls"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_late_joiner_replays_buffered_chunks():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+        factory = counting_factory(["a", "b", "c", "d"], calls, delay=0.02)
+        leader = asyncio.ensure_future(collect(flight.stream("soru", factory)))
+        await asyncio.sleep(0.05)
+        follower = await collect(flight.stream("soru", factory))
+        return flight, calls, await leader, follower
+    
+    flight, calls, leader, follower = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert leader == follower == ["a", "b", "c", "d"]
+    assert flight.stats()["late_joiners"] == 1
+    assert flight.stats()["replayed_chunks"] >= 1
+
+
+def test_finished_flight_releases_key():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+        factory = counting_factory(["a"], calls)
+        await collect(flight.stream("soru", factory))
+        await collect(flight.stream("soru", factory))
+        return calls
+    
+    assert len(asyncio.run(scenario())) == 2
+
+
+def test_upstream_error_reaches_every_subscriber():
+    async def failing():
+        yield "a"
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream hatası")
+    
+    async def scenario():
+        flight = SingleFlight()
+        return await asyncio.gather(*(collect(flight.stream("soru", failing)) for _ in range(3)),
+                                    return_exceptions=True)
+    
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_upstream_cancelled_when_last_subscriber_leaves():
+    cancelled = []
+    
+    async def endless():
+        try:
+            while True:
+                await asyncio.sleep(0.01)
+                yield "x"
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+    
+    async def scenario():
+        flight = SingleFlight()
+        stream = flight.stream("soru", endless)
+        assert await stream.__anext__() == "x"
+        await stream.aclose()
+        await asyncio.sleep(0.05)
+        return flight
+    
+    flight = asyncio.run(scenario())
+    assert cancelled == [1]
+    assert flight.stats()["abandoned_upstreams"] == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+@pytest.mark.parametrize("subscribers", [1, 3])
+def test_subscriber_leaving_early_does_not_stop_others(subscribers):
+    async def scenario():
+        flight, calls = SingleFlight(), []
+        factory = counting_factory(["a", "b", "c"], calls)
+        quitter = flight.stream("soru", factory)
+        await quitter.__anext__()
+        others = [asyncio.ensure_future(collect(flight.stream("soru", factory))) for _ in range(subscribers)]
+        await asyncio.sleep(0)
+        await quitter.aclose()
+        return calls, await asyncio.gather(*others)
+    
+    calls, results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert results == [["a", "b", "c"]] * subscribers
+
+
+def test_status_is_published_to_all_subscribers():
+    async def scenario():
+        flight, started, cleared = SingleFlight(), asyncio.Event(), asyncio.Event()
+        received = {"first": [], "second": [], "late": [], "admitted": []}
+        
+        async def upstream():
+            await flight.publish("soru", 2, 10)
+            started.set()
+            await asyncio.sleep(0.02)
+            await flight.publish("soru", 1, 5)
+            await asyncio.sleep(0.02)
+            await flight.publish("soru")
+            cleared.set()
+            await asyncio.sleep(0.02)
+            yield "a"
+        
+        def listener(name):
+            async def on_status(position, retry_after):
+                received[name].append(position)
+            return on_status
+        
+        first = asyncio.ensure_future(collect(flight.stream("soru", upstream, listener("first"))))
+        second = asyncio.ensure_future(collect(flight.stream("soru", upstream, listener("second"))))
+        await started.wait()
+        late = asyncio.ensure_future(collect(flight.stream("soru", upstream, listener("late"))))
+        await cleared.wait()
+        # Temizlenen durum sonradan katılana iletilmez
+        admitted = asyncio.ensure_future(collect(flight.stream("soru", upstream, listener("admitted"))))
+        results = await asyncio.gather(first, second, late, admitted)
+        return received, results, flight
+    
+    received, results, flight = asyncio.run(scenario())
+    assert results == [["a"]] * 4
+    assert received == {"first": [2, 1], "second": [2, 1], "late": [2, 1], "admitted": []}
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,111 @@
+"""Websocket akış protokolü: çerçevelerden yanıtın yeniden oluşturulması ve birleştirme"""
+
+import asyncio
+import json
+
+import pytest
+
+from stream_protocol import coalesce, negotiate_protocol, stream_frames
+
+ANSWER = "Neolitik devrimde **tarım** yerleşik hayatı başlattı.\n\nÇömlek, dokuma ve ğüşıöç gibi izler.\n\n```\nkod\n```"
+
+
+async def chunked(text, size, interval=0.0):
+    for start in range(0, len(text), size):
+        if interval:
+            await asyncio.sleep(interval)
+        yield text[start:start + size]
+
+
+def frames(protocol, size=7, interval=0.0, window=0.05, max_chars=64):
+    async def collect():
+        return [json.loads(frame) async for frame in stream_frames(
+            chunked(ANSWER, size, interval), protocol, window, max_chars
+        )]
+    return asyncio.run(collect())
+
+
+def reassemble(received):
+    """public/script.js ile aynı kural: v1 bot_complete içeriği, v2 deltaların birleşimi"""
+    text = ""
+    for frame in received:
+        if frame["type"] == "bot_delta":
+            text += frame["content"]
+        elif frame["type"] == "bot_complete":
+            return frame.get("content", text)
+    raise AssertionError("bot_complete gelmedi")
+
+
+@pytest.mark.parametrize("size,interval", [(1, 0.0), (7, 0.0), (5, 0.002), (500, 0.0)])
+def test_v1_and_v2_reassemble_identical_text(size, interval):
+    v1 = frames(1, size, interval)
+    v2 = frames(2, size, interval)
+    assert reassemble(v1) == reassemble(v2) == ANSWER
+    assert v1[0]["type"] == v2[0]["type"] == "bot_start"
+    # v1 her çerçevede o ana kadarki yanıtın tamamını taşır
+    assert v1[-2]["full_content"] == ANSWER
+
+
+def test_v2_writes_turkish_characters_as_utf8():
+    async def collect():
+        return [frame async for frame in stream_frames(chunked(ANSWER, 500), 2)]
+    assert any("ğüşıöç" in frame for frame in asyncio.run(collect()))
+
+
+def test_first_chunk_is_sent_without_waiting_for_the_window():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        stream = coalesce(chunked("abcdef", 1, interval=0.001), window=1.0, max_chars=100)
+        first = await stream.__anext__()
+        elapsed = loop.time() - started
+        rest = [chunk async for chunk in stream]
+        return first, elapsed, rest
+    
+    first, elapsed, rest = asyncio.run(scenario())
+    assert first == "a"
+    assert elapsed < 0.5
+    assert rest == ["bcdef"]
+
+
+def test_coalesced_chunks_respect_max_chars():
+    async def collect():
+        return [chunk async for chunk in coalesce(chunked(ANSWER, 3), window=10.0, max_chars=10)]
+    
+    chunks = asyncio.run(collect())
+    assert "".join(chunks) == ANSWER
+    assert chunks[0] == ANSWER[:3]
+    # Sınıra ulaşan parça hemen verilir; en fazla bir kaynak parça kadar taşabilir
+    assert all(len(chunk) < 10 + 3 for chunk in chunks)
+    assert len(chunks) < len(ANSWER) / 3
+
+
+def test_window_flushes_without_waiting_for_next_chunk():
+    async def slow():
+        yield "a"
+        yield "b"
+        await asyncio.sleep(0.3)
+        yield "c"
+    
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        received = []
+        async for chunk in coalesce(slow(), window=0.02, max_chars=100):
+            received.append((chunk, loop.time() - started))
+        return received
+    
+    received = asyncio.run(scenario())
+    assert [chunk for chunk, _ in received] == ["a", "b", "c"]
+    assert received[1][1] < 0.2
+
+
+def test_zero_window_passes_chunks_through():
+    async def collect():
+        return [chunk async for chunk in coalesce(chunked("abc", 1), window=0, max_chars=0)]
+    assert asyncio.run(collect()) == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("requested,expected", [("2", 2), ("1", 1), (None, 1), ("3", 1), ("v2", 1)])
+def test_negotiate_protocol(requested, expected):
+    assert negotiate_protocol(requested) == expected
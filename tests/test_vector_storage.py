@@ -0,0 +1,126 @@
+"""NumPy vektör indeksi: float16 / int8 / kısaltılmış boyutla saklamada arama isabeti"""
+
+import os
+
+import numpy as np
+import pytest
+
+from numpy_vector_database import EMBEDDINGS_FILE, NumpyCollection, StorageOptions
+
+ROWS, DIMENSIONS, QUERIES, K = 1500, 384, 100, 10
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    """
+    Kümeli vektörler ve gürültülü kopyalarından sorgular; varyans boyutla azalır
+    (Matryoshka tipi embedding'lerde ilk boyutlar bilginin çoğunu taşır)
+    """
+    rng = np.random.default_rng(0)
+    decay = np.exp(-np.arange(DIMENSIONS) / 96)
+    centers = rng.normal(size=(20, DIMENSIONS))
+    vectors = (centers[rng.integers(0, len(centers), ROWS)] + rng.normal(size=(ROWS, DIMENSIONS))) * decay
+    queries = vectors[rng.integers(0, ROWS, QUERIES)] + rng.normal(size=(QUERIES, DIMENSIONS)) * 0.5 * decay
+    return vectors.astype(np.float32), queries.astype(np.float32)
+
+
+def build(vectors, dtype="float32", dims=0, rescore=0, keep_float32=True, path=None):
+    collection = NumpyCollection("test", path, StorageOptions(dtype, dims, rescore, keep_float32))
+    collection.upsert([f"id-{row}" for row in range(len(vectors))], [f"döküman {row}" for row in range(len(vectors))],
+                      vectors.tolist(), [{"row": row} for row in range(len(vectors))])
+    return collection
+
+
+def recall(expected, rows):
+    return np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(expected, rows)])
+
+
+@pytest.fixture(scope="module")
+def exact(corpus):
+    vectors, queries = corpus
+    _, rows, similarities = build(vectors).query_many(queries, K)
+    return rows, similarities
+
+
+@pytest.mark.parametrize("dtype,dims,rescore,minimum", [
+    ("float16", 0, 0, 0.99),
+    ("int8", 0, 0, 0.95),
+    ("float32", 128, 0, 0.85),
+    ("int8", 128, 0, 0.85),
+])
+def test_compressed_search_recall(corpus, exact, dtype, dims, rescore, minimum):
+    vectors, queries = corpus
+    _, rows, _ = build(vectors, dtype, dims, rescore).query_many(queries, K)
+    assert recall(exact[0], rows) >= minimum
+
+
+@pytest.mark.parametrize("dtype,dims", [("int8", 0), ("float16", 128), ("int8", 128)])
+def test_rescoring_restores_exact_results(corpus, exact, dtype, dims):
+    vectors, queries = corpus
+    _, rows, similarities = build(vectors, dtype, dims, rescore=40).query_many(queries, K)
+    assert recall(exact[0], rows) >= 0.99
+    # Yeniden puanlanan skorlar float32 kosinüs benzerliğidir
+    np.testing.assert_allclose(similarities, exact[1], atol=1e-4)
+
+
+def test_compressed_matrix_is_smaller(corpus):
+    vectors, _ = corpus
+    full = build(vectors).storage_bytes()["search_bytes"]
+    assert build(vectors, "float16").storage_bytes()["search_bytes"] == full // 2
+    assert build(vectors, "int8").storage_bytes()["search_bytes"] < full // 3
+    assert build(vectors, "int8", 128).storage_bytes()["search_bytes"] < full // 9
+
+
+def test_single_query_matches_batched_search(corpus):
+    vectors, queries = corpus
+    collection = build(vectors, "int8", 128, rescore=40)
+    _, rows, _ = collection.query_many(queries[:3], K)
+    for query, expected in zip(queries[:3], rows):
+        result = collection.query(query.tolist(), K)
+        assert result["ids"][0] == [f"id-{row}" for row in expected]
+
+
+def test_reopened_collection_without_float32_copy(corpus, tmp_path):
+    vectors, queries = corpus
+    path = str(tmp_path / "test")
+    _, rows, _ = build(vectors, "int8", 0, rescore=40, keep_float32=False, path=path).query_many(queries, K)
+    assert not os.path.exists(os.path.join(path, EMBEDDINGS_FILE))
+    
+    reopened = NumpyCollection("test", path, StorageOptions("int8", 0, 40, False))
+    _, reopened_rows, _ = reopened.query_many(queries, K)
+    np.testing.assert_array_equal(rows, reopened_rows)
+
+
+def test_changed_options_are_rebuilt_from_float32_copy(corpus, exact, tmp_path):
+    vectors, queries = corpus
+    path = str(tmp_path / "test")
+    build(vectors, path=path)
+    
+    reopened = NumpyCollection("test", path, StorageOptions("int8", 128, 40, True))
+    assert reopened.storage_bytes()["search_bytes"] < reopened.storage_bytes()["float32_bytes"] // 9
+    _, rows, _ = reopened.query_many(queries, K)
+    assert recall(exact[0], rows) >= 0.99
+
+
+def test_metadata_update_writes_only_records(corpus, tmp_path, monkeypatch):
+    vectors, _ = corpus
+    path = str(tmp_path / "test")
+    collection = build(vectors[:20], "int8", path=path)
+    matrices = {name: os.stat(os.path.join(path, name)).st_mtime_ns
+                for name in os.listdir(path) if name.endswith(".npy")}
+    monkeypatch.setattr(collection, "_save", lambda *args: pytest.fail("matrisler yeniden yazıldı"))
+    writes = []
+    write_records = collection._write_records
+    monkeypatch.setattr(collection, "_write_records", lambda *args: writes.append(1) or write_records(*args))
+    
+    # Değişmeyen metadata hiçbir şey yazdırmaz
+    collection.update_metadatas(["id-0", "id-1"], [{"row": 0}, {"row": 1}])
+    assert writes == []
+    
+    collection.update_metadatas(["id-0", "id-1", "yok"], [{"row": 0}, {"row": 100}, {"row": 7}])
+    assert writes == [1]
+    assert collection.get_metadatas(["id-1", "yok"]) == [{"row": 100}, None]
+    assert matrices == {name: os.stat(os.path.join(path, name)).st_mtime_ns for name in matrices}
+    
+    reopened = NumpyCollection("test", path, StorageOptions("int8", 0, 0, True))
+    assert reopened.get_metadatas(["id-0", "id-1"]) == [{"row": 0}, {"row": 100}]
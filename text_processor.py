@@ -3,20 +3,80 @@ Metin işleme modülü
 Bu modül dosya okuma ve metni parçalama işlemlerini gerçekleştirir.
 """
 
+import codecs
 import os
-from typing import List, Tuple
+import re
+from typing import Iterator, List, Tuple
+
+# Aralıktaki SON kelime sınırı: açgözlü ".*" sondan geriye doğru C seviyesinde geri izler.
+# Sınır karakterleri eski döngüdeki listeyle aynıdır: ' ', '\n', '\t', '.', '!', '?'
+LAST_WORD_BOUNDARY = re.compile(r'.*[ \n\t.!?]', re.S)
+
+# Aralıktaki SON cümle sonu: noktalama (+ kapanan tırnak/parantez) ve ardından boşluk
+LAST_SENTENCE_END = re.compile(r'.*[.!?…]+["\'”’»)\]]*(?=\s)', re.S)
+
+# Nokta ile bitse de cümle sonu sayılmayan Türkçe kısaltmalar
+TURKISH_ABBREVIATIONS = {
+    "vb", "vs", "vd", "bkz", "örn", "dr", "prof", "doç", "yrd", "av", "sn", "no",
+    "s", "sf", "bl", "böl", "yy", "çev", "haz", "ed", "st", "cad", "sok", "mah", "ör"
+}
+
 
 class TextProcessor:
     """Metin işleme sınıfı"""
     
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200, chunk_mode: str = "compat"):
         """
         Args:
             chunk_size: Her parçanın maksimum karakter sayısı
             chunk_overlap: Parçalar arası örtüşme miktarı
+            chunk_mode: "compat" (eski çıktıyla birebir aynı) veya "sentence" (cümle sonunda böl)
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.chunk_mode = chunk_mode
+    
+    def _sentence_boundary(self, text: str, start: int, limit: int) -> int:
+        """
+        Parçanın ikinci yarısındaki son cümle sonu (noktalamadan sonraki boşluk), yoksa -1
+        """
+        window_start = start + self.chunk_size // 2
+        # Lookahead'in boşluğu görebilmesi için bir karakter fazlasıyla ara
+        search_limit = min(limit + 1, len(text))
+        while True:
+            match = LAST_SENTENCE_END.match(text, window_start, search_limit)
+            if not match:
+                return -1
+            end = match.end()
+            if end > limit:
+                search_limit = end - 1
+                continue
+            # "vb.", "Prof." ve "3." gibi kısaltma/sıra sayılarını atla
+            punct = end
+            while text[punct - 1] not in '.!?…':
+                punct -= 1
+            word_start = text.rfind(' ', start, punct) + 1
+            word = text[word_start:punct].rstrip('.!?…').lower()
+            if text[punct - 1] == '.' and (word in TURKISH_ABBREVIATIONS or word.isdigit()):
+                search_limit = word_start
+                continue
+            return end
+    
+    def _chunk_end(self, text: str, start: int) -> int:
+        """Parçanın bitiş konumunu belirle"""
+        end = start + self.chunk_size
+        if end >= len(text):
+            return end
+        
+        if self.chunk_mode == "sentence":
+            boundary = self._sentence_boundary(text, start, end)
+            if boundary > start:
+                return boundary
+        
+        # Kelime sınırında kes: (start, end] aralığındaki son sınır karakteri.
+        # Bulunamazsa zorunlu kes.
+        match = LAST_WORD_BOUNDARY.match(text, start + 1, end + 1)
+        return match.end() - 1 if match else end
     
     def read_file(self, file_path: str) -> str:
         """
@@ -24,7 +84,7 @@ class TextProcessor:
         
         Args:
             file_path: Okunacak dosyanın yolu
-            
+        
         Returns:
             Dosya içeriği
         """
@@ -37,7 +97,7 @@ class TextProcessor:
             
             print(f"✅ Dosya başarıyla okundu: {file_path}")
             return content
-            
+        
         except Exception as e:
             print(f"❌ Dosya okuma hatası: {e}")
             return ""
@@ -48,7 +108,7 @@ class TextProcessor:
         
         Args:
             text: Bölünecek metin
-            
+        
         Returns:
             Metin parçalarının listesi
         """
@@ -57,41 +117,105 @@ class TextProcessor:
         
         chunks = []
         start = 0
+        text_length = len(text)
+        chunk_size = self.chunk_size
+        chunk_overlap = self.chunk_overlap
+        find_boundary = LAST_WORD_BOUNDARY.match
+        sentence_mode = self.chunk_mode == "sentence"
         
-        while start < len(text):
-            # Parça sonunu belirle
-            end = start + self.chunk_size
-            
-            # Eğer metin bitmediyse, kelime sınırında kes
-            if end < len(text):
-                # Geriye doğru git ve boşluk bul
-                while end > start and text[end] not in [' ', '\n', '\t', '.', '!', '?']:
-                    end -= 1
-                
-                # Eğer boşluk bulunamazsa, zorunlu kes
-                if end == start:
-                    end = start + self.chunk_size
+        while start < text_length:
+            # Parça sonunu belirle (compat modunda sıcak yol burada satır içi)
+            if sentence_mode:
+                end = self._chunk_end(text, start)
+            else:
+                end = start + chunk_size
+                if end < text_length:
+                    match = find_boundary(text, start + 1, end + 1)
+                    if match:
+                        end = match.end() - 1
             
             # Parçayı al
             chunk = text[start:end].strip()
             if chunk:
                 chunks.append(chunk)
             
-            # Bir sonraki başlangıç noktasını belirle (örtüşme ile)
-            start = end - self.chunk_overlap
-            if start < 0:
-                start = end
+            # Bir sonraki başlangıç noktasını belirle (örtüşme ile). Başlangıç
+            # ilerlemiyorsa eski döngü sonsuza kadar dönerdi; parça sonundan devam et.
+            next_start = end - chunk_overlap
+            start = next_start if next_start > start else end
         
         print(f"✅ Metin {len(chunks)} parçaya bölündü")
         return chunks
     
+    def iter_file_chunks(self, file_path: str, block_size: int = 1 << 20) -> Iterator[Tuple[str, int, int]]:
+        """
+        Dosyayı bloklar halinde okuyarak parçaları üretir. Bellekte yalnızca
+        birkaç parçalık pencere tutulur, bu yüzden dosya boyutundan bağımsızdır.
+        Satır sonları dönüştürülmez; \n kullanan dosyalarda çıktı create_chunks ile aynıdır.
+        
+        Args:
+            file_path: Okunacak dosyanın yolu
+            block_size: Okuma bloğu boyutu (byte)
+        
+        Yields:
+            (chunk, başlangıç_byte, bitiş_byte) üçlüleri
+        """
+        if not os.path.exists(file_path):
+            print(f"❌ Dosya okuma hatası: Dosya bulunamadı: {file_path}")
+            return
+        
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        buffer = ""          # Dosyanın henüz parçalanmamış penceresi
+        base_byte = 0        # buffer[0]'ın dosyadaki byte konumu
+        eof = False
+        chunk_count = 0
+        
+        with open(file_path, 'rb') as file:
+            while True:
+                # Parça sonunu belirlemek için en az chunk_size + 1 karakterlik pencere gerekli
+                while not eof and len(buffer) <= self.chunk_size:
+                    block = file.read(block_size)
+                    if not block:
+                        buffer += decoder.decode(b"", final=True)
+                        eof = True
+                    else:
+                        buffer += decoder.decode(block)
+                
+                if not buffer:
+                    break
+                
+                # Parça sonunu belirle (create_chunks ile aynı kural)
+                end = self._chunk_end(buffer, 0)
+                
+                raw = buffer[:end]
+                chunk = raw.strip()
+                if chunk:
+                    lead = len(raw) - len(raw.lstrip())
+                    start_byte = base_byte + len(raw[:lead].encode('utf-8'))
+                    end_byte = start_byte + len(chunk.encode('utf-8'))
+                    chunk_count += 1
+                    yield chunk, start_byte, end_byte
+                
+                # Bir sonraki başlangıç noktasını belirle (örtüşme ile). Başlangıç
+                # ilerlemiyorsa orijinal döngü sonsuza kadar dönerdi; parça sonundan devam et.
+                next_start = end - self.chunk_overlap
+                if next_start <= 0:
+                    next_start = end
+                if eof and next_start >= len(buffer):
+                    break
+                
+                base_byte += len(buffer[:next_start].encode('utf-8'))
+                buffer = buffer[next_start:]
+        
+        print(f"✅ Dosya akış halinde {chunk_count} parçaya bölündü: {file_path}")
+    
     def process_files(self, file_paths: List[str]) -> List[Tuple[str, List[str]]]:
         """
         Birden fazla dosyayı işler
         
         Args:
             file_paths: İşlenecek dosya yolları
-            
+        
         Returns:
             (dosya_adı, chunks) tuple'larının listesi
         """
@@ -1,225 +1,217 @@
 """
 Vektör veritabanı modülü
-Bu modül Chroma vektör veritabanı işlemlerini yönetir.
+Bu modül vektör veritabanı arayüzünü ve yapılandırmaya göre backend seçen
+fabrika fonksiyonunu içerir. Backend'ler ayrı modüllerdedir ve yalnızca
+seçildiklerinde içe aktarılır (chromadb yüklemesi ağırdır).
 """
 
-import chromadb
-from chromadb.config import Settings
-from typing import List, Dict, Any, Optional
-import os
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from typing import List, Dict, Any, Optional, Sequence, Union
+import numpy as np
 from config import Config
 
-class VectorDatabase:
-    """Chroma vektör veritabanı sınıfı"""
-    
-    def __init__(self):
-        """Chroma istemcisini başlat"""
-        try:
-            # Render platformu tespiti
-            is_render = os.getenv("RENDER") == "true"
-            
-            # Veritabanı dizininin var olduğundan emin ol
-            if not os.path.exists(Config.VECTOR_DB_PATH):
-                os.makedirs(Config.VECTOR_DB_PATH, exist_ok=True)
-                print(f"📁 Veritabanı dizini oluşturuldu: {Config.VECTOR_DB_PATH}")
-            
-            # Render'da persistent disk kontrolü
-            if is_render:
-                # Render persistent disk mount kontrolü
-                mount_path = "/var/data"
-                if not os.path.exists(mount_path):
-                    print(f"⚠️ Persistent disk mount edilmemiş: {mount_path}")
-                    print("🔄 Memory-only veritabanına geçiliyor...")
-                    self._init_memory_client()
-                    return
-                
-                # Disk yazma izni kontrolü
-                test_file = os.path.join(mount_path, "write_test.tmp")
-                try:
-                    with open(test_file, 'w') as f:
-                        f.write("test")
-                    os.remove(test_file)
-                    print(f"✅ Persistent disk yazma izni OK: {mount_path}")
-                except Exception as write_error:
-                    print(f"⚠️ Persistent disk yazma hatası: {write_error}")
-                    print("🔄 Memory-only veritabanına geçiliyor...")
-                    self._init_memory_client()
-                    return
+# Bir koleksiyonun çok sorgulu arama sonucu: (sorgu sayısı, k) boyutlu diziler.
+# Boş hücrelerde ID None, mesafe +inf'tir.
+SearchBlock = namedtuple("SearchBlock", "ids distances documents metadatas")
 
-            # Normal persistent client başlatma
-            self._init_persistent_client()
-            
-        except Exception as e:
-            print(f"❌ Vektör veritabanı başlatma hatası: {e}")
-            print("🔄 Memory-only veritabanına geçiliyor...")
-            self._init_memory_client()
-            
-    def _init_persistent_client(self):
-        """Persistent Chroma client başlat"""
-        try:
-            # Eski database dosyalarını temizle eğer permission sorunu varsa
-            db_file = os.path.join(Config.VECTOR_DB_PATH, "chroma.sqlite3")
-            if os.path.exists(db_file):
-                try:
-                    # Dosya izinlerini kontrol et ve düzelt
-                    import stat
-                    current_permissions = os.stat(db_file).st_mode
-                    os.chmod(db_file, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IWGRP)
-                except Exception as perm_error:
-                    print(f"⚠️ Dosya izinleri düzeltilemedi: {perm_error}")
-                    # Sorunlu dosyayı sil ve yeniden oluştur
-                    try:
-                        os.remove(db_file)
-                        print("🔄 Sorunlu veritabanı dosyası silindi, yenisi oluşturulacak")
-                    except:
-                        print("❌ Sorunlu veritabanı dosyası silinemedi")
-            
-            self.client = chromadb.PersistentClient(
-                path=Config.VECTOR_DB_PATH,
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True,
-                    is_persistent=True
-                )
-            )
-            print(f"✅ Persistent vektör veritabanı başlatıldı: {Config.VECTOR_DB_PATH}")
-            
-        except Exception as e:
-            print(f"❌ Persistent client hatası: {e}")
-            raise e
-    
-    def _init_memory_client(self):
-        """Memory-only Chroma client başlat"""
-        try:
-            print("🔄 Memory-only veritabanına geçiliyor...")
-            self.client = chromadb.Client(
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True,
-                    is_persistent=False
-                )
-            )
-            print("✅ Memory-only vektör veritabanı başlatıldı")
-            
-        except Exception as e:
-            print(f"❌ Memory client hatası: {e}")
-            # Son çare: basit in-memory client
-            try:
-                import chromadb
-                self.client = chromadb.Client()
-                print("✅ Basit memory client başlatıldı")
-            except Exception as final_error:
-                print(f"❌ Tüm client seçenekleri başarısız: {final_error}")
-                raise final_error
-    
-    def create_collection(self, collection_name: str) -> chromadb.Collection:
+
+def empty_search_block(query_count: int, k: int) -> SearchBlock:
+    """Boş (sorgu sayısı, k) arama bloğu oluştur"""
+    return SearchBlock(
+        np.full((query_count, k), None, dtype=object),
+        np.full((query_count, k), np.inf, dtype=np.float32),
+        np.full((query_count, k), None, dtype=object),
+        np.full((query_count, k), None, dtype=object)
+    )
+
+
+def fill_search_row(block: SearchBlock, row: int, results: Dict[str, Any], position: int = 0):
+    """Chroma biçimindeki sonucun position'ıncı sorgusunu bloğun satırına yaz"""
+    def column(key):
+        values = results.get(key) or []
+        return (values[position] if position < len(values) else None) or []
+    
+    k = block.ids.shape[1]
+    ids = column("ids")[:k]
+    documents, metadatas, distances = column("documents"), column("metadatas"), column("distances")
+    for rank, doc_id in enumerate(ids):
+        block.ids[row, rank] = doc_id
+        block.documents[row, rank] = documents[rank] if rank < len(documents) else None
+        block.metadatas[row, rank] = metadatas[rank] if rank < len(metadatas) else None
+        block.distances[row, rank] = distances[rank] if rank < len(distances) else np.inf
+
+
+class VectorDatabase(ABC):
+    """
+    Vektör veritabanı arayüzü
+    
+    Koleksiyon nesneleri backend'e özgüdür ve yalnızca aynı backend'in
+    metodlarına geri verilir. Arama sonuçları Chroma'nın sorgu biçimindedir:
+    {"ids": [[...]], "documents": [[...]], "metadatas": [[...]], "distances": [[...]]}
+    (mesafe = 1 - kosinüs benzerliği).
+    """
+    
+    @abstractmethod
+    def create_collection(self, collection_name: str) -> Any:
+        """Koleksiyonu sıfırdan oluştur (varsa silinir)"""
+    
+    @abstractmethod
+    def get_or_create_collection(self, collection_name: str) -> Any:
+        """Koleksiyonu silmeden al, yoksa oluştur"""
+    
+    @abstractmethod
+    def get_collection(self, collection_name: str) -> Optional[Any]:
+        """Mevcut koleksiyonu al, yoksa None"""
+    
+    @abstractmethod
+    def list_collections(self) -> List[str]:
+        """Mevcut koleksiyon adlarını listele"""
+    
+    @abstractmethod
+    def count(self, collection: Any) -> int:
+        """Koleksiyondaki döküman sayısı"""
+    
+    @abstractmethod
+    def get_ids(self, collection: Any) -> List[str]:
+        """Koleksiyondaki tüm döküman ID'leri"""
+    
+    @abstractmethod
+    def upsert_documents(self, collection: Any, ids: List[str], texts: List[str],
+                         embeddings: List[List[float]], metadatas: List[Dict[str, Any]]):
+        """Dökümanları verilen ID'lerle ekle veya güncelle"""
+    
+    @abstractmethod
+    def update_metadatas(self, collection: Any, ids: List[str], metadatas: List[Dict[str, Any]]):
+        """Embedding'e dokunmadan metadata bilgilerini güncelle"""
+    
+    @abstractmethod
+    def delete_documents(self, collection: Any, ids: List[str]):
+        """Verilen ID'lere sahip dökümanları sil"""
+    
+    @abstractmethod
+    def search_similar(self, collection: Any, query_embedding: List[float],
+                       n_results: int = 3) -> Dict[str, Any]:
+        """Sorguya en yakın dökümanları ara"""
+    
+    def search_many(self, collections: Union[Sequence[Any], Dict[str, Any]],
+                    query_embeddings: Any, n_results: Union[int, Sequence[int]] = 3) -> Dict[str, Any]:
         """
-        Koleksiyon oluştur veya mevcut olanı al
+        Bir sorgu matrisini bir veya birden fazla koleksiyonda tek seferde ara.
+        Her sorgu için koleksiyonların sonuçları mesafeye göre birleştirilir.
         
         Args:
-            collection_name: Koleksiyon adı
-            
+            collections: Koleksiyon listesi veya {etiket: koleksiyon}
+            query_embeddings: (sorgu sayısı, boyut) matris
+            n_results: Tüm sorgular için sonuç sayısı veya sorgu başına sonuç sayıları
+        
         Returns:
-            Chroma koleksiyonu
-        """
-        try:
-            # Önce koleksiyonu silmeye çalış (yeniden oluşturmak için)
-            try:
-                self.client.delete_collection(collection_name)
-                print(f"🗑️  Eski koleksiyon silindi: {collection_name}")
-            except:
-                pass
-            
-            collection = self.client.create_collection(
-                name=collection_name,
-                metadata={"hnsw:space": "cosine"}
-            )
-            print(f"✅ Koleksiyon oluşturuldu: {collection_name}")
-            return collection
-            
-        except Exception as e:
-            print(f"❌ Koleksiyon oluşturma hatası: {e}")
-            raise
-    
-    def add_documents(self, collection: chromadb.Collection, texts: List[str], 
-                     embeddings: List[List[float]], metadatas: List[Dict[str, Any]] = None):
+            Sütunlu sonuç; her sonuç satırı için eşit uzunlukta numpy dizileri:
+            query_index, rank, collection, ids, distances, documents, metadatas.
+            Sorgu q'nun sonuçları offsets[q]:offsets[q + 1] aralığındadır.
         """
-        Koleksiyona dökümanlar ekle
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        counts = np.broadcast_to(np.asarray(n_results, dtype=np.int64), (len(queries),))
+        if isinstance(collections, dict):
+            labeled = list(collections.items())
+        else:
+            labeled = [(getattr(collection, "name", str(i)), collection)
+                       for i, collection in enumerate(collections)]
+        k = int(counts.max()) if len(counts) else 0
         
-        Args:
-            collection: Hedef koleksiyon
-            texts: Metinler
-            embeddings: Embedding vektörleri
-            metadatas: Metadata bilgileri
+        blocks, labels = [], []
+        for label, collection in labeled:
+            blocks.append(self._search_block(collection, queries, k))
+            labels.append(np.full((len(queries), k), label, dtype=object))
+        if not blocks:
+            blocks, labels = [empty_search_block(len(queries), k)], [np.full((len(queries), k), None)]
+        
+        # Koleksiyonları yan yana koy, her sorguyu mesafeye göre sırala ve ilk n'i al
+        distances = np.concatenate([block.distances for block in blocks], axis=1)
+        order = np.argsort(distances, axis=1, kind='stable')
+        
+        def merged(arrays):
+            return np.take_along_axis(np.concatenate(arrays, axis=1), order, axis=1)
+        
+        distances = np.take_along_axis(distances, order, axis=1)
+        keep = (np.arange(distances.shape[1])[None, :] < counts[:, None]) & np.isfinite(distances)
+        query_index, rank = np.nonzero(keep)
+        return {
+            "query_index": query_index,
+            "rank": rank,
+            "collection": merged(labels)[keep],
+            "ids": merged([block.ids for block in blocks])[keep],
+            "distances": distances[keep],
+            "documents": merged([block.documents for block in blocks])[keep],
+            "metadatas": merged([block.metadatas for block in blocks])[keep],
+            "offsets": np.concatenate([[0], np.cumsum(keep.sum(axis=1))]),
+        }
+    
+    def _search_block(self, collection: Any, queries: np.ndarray, k: int) -> SearchBlock:
+        """
+        Tek koleksiyonda tüm sorguları ara (varsayılan: sorgu başına search_similar).
+        Backend'ler toplu aramayı destekliyorsa bunu ezer.
         """
-        try:
-            if not metadatas:
-                metadatas = [{"index": i} for i in range(len(texts))]
-            
-            ids = [f"doc_{i}" for i in range(len(texts))]
-            
-            collection.add(
-                documents=texts,
-                embeddings=embeddings,
-                metadatas=metadatas,
-                ids=ids
-            )
-            
-            print(f"✅ {len(texts)} döküman koleksiyona eklendi")
-            
-        except Exception as e:
-            print(f"❌ Döküman ekleme hatası: {e}")
-            raise
-    
-    def search_similar(self, collection: chromadb.Collection, query_embedding: List[float], 
-                      n_results: int = 3) -> Dict[str, Any]:
+        block = empty_search_block(len(queries), k)
+        if k <= 0:
+            return block
+        for row, query in enumerate(queries):
+            fill_search_row(block, row, self.search_similar(collection, query.tolist(), n_results=k))
+        return block
+    
+    def collection_centroid(self, collection: Any) -> Optional[np.ndarray]:
         """
-        Benzer dökümanları ara
+        Koleksiyonun merkezi: normalize edilmiş embedding'lerin ortalaması.
+        Backend embedding'leri döndüremiyorsa None.
         
         Args:
-            collection: Arama yapılacak koleksiyon
-            query_embedding: Sorgu embedding'i
-            n_results: Döndürülecek sonuç sayısı
-            
-        Returns:
-            Arama sonuçları
+            collection: Koleksiyon
         """
-        try:
-            results = collection.query(
-                query_embeddings=[query_embedding],
-                n_results=n_results
-            )
-            
-            return results
-            
-        except Exception as e:
-            print(f"❌ Arama hatası: {e}")
-            return {"documents": [[]], "distances": [[]], "metadatas": [[]]}
-    
-    def get_collection(self, collection_name: str) -> Optional[chromadb.Collection]:
+        return None
+    
+    def get_metadatas(self, collection: Any, ids: List[str]) -> List[Optional[Dict[str, Any]]]:
         """
-        Mevcut koleksiyonu al
+        ID'lerin kayıtlı metadata bilgileri. Bulunamayan (veya backend'in
+        döndüremediği) ID'ler için None.
         
         Args:
-            collection_name: Koleksiyon adı
-            
-        Returns:
-            Chroma koleksiyonu veya None
+            collection: Koleksiyon
+            ids: Döküman ID'leri
         """
-        try:
-            return self.client.get_collection(collection_name)
-        except:
-            return None
+        return [None] * len(ids)
     
-    def list_collections(self) -> List[str]:
+    def add_documents(self, collection: Any, texts: List[str],
+                      embeddings: List[List[float]], metadatas: List[Dict[str, Any]] = None):
         """
-        Mevcut koleksiyonları listele
+        Koleksiyona sıra numaralı ID'lerle dökümanlar ekle
         
-        Returns:
-            Koleksiyon adlarının listesi
+        Args:
+            collection: Hedef koleksiyon
+            texts: Metinler
+            embeddings: Embedding vektörleri
+            metadatas: Metadata bilgileri
         """
-        try:
-            collections = self.client.list_collections()
-            return [col.name for col in collections]
-        except:
-            return []
+        if not metadatas:
+            metadatas = [{"index": i} for i in range(len(texts))]
+        ids = [f"doc_{i}" for i in range(len(texts))]
+        self.upsert_documents(collection, ids, texts, embeddings, metadatas)
+
+
+def create_vector_database(backend: Optional[str] = None) -> VectorDatabase:
+    """
+    Yapılandırılan backend için vektör veritabanı oluştur
+    
+    Args:
+        backend: "chroma" veya "numpy" (None ise Config.VECTOR_BACKEND)
+    
+    Returns:
+        Vektör veritabanı
+    """
+    backend = (backend or Config.VECTOR_BACKEND).lower()
+    if backend == "chroma":
+        from chroma_vector_database import ChromaVectorDatabase
+        return ChromaVectorDatabase()
+    if backend == "numpy":
+        from numpy_vector_database import NumpyVectorDatabase
+        return NumpyVectorDatabase()
+    raise ValueError(f"Bilinmeyen vektör veritabanı backend'i: {backend}")